@@ -0,0 +1,231 @@
+import os
+import re
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from agents.master import (
+                        SQL_AGENT,
+                        FILE_AGENT,
+                        BOTH_AGENT,
+                        NONE,
+                        SQL_TRIGGER_WORDS,
+                        FILE_TRIGGER_WORDS,
+                        )
+
+# Decisions at or above this confidence skip the master LLM call
+FAST_ROUTE_MIN_CONFIDENCE = float(os.getenv("FAST_ROUTE_MIN_CONFIDENCE", "0.8"))
+# Fraction of fast-path decisions also sent to the LLM, to keep measuring agreement
+FAST_ROUTE_SHADOW_RATE = float(os.getenv("FAST_ROUTE_SHADOW_RATE", "0"))
+ROUTE_MEMO_SIZE = int(os.getenv("ROUTE_MEMO_SIZE", "2048"))
+
+# Multi-word trigger phrases, file name matches, and table names asked about with an
+# aggregate or listing word are strong evidence
+STRONG_SIGNAL = 1.0
+# Single words are weak: "track", "customer" or "employee" are table names but also plain
+# English, and "report" or a bare "pdf" can be figures of speech. Two weak signals on the
+# same side add up to a strong one.
+WEAK_SIGNAL = 0.5
+
+# Words that, next to a table name, show the request is about the data in it
+SQL_INTENT_WORDS = [
+    "how many", "number of", "count", "total", "sum", "average", "top", "most", "least",
+    "highest", "lowest", "per", "each", "sales", "revenue", "list",
+]
+
+# Words that appear in file names but say nothing about which file is meant
+NAME_STOPWORDS = {
+    "the", "and", "for", "with", "from", "data", "dataset", "file", "files", "cleaned",
+    "structured", "final", "copy", "new", "old", "versus", "specific",
+}
+FILE_EXTENSIONS = {"pdf", "csv", "txt", "json"}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(_TOKEN.findall(query.lower()))
+
+
+def _singular(token: str) -> str:
+    return token[:-1] if len(token) > 3 and token.endswith("s") else token
+
+
+def _contains_phrase(normalized_query: str, phrase: str) -> bool:
+    return re.search(rf"\b{re.escape(normalize_query(phrase))}\b", normalized_query) is not None
+
+
+def file_name_tokens(file_path: str) -> set[str]:
+    stem = os.path.splitext(os.path.basename(file_path))[0].lower()
+    return {
+        _singular(token) for token in _TOKEN.findall(stem)
+        if len(token) > 2 and token not in NAME_STOPWORDS and not token.isdigit()
+    }
+
+
+def _phrase_signal(phrase: str) -> float:
+    return STRONG_SIGNAL if len(normalize_query(phrase).split()) > 1 else WEAK_SIGNAL
+
+
+@dataclass
+class RouteDecision:
+    agent: str
+    confidence: float
+    source: str  # "fast_path", "memo" or "llm"
+    reasons: list[str] = field(default_factory=list)
+
+
+def classify(query: str, files: list[str], tables: list[str]) -> RouteDecision:
+    """Route a request with lexical rules, without calling the LLM.
+
+    Evidence for SQL comes from the master prompt's SQL trigger words and table names in the
+    query; evidence for files from the file trigger words and words from available file names.
+    Only multi-word phrases, file name matches and table names next to an SQL intent word
+    count as strong; single words are weak, so they alone never skip the LLM.
+
+    Args :
+        query (str): The user's request.
+        files (list[str]): Available file paths.
+        tables (list[str]): Table names in the database.
+
+    Returns :
+        RouteDecision: The agent to use and how confident the rules are (0 to 1).
+    """
+    normalized = normalize_query(query)
+    tokens = {_singular(token) for token in normalized.split()}
+    sql_score, file_score = 0.0, 0.0
+    reasons = []
+
+    for phrase in SQL_TRIGGER_WORDS:
+        if _contains_phrase(normalized, phrase):
+            sql_score += _phrase_signal(phrase)
+            reasons.append(f"sql trigger '{phrase}'")
+    matched_tables = [table for table in tables if _singular(table.lower()) in tokens]
+    if matched_tables:
+        intent = [phrase for phrase in SQL_INTENT_WORDS if _contains_phrase(normalized, phrase)]
+        sql_score += STRONG_SIGNAL if intent else WEAK_SIGNAL
+        reasons.append(f"table {', '.join(repr(table) for table in matched_tables)}"
+                       + (f" with '{intent[0]}'" if intent else ""))
+
+    for phrase in FILE_TRIGGER_WORDS:
+        if phrase.lower() in FILE_EXTENSIONS:
+            continue
+        if _contains_phrase(normalized, phrase):
+            file_score += _phrase_signal(phrase)
+            reasons.append(f"file trigger '{phrase}'")
+    for extension in FILE_EXTENSIONS & tokens:
+        file_score += WEAK_SIGNAL
+        reasons.append(f"extension '{extension}'")
+    for file_path in files:
+        matched = file_name_tokens(file_path) & tokens
+        if matched:
+            file_score += STRONG_SIGNAL
+            reasons.append(f"file '{os.path.basename(file_path)}' ({', '.join(sorted(matched))})")
+
+    if sql_score and file_score:
+        agent, confidence = BOTH_AGENT, min(sql_score, file_score, 1.0)
+    elif sql_score:
+        agent, confidence = SQL_AGENT, min(sql_score, 1.0)
+    elif file_score:
+        agent, confidence = FILE_AGENT, min(file_score, 1.0)
+    else:
+        agent, confidence = NONE, 0.0
+    return RouteDecision(agent=agent, confidence=confidence, source="fast_path", reasons=reasons)
+
+
+class RouterMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fast_path = 0
+        self.memo_hits = 0
+        self.llm_calls = 0
+        self.compared = 0  # decisions where both the rules and the LLM answered
+        self.agreed = 0
+
+    def record(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "fast_path": self.fast_path,
+            "memo_hits": self.memo_hits,
+            "llm_calls": self.llm_calls,
+            "fast_path_rate": self.fast_path / self.requests if self.requests else 0.0,
+            "llm_agreement": self.agreed / self.compared if self.compared else None,
+        }
+
+
+router_metrics = RouterMetrics()
+
+_memo: OrderedDict[str, RouteDecision] = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _memo_get(key: str):
+    with _memo_lock:
+        decision = _memo.get(key)
+        if decision is not None:
+            _memo.move_to_end(key)
+        return decision
+
+
+def _memo_put(key: str, decision: RouteDecision):
+    with _memo_lock:
+        _memo[key] = decision
+        _memo.move_to_end(key)
+        while len(_memo) > ROUTE_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+async def route_request(
+    query: str,
+    files: list[str],
+    tables: list[str],
+    ask_llm: Callable[[], Awaitable[str]],
+    min_confidence: float = FAST_ROUTE_MIN_CONFIDENCE,
+    shadow_rate: float = FAST_ROUTE_SHADOW_RATE,
+) -> RouteDecision:
+    """Choose the sub-agent for a request: memo, then local rules, then the master LLM.
+
+    Args :
+        query (str): The user's request.
+        files (list[str]): Available file paths.
+        tables (list[str]): Table names in the database.
+        ask_llm (Callable): Coroutine factory returning the master agent's choice.
+        min_confidence (float): Rule confidence needed to skip the LLM.
+        shadow_rate (float): Fraction of fast-path decisions double-checked by the LLM.
+
+    Returns :
+        RouteDecision: The chosen agent and where the decision came from.
+    """
+    router_metrics.record(requests=1)
+    # The same words can route differently once files or tables change
+    key = f"{normalize_query(query)}|{hash(tuple(files))}|{hash(tuple(tables))}"
+
+    memoized = _memo_get(key)
+    if memoized is not None:
+        router_metrics.record(memo_hits=1)
+        return RouteDecision(memoized.agent, memoized.confidence, "memo", memoized.reasons)
+
+    decision = classify(query, files, tables)
+    if decision.confidence >= min_confidence:
+        router_metrics.record(fast_path=1)
+        if shadow_rate and random.random() < shadow_rate:
+            llm_agent = await ask_llm()
+            router_metrics.record(llm_calls=1, compared=1, agreed=int(llm_agent == decision.agent))
+        _memo_put(key, decision)
+        return decision
+
+    llm_agent = await ask_llm()
+    router_metrics.record(llm_calls=1)
+    if decision.confidence > 0:
+        router_metrics.record(compared=1, agreed=int(llm_agent == decision.agent))
+    llm_decision = RouteDecision(agent=llm_agent, confidence=1.0, source="llm", reasons=decision.reasons)
+    _memo_put(key, llm_decision)
+    return llm_decision
@@ -1,13 +1,20 @@
+import os
 import sys
+import asyncio
+import logging
+from concurrent.futures.process import BrokenProcessPool
 
 # adding Folder_2 to the system path
 # sys.path.insert(0, 'utils')
-from util_functions.file_operations import list_files, read_json, read_csv, read_pdf, read_txt
+from util_functions.file_operations import list_files, read_json, read_json_path, read_csv, read_pdf, read_pdf_pages, read_txt, FILE_READERS
+from util_functions.parse_executor import parse_executor, ParseTimeout, PARSE_MAX_FILES
+from util_functions.text_index import extract_sections, get_text_index, search_file
+from util_functions.prefetch import note_file_read
+from util_functions.instrumentation import instrument_tool, count_validator_retries
 from models import OPENAI_MODEL
 
 from dotenv import load_dotenv
 from dataclasses import dataclass
-import pandas as pd
 from pydantic import BaseModel, Field
 from typing_extensions import Annotated, TypeAlias, Union, Optional
 from annotated_types import MinLen
@@ -16,6 +23,9 @@ from pydantic_ai import Agent, ModelRetry, RunContext
 
 load_dotenv("/mnt/c/Projects/Pydantic_Langgraph_SQL_and_File_Reader_Agents/.env")
 
+# Tool calls are logged at DEBUG; their timings and sizes are in util_functions.instrumentation
+logger = logging.getLogger(__name__)
+
 class FileSuccess(BaseModel):
     file_content: Annotated[str, MinLen(1)] = Field(alias='file_content', description='text content of the file')
     summary: str = Field(alias='summary', description='Summary of the file content')
@@ -31,16 +41,17 @@ class Dependencies:
 
 file_reader_agent = Agent(
     model=OPENAI_MODEL,
+    name="file_reader",
     output_type=FileResponse,
     result_retries=3,
 )
 
 @file_reader_agent.system_prompt
-def system_prompt(files: list[str]) -> str:
+def system_prompt(ctx: RunContext[Dependencies]) -> str:
     return f"""\
     You are a file reader agent. Your task is to read the content of a file based on the user's request.
 
-    Here is a list of available files: {files}
+    Here is a list of available files: {ctx.deps.files}
 
     When the user asks for a file, you must:
     1. **CRITICAL:** First, check if the exact file mentioned in the user's request exists in the `available_files` list.
@@ -49,40 +60,114 @@ def system_prompt(files: list[str]) -> str:
     4. Call the appropriate tool to read the file, passing the full file path as the 'file_path' argument.
 
     Available tools:
-    - read_json_tool(file_path: str): Use this for .json files.
+    - read_json_tool(file_path: str): Use this for .json files. It returns the structure of the document: each key path (e.g. `$[*].name`) with its value types, counts, array lengths and sample values.
+    - read_json_path_tool(file_path: str, json_path: str): Use this for specific values inside a .json file, e.g. `$[*].price`, `$[3]` or `$.items[0].name` (supported syntax: `$`, `.key`, `['key']`, `[index]`, `[*]`, `.*`). Take the paths from read_json_tool's structure.
     - read_csv_tool(file_path: str): Use this for .csv files.
     - read_text_tool(file_path: str): Use this for .txt files.
     - read_pdf_tool(file_path: str): Use this for .pdf files.
+    - read_files_tool(file_paths: list[str]): Use this when the user asks about several files at once; it reads them concurrently. Each file's content and summary are prefixed with its path.
+    - search_file_tool(file_path: str, query: str): Use this for questions about something specific inside a .txt or .pdf file. It returns the passages most relevant to `query` from anywhere in the file, whereas the read tools only return the beginning.
+    - read_pdf_pages_tool(file_path: str, start_page: int, end_page: int): Use this for specific pages of a .pdf file (1-based, inclusive), e.g. when the user asks about a section beyond the beginning of the document.
 
     Example 1: If the user says "I want the content of the bike data", and 'files/structured_bike_data_cleaned.json' is in the list, you should call read_json_tool('files/structured_bike_data_cleaned.json').
     Example 2: If the user says "I need to know more about risc", and 'files/risc.txt' is in the list, you should call read_txt_tool('files/risc.txt').
     """
 
+async def read_file(read_fn, file_path: str, *args) -> dict:
+    """Parse a file in the parse executor, turning a timeout into a retry the model can act on."""
+    note_file_read(file_path)
+    try:
+        return await parse_executor.read(read_fn, file_path, *args)
+    except ParseTimeout as e:
+        raise ModelRetry(f"{e}. Read a smaller part of it instead, e.g. with read_pdf_pages_tool, read_json_path_tool or search_file_tool.")
+    except BrokenProcessPool:
+        raise ModelRetry(f"The worker parsing {file_path} stopped. Try again, or read a smaller part of it.")
+
+@file_reader_agent.tool
+@instrument_tool()
+async def read_json_tool(ctx: RunContext[Dependencies], file_path: str):
+    logger.debug("read_json_tool called, %s", file_path)
+    file_data = await read_file(read_json, file_path)
+    return FileSuccess(file_content=file_data["file_content"], summary=file_data["summary"])
+
 @file_reader_agent.tool
-def read_json_tool(ctx: RunContext[Dependencies], file_path: str):
-    print(f"read_json_tool called, {file_path}")
-    file_data = read_json(file_path)
+@instrument_tool()
+async def read_json_path_tool(ctx: RunContext[Dependencies], file_path: str, json_path: str):
+    """Return the values at a JSONPath inside a JSON file, e.g. `$[*].name`."""
+    logger.debug("read_json_path_tool called, %s, %s", file_path, json_path)
+    try:
+        file_data = await read_file(read_json_path, file_path, json_path)
+    except ValueError as e:
+        raise ModelRetry(str(e))
     return FileSuccess(file_content=file_data["file_content"], summary=file_data["summary"])
 
 @file_reader_agent.tool
-def read_csv_tool(ctx: RunContext[Dependencies], file_path: str):
-    print(f"read_csv_tool called, {file_path}")
-    file_data = read_csv(file_path)
+@instrument_tool()
+async def read_csv_tool(ctx: RunContext[Dependencies], file_path: str):
+    logger.debug("read_csv_tool called, %s", file_path)
+    file_data = await read_file(read_csv, file_path)
     return FileSuccess(file_content=file_data["file_content"], summary=file_data["summary"])
 
 @file_reader_agent.tool
-def read_text_tool(ctx: RunContext[Dependencies], file_path: str):
-    print(f"read_text_tool called, {file_path}")
-    file_data = read_txt(file_path)
+@instrument_tool()
+async def read_text_tool(ctx: RunContext[Dependencies], file_path: str):
+    logger.debug("read_text_tool called, %s", file_path)
+    file_data = await read_file(read_txt, file_path)
     return FileSuccess(file_content=file_data["file_content"], summary=file_data["summary"])
 
 @file_reader_agent.tool
-def read_pdf_tool(ctx: RunContext[Dependencies], file_path: str):
-    print(f"read_pdf_tool called, {file_path}")
-    file_data = read_pdf(file_path)
+@instrument_tool()
+async def read_pdf_tool(ctx: RunContext[Dependencies], file_path: str):
+    logger.debug("read_pdf_tool called, %s", file_path)
+    file_data = await read_file(read_pdf, file_path)
     return FileSuccess(file_content=file_data["file_content"], summary=file_data["summary"])
 
+@file_reader_agent.tool
+@instrument_tool()
+async def read_files_tool(ctx: RunContext[Dependencies], file_paths: list[str]):
+    """Read several .json, .csv, .txt or .pdf files at once; they are parsed concurrently."""
+    logger.debug("read_files_tool called, %s", file_paths)
+    if len(file_paths) > PARSE_MAX_FILES:
+        raise ModelRetry(f"Read at most {PARSE_MAX_FILES} files per call.")
+    requests = []
+    for file_path in file_paths:
+        read_fn = FILE_READERS.get(os.path.splitext(file_path)[1].lower())
+        if read_fn is None:
+            raise ModelRetry(f"Unsupported file type: {file_path}")
+        requests.append((read_fn, file_path))
+        note_file_read(file_path)
+
+    contents, summaries = [], []
+    for file_path, file_data in zip(file_paths, await parse_executor.read_many(requests)):
+        if isinstance(file_data, Exception):
+            summaries.append(f"{file_path}: could not be read ({type(file_data).__name__}: {file_data})")
+            continue
+        contents.append(f"{file_path}: {file_data['file_content']}")
+        summaries.append(f"{file_path}: {file_data['summary']}")
+    return FileSuccess(file_content="\n\n".join(contents) or "No file could be read.", summary="\n\n".join(summaries))
+
+@file_reader_agent.tool
+@instrument_tool()
+async def read_pdf_pages_tool(ctx: RunContext[Dependencies], file_path: str, start_page: int, end_page: int):
+    """Read the text of pages start_page..end_page (1-based, inclusive) of a PDF file."""
+    logger.debug("read_pdf_pages_tool called, %s, pages %s-%s", file_path, start_page, end_page)
+    file_data = await read_file(read_pdf_pages, file_path, start_page, end_page)
+    return FileSuccess(file_content=file_data["file_content"] or file_data["summary"], summary=file_data["summary"])
+
+@file_reader_agent.tool
+@instrument_tool()
+async def search_file_tool(ctx: RunContext[Dependencies], file_path: str, query: str):
+    """Return the passages of a .txt or .pdf file most relevant to the query, best first."""
+    logger.debug("search_file_tool called, %s, %s", file_path, query)
+    sections = None
+    if await asyncio.to_thread(get_text_index, file_path, build=False) is None:
+        # the index must be (re)built: extract its text in the parse executor, like the read tools
+        sections = await read_file(extract_sections, file_path)
+    file_data = await asyncio.to_thread(search_file, file_path, query, sections=sections)
+    return FileSuccess(file_content=file_data["file_content"] or file_data["summary"], summary=file_data["summary"])
+
 @file_reader_agent.output_validator
+@count_validator_retries("file_reader")
 def file_reader_agent_output_validator(ctx: RunContext[Dependencies], output: FileResponse) -> FileResponse:
     """
     Validates the parsed output object from the FileReaderAgent.
@@ -91,16 +176,16 @@ def file_reader_agent_output_validator(ctx: RunContext[Dependencies], output: Fi
     """
     if isinstance(output, InvalidRequest):
         # If pydantic-ai already determined it's an InvalidRequest, just return it.
-        print(f"FileReaderAgent Result Validator: Received InvalidRequest: {output.error_message}")
+        logger.info("FileReaderAgent Result Validator: Received InvalidRequest: %s", output.error_message)
         return output
     
     if isinstance(output, FileSuccess):
         # Perform additional validation on the FileSuccess object if needed.
         # For example, ensure critical fields are not empty or have expected formats.
         if not output.file_content:
-            print("FileReaderAgent Result Validator: No file in the directory can be found.")
+            logger.warning("FileReaderAgent Result Validator: No file in the directory can be found.")
             return InvalidRequest(error_message="No file in the directory can be found.")
         
-        print("FileReaderAgent Result Validator: FileSuccess object passed custom validation.")
+        logger.debug("FileReaderAgent Result Validator: FileSuccess object passed custom validation.")
         return output
     
\ No newline at end of file
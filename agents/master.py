@@ -13,6 +13,7 @@ from agents import  sql_query_creator, file_reader
 from agents.sql_query_creator import sql_query_creator_agent, SQLResponse
 from agents.file_reader import file_reader_agent,  FileResponse
 from util_functions.file_operations import list_files
+from util_functions.instrumentation import count_validator_retries
 
 # define which agent
 SQL_AGENT = "sql_agent"
@@ -20,6 +21,13 @@ FILE_AGENT = "file_agent"
 BOTH_AGENT = "both_agent"
 NONE = 'none'
 
+# Trigger words shown to the model in the prompt, also used by the local fast-path router
+SQL_TRIGGER_WORDS = ["how many genres", "list tables", "describe table", "run query", "database", "SQL", "db"]
+FILE_TRIGGER_WORDS = ["read file", "summarize file", "content of", "information from", "PDF", "CSV", "TXT", "JSON", "file", "document", "report"]
+
+def quoted(words: list[str]) -> str:
+    return ", ".join(f'"{word}"' for word in words)
+
 class MasterAgentResponse(BaseModel):
     agent: str
 
@@ -30,6 +38,7 @@ class MasterDependencies:
 
 master_agent = Agent(
     model=OPENAI_MODEL,
+    name="master",
     output_type=MasterAgentResponse,
     result_tool_description="To decide which agent to use.",
     result_retries=3,
@@ -54,8 +63,8 @@ def master_system_prompt(ctx: RunContext[MasterDependencies]) -> str:
 
     **Instructions:**
     1. Carefully analyze the user's request to determine the primary intent.
-    2. If the request involves querying a database (e.g., "how many genres", "list tables", "describe table", "run query", "database", "SQL", "db"), output `{SQL_AGENT}`.
-    3. If the request involves reading or summarizing content from files (e.g., "read file", "summarize file", "content of", "information from", "PDF", "CSV", "TXT", "JSON", "file", "document", "report"), output `{FILE_AGENT}`.
+    2. If the request involves querying a database (e.g., {quoted(SQL_TRIGGER_WORDS)}), output `{SQL_AGENT}`.
+    3. If the request involves reading or summarizing content from files (e.g., {quoted(FILE_TRIGGER_WORDS)}), output `{FILE_AGENT}`.
     4. If the request clearly involves both database interaction AND file content reading (e.g., "genres and summary of file", "SQL query and read document", "database and file content"), output `{BOTH_AGENT}`.
     5. If the request is ambiguous, prioritize the most direct interpretation.
     6. The output of the chosen sub-agent will be wrapped in a `MasterAgentResponse`.
@@ -66,10 +75,12 @@ def master_system_prompt(ctx: RunContext[MasterDependencies]) -> str:
     """
 
 @master_agent.output_validator
+@count_validator_retries("master")
 def validate_result(ctx: RunContext[None], response: MasterAgentResponse) -> MasterAgentResponse:
-    if response.agent not in [SQL_AGENT, FILE_AGENT, BOTH_AGENT]:
+    # NONE is a valid answer the prompt asks for; rejecting it only burns retries
+    if response.agent not in [SQL_AGENT, FILE_AGENT, BOTH_AGENT, NONE]:
         raise ModelRetry(
-            f"Invalid action. Please choose from `{SQL_AGENT}`, `{FILE_AGENT}`, or `{BOTH_AGENT}``"
+            f"Invalid action. Please choose from `{SQL_AGENT}`, `{FILE_AGENT}`, `{BOTH_AGENT}` or `{NONE}`"
         )
 
     return response
\ No newline at end of file
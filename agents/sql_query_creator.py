@@ -1,13 +1,17 @@
+import os
 import sys
+import asyncio
+import logging
 
 # adding Folder_2 to the system path
 # sys.path.insert(0, 'utils')
 from util_functions.sql_operations import list_tables, describe_table, run_sql_query
+from util_functions.schema_catalog import schema_digest_for
+from util_functions.instrumentation import instrument_tool, count_validator_retries
 from models import OPENAI_MODEL, SQLSuccessWithInsights
 
 from dotenv import load_dotenv
 from dataclasses import dataclass
-import pandas as pd
 from pydantic import BaseModel, Field
 from typing_extensions import Annotated, TypeAlias, Union, Optional
 from annotated_types import MinLen
@@ -17,6 +21,9 @@ from sqlalchemy import Engine, create_engine
 
 load_dotenv("/mnt/c/Projects/Pydantic_Langgraph_SQL_and_File_Reader_Agents/.env")
 
+# Tool calls are logged at DEBUG; their timings and sizes are in util_functions.instrumentation
+logger = logging.getLogger(__name__)
+
 class SQLSuccess(BaseModel):
     sql_query: Annotated[str, MinLen(1)] = Field(alias='sql_query', description='SQL query to run')
     detail: str = Field(alias='detail', description='Explanation of the SQL query, steps taken, the result of the query (JSON)')
@@ -29,62 +36,90 @@ SQLResponse: TypeAlias = Union[
                                InvalidRequest, 
                                SQLSuccessWithInsights]
 
+# Put a precomputed schema digest in the system prompt instead of having the model
+# call list_tables_tool / describe_table_tool first. Schemas over SCHEMA_DIGEST_MAX_CHARS
+# fall back to the tools.
+SCHEMA_DIGEST_MODE = os.getenv("SQL_SCHEMA_DIGEST", "0") == "1"
+
 @dataclass
 class Dependencies:
     db_engine: Engine
+    schema_digest: Optional[str] = None
+
+def build_dependencies(db_engine: Engine, schema_digest_mode: bool = SCHEMA_DIGEST_MODE) -> Dependencies:
+    """Build the agent dependencies, attaching the schema digest when digest mode is on."""
+    schema_digest = schema_digest_for(db_engine) if schema_digest_mode else None
+    return Dependencies(db_engine=db_engine, schema_digest=schema_digest)
 
 sql_query_creator_agent = Agent(
     model=OPENAI_MODEL,
+    name="sql_query_creator",
     output_type=SQLResponse,
     result_retries=3,
 )
 
+def schema_steps(schema_digest: Optional[str]) -> str:
+    if schema_digest is None:
+        return """\
+    1.  **List Tables:** If you need to know the available tables, use the `list_tables_tool`.
+    2.  **Describe Table:** To understand the schema of specific table(s) relevant to the user's request, use the `describe_table_tool` for each of them."""
+    return f"""\
+    1.  **Schema:** The complete database schema is listed below, one table per line as `table(column type [PK] [-> referenced_table.column], ...) ~row count`. Use it directly; do NOT call `list_tables_tool`.
+    2.  **Describe Table:** Only call `describe_table_tool` if a detail you need (e.g. nullability or defaults) is missing from the schema below.
+
+    Schema digest:
+    {schema_digest}"""
+
 @sql_query_creator_agent.system_prompt
-def system_prompt() -> str:
+def system_prompt(ctx: RunContext[Dependencies]) -> str:
     return f"""\
     You are an AI agent equipped with database tools. Your goal is to help users interact with a database by generating and executing SQL queries, and if requested, facilitate chart generation.
 
     Follow these steps meticulously:
-    1.  **List Tables:** If you need to know the available tables, use the `list_tables_tool`.
-    2.  **Describe Table:** To understand the schema of specific table(s) relevant to the user's request, use the `describe_table_tool` for each of them.
+{schema_steps(ctx.deps.schema_digest)}
     3.  **Handle Sales/Revenue Queries:** If the user's request involves "sales", "revenue", or "total amount", remember that this data is typically derived from the `invoice_line` table (which has `unit_price` and `quantity`). You will likely need to join `artist`, `album`, `track`, and `invoice_line` tables to fulfill such requests. Calculate sales as `SUM(invoice_line.unit_price * invoice_line.quantity)`.
-    4.  **Run SQL Query:** Construct the SQL query in Postgres syntax based on the user's request and the table schemas. Execute it using the `run_sql_tool`. This tool will return a JSON string of the query results (or an error/empty array if no data).
-    5.  **Analyze and Formulate Response (SQLSuccessWithInsights):** After successfully running the SQL query and obtaining the JSON result, analyze the data to extract meaningful insights.
-        a.  **Data Analysis:**
-            -   Identify key metrics (e.g., sums, averages, counts, min/max values).
-            -   Look for trends over time (if date columns are present).
-            -   Identify top N or bottom N items.
-            -   Note any significant distributions or outliers.
+    4.  **Run SQL Query:** Construct the SQL query in Postgres syntax based on the user's request and the table schemas. Execute it using the `run_sql_tool`. The query runs read-only and only the first `limit` rows are fetched. This tool will return a JSON string with the `columns` once and the fetched `rows` as arrays of values in that column order, `returned_rows`, the `total_rows` of the full result and whether it was `truncated` (or an error/empty `rows` if no data). For large results only the first and last rows are included: `omitted_rows` rows after row number `omitted_after_row` were left out, and `summary` gives min/max/mean/sum (numeric columns) or distinct counts (other columns) over all returned rows. Do not add your own LIMIT just to preview data; use the `limit` argument instead. Before running, each query's EXPLAIN plan is checked against cost limits: if the result has a `guard` object, the query was over budget and fewer rows were fetched (say so in `detail`); if it returns an `error` with a `guard` object, the query was not run. Read the guard's `code`, `cross_joins`, estimates and `hint`, fix the query (e.g. add the missing join condition or a filter) and call `run_sql_tool` again.
+    5.  **Analyze and Formulate Response (SQLSuccessWithInsights):** After successfully running the SQL query and obtaining the JSON result, turn the pre-computed `insights` block into meaningful insights.
+        a.  **Data Analysis:** The statistics are already computed for you; use their numbers as given instead of calculating your own from the rows:
+            -   `columns`: per-column min/max/mean/median/std/sum (numbers), date ranges (dates), distinct counts and most common values (text).
+            -   `measures.<column>.ranking`: the `top` and `bottom` items as [label, value], the `gaps` between consecutive ranks and the `top_share_of_total`.
+            -   `measures.<column>.trends.<date column>`: per-period totals with the `first`, `last`, `peak` and `low` periods, `change_pct` and `slope_per_period`.
+            -   `measures.<column>.outliers`: values outside the `iqr_bounds` or more than 3 standard deviations from the mean, with `examples`.
+            -   The statistics cover the `rows_analyzed` fetched rows; say so when the result was `truncated`. If there is no `insights` block (a single row), read the values directly.
             -   Consider the user's original request to focus insights on their intent.
-        b.  **Insight Generation:** Populate the `data_insights` field with concise, clear, and actionable observations from the data. Each insight should be a separate string in the list.
+        b.  **Insight Generation:** Populate the `data_insights` field with concise, clear, and actionable observations written from these figures. Each insight should be a separate string in the list.
         c.  **Chart Suggestions:** Based on the data and insights, suggest appropriate chart types and the columns that should be used for X-axis, Y-axis, and series. Populate the `chart_suggestions` field.
         d.  The `detail` field should still contain:
             - An explanation of the SQL query and the steps taken.
             - The SQL query that was executed.
-            - The complete JSON string result from `run_sql_tool`. This JSON string should be presented clearly within a JSON markdown code block.
+            - A short description of the result (number of rows and the values that answer the request). Do not copy the JSON from `run_sql_tool` into `detail`; the caller can re-run `sql_query` to get the rows.
         e. If at any stage an error occurs (e.g., `run_sql_tool` returns an error) or a query yields no data (after `run_sql_tool`), explain this in the `detail` field of `SQLSuccess` or use an `InvalidRequest` response if appropriate (e.g., user request is malformed).
     
     """
 
 @sql_query_creator_agent.tool
-def list_tables_tool(ctx: RunContext[Dependencies]) -> str:
-    print('list_tables_tool called')
+@instrument_tool()
+async def list_tables_tool(ctx: RunContext[Dependencies]) -> str:
     """Use this function to get a list of table names in the database. """
-    return list_tables(ctx.deps.db_engine)
+    logger.debug("list_tables_tool called")
+    return await asyncio.to_thread(list_tables, ctx.deps.db_engine)
 
 @sql_query_creator_agent.tool
-def describe_table_tool(ctx: RunContext[Dependencies], table_name: str) -> str:
-    print('describe_table_tool called', table_name)
+@instrument_tool()
+async def describe_table_tool(ctx: RunContext[Dependencies], table_name: str) -> str:
     """Use this function to get a description of a table in the database."""
-    return describe_table(ctx.deps.db_engine, table_name)
+    logger.debug("describe_table_tool called, %s", table_name)
+    return await asyncio.to_thread(describe_table, ctx.deps.db_engine, table_name)
 
 @sql_query_creator_agent.tool
-def run_sql_tool(ctx: RunContext[Dependencies], query: str, limit: int = 10) -> str:
-    print('run_sql_tool called', query)
-    """Use this function to run a SQL query on the database. """
-    return run_sql_query(ctx.deps.db_engine, query, limit)
+@instrument_tool()
+async def run_sql_tool(ctx: RunContext[Dependencies], query: str, limit: int = 10) -> str:
+    """Use this function to run a read-only SQL query on the database and fetch at most `limit` rows."""
+    logger.debug("run_sql_tool called, %s", query)
+    return await asyncio.to_thread(run_sql_query, ctx.deps.db_engine, query, limit)
 
 @sql_query_creator_agent.output_validator
+@count_validator_retries("sql_query_creator")
 def sql_query_creator_agent_output_validator(ctx: RunContext[Dependencies], output: SQLResponse) -> SQLResponse:
     """
     Validates the parsed output object from the SQLAgent.
@@ -93,15 +128,15 @@ def sql_query_creator_agent_output_validator(ctx: RunContext[Dependencies], outp
     """
     if isinstance(output, InvalidRequest):
         # If pydantic-ai already determined it's an InvalidRequest, just return it.
-        print(f"SQLAgent Result Validator: Received InvalidRequest: {output.error_message}")
+        logger.info("SQLAgent Result Validator: Received InvalidRequest: %s", output.error_message)
         return output
     
     if isinstance(output, (SQLSuccess, SQLSuccessWithInsights)):
         # Perform additional validation on the SQLSuccess or SQLSuccessWithInsights object if needed.
         # For example, ensure critical fields are not empty or have expected formats.
         if not output.sql_query:
-            print("SQLAgent Result Validator: SQLSuccess/SQLSuccessWithInsights object has an empty sql_query.")
+            logger.warning("SQLAgent Result Validator: SQLSuccess/SQLSuccessWithInsights object has an empty sql_query.")
             return InvalidRequest(error_message="SQLSuccess/SQLSuccessWithInsights object has an empty sql_query.")
         
-        print("SQLAgent Result Validator: SQLSuccess/SQLSuccessWithInsights object passed custom validation.")
+        logger.debug("SQLAgent Result Validator: SQLSuccess/SQLSuccessWithInsights object passed custom validation.")
         return output
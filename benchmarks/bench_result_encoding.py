@@ -0,0 +1,62 @@
+"""Compare the tokens of SQL results in the old per-row records format and the columnar format.
+
+Runs a few representative queries on the SQLite Chinook fixture and encodes each result
+both ways. Tokens are counted with tiktoken (o200k_base, the gpt-4o encoding) when it is
+installed, otherwise estimated as characters / 4.
+
+    python -m benchmarks.bench_result_encoding
+"""
+import time
+
+from benchmarks.chinook_fixture import temporary_chinook
+from benchmarks.bench_schema_digest import SALES_QUERY
+from util_functions.engine_registry import get_engine
+from util_functions.result_encoding import encode_columnar, encode_records
+from util_functions.sql_operations import execute_query
+
+QUERIES = {
+    "sales by artist (10 rows)": (SALES_QUERY, 10),
+    "sales by artist (100 rows)": (SALES_QUERY, 100),
+    "track details (50 rows)": ("SELECT * FROM track", 50),
+    "track details (1000 rows)": ("SELECT * FROM track", 1000),
+    "invoices with totals (200 rows)": ("SELECT invoice_id, customer_id, invoice_date, billing_country, total FROM invoice", 200),
+}
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKENIZER = "tiktoken o200k_base"
+except ImportError:
+    def count_tokens(text: str) -> int:
+        return max(1, len(text) // 4)
+
+    TOKENIZER = "characters / 4"
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    output = function(*args, **kwargs)
+    return output, (time.perf_counter() - start) * 1000
+
+
+def main():
+    db_engine = get_engine(temporary_chinook())
+    print(f"tokens counted with {TOKENIZER}")
+    print(f"{'query':34} {'records':>9} {'columnar':>9} {'budgeted':>9} {'saved':>7} {'records ms':>11} {'columnar ms':>12}")
+    for name, (query, limit) in QUERIES.items():
+        result = execute_query(db_engine, query, limit)
+        args = (result.columns, result.rows, result.total_rows, result.truncated)
+        records, records_ms = timed(encode_records, *args)
+        columnar, columnar_ms = timed(encode_columnar, *args, token_budget=None)
+        budgeted = encode_columnar(*args)
+        before, after, trimmed = count_tokens(records), count_tokens(columnar), count_tokens(budgeted)
+        print(f"{name:34} {before:>9} {after:>9} {trimmed:>9} {1 - trimmed / before:>7.0%} {records_ms:>11.2f} {columnar_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
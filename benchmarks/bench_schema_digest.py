@@ -0,0 +1,97 @@
+"""Compare model round trips and tokens for the SQL agent with and without the schema digest.
+
+A scripted FunctionModel plays the part of the LLM and follows the system prompt:
+without a digest it lists tables and describes each table it needs before running the
+query; with a digest it goes straight to `run_sql_tool`. The database is the SQLite
+Chinook fixture, so no Azure OpenAI or Postgres is needed.
+
+    python -m benchmarks.bench_schema_digest
+"""
+import os
+import time
+import asyncio
+
+os.environ.setdefault("AZURE_OPENAI_KEY", "offline-benchmark")
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agents.sql_query_creator import sql_query_creator_agent, build_dependencies
+from benchmarks.chinook_fixture import temporary_chinook
+from util_functions.engine_registry import get_engine
+
+REQUEST = "Need to know about total album sales by artist"
+SALES_TABLES = ["artist", "album", "track", "invoice_line"]
+SALES_QUERY = (
+    "SELECT ar.name AS artist_name, SUM(il.unit_price * il.quantity) AS total_sales "
+    "FROM artist ar JOIN album al ON ar.artist_id = al.artist_id "
+    "JOIN track t ON al.album_id = t.album_id "
+    "JOIN invoice_line il ON t.track_id = il.track_id "
+    "GROUP BY ar.name ORDER BY total_sales DESC"
+)
+
+
+def output_tool_name(info: AgentInfo, model_name: str) -> str:
+    output_tools = getattr(info, "output_tools", None) or info.result_tools
+    return next(tool.name for tool in output_tools if tool.name.endswith(model_name))
+
+
+def scripted_sql_agent(messages: list, info: AgentInfo) -> ModelResponse:
+    system_prompt = ""
+    returned = []
+    for message in messages:
+        if not isinstance(message, ModelRequest):
+            continue
+        for part in message.parts:
+            if isinstance(part, SystemPromptPart):
+                system_prompt += part.content
+            elif isinstance(part, ToolReturnPart):
+                returned.append(part.tool_name)
+
+    if "run_sql_tool" in returned:
+        return ModelResponse(parts=[ToolCallPart(
+            output_tool_name(info, "SQLSuccess"),
+            {"sql_query": SALES_QUERY, "detail": "Total sales per artist from invoice_line."},
+        )])
+
+    if "Schema digest:" not in system_prompt:
+        if "list_tables_tool" not in returned:
+            return ModelResponse(parts=[ToolCallPart("list_tables_tool", {})])
+        described = returned.count("describe_table_tool")
+        if described < len(SALES_TABLES):
+            return ModelResponse(parts=[ToolCallPart("describe_table_tool", {"table_name": SALES_TABLES[described]})])
+
+    return ModelResponse(parts=[ToolCallPart("run_sql_tool", {"query": SALES_QUERY, "limit": 10})])
+
+
+async def run_once(db_engine, schema_digest_mode: bool) -> dict:
+    deps = build_dependencies(db_engine, schema_digest_mode=schema_digest_mode)
+    start = time.perf_counter()
+    with sql_query_creator_agent.override(model=FunctionModel(scripted_sql_agent)):
+        result = await sql_query_creator_agent.run(REQUEST, deps=deps)
+    usage = result.usage()
+    return {
+        "mode": "digest" if deps.schema_digest else "tools",
+        "model_requests": usage.requests,
+        "request_tokens": usage.request_tokens,
+        "response_tokens": usage.response_tokens,
+        "total_tokens": usage.total_tokens,
+        "wall_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+async def main():
+    db_engine = get_engine(temporary_chinook())
+    tools = await run_once(db_engine, schema_digest_mode=False)
+    digest = await run_once(db_engine, schema_digest_mode=True)
+
+    for row in (tools, digest):
+        print(row)
+    print(
+        f"round trips: {tools['model_requests']} -> {digest['model_requests']}, "
+        f"total tokens: {tools['total_tokens']} -> {digest['total_tokens']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Track cold-start import cost of the app's entry points.
+
+Each target is imported in a fresh interpreter with `python -X importtime`; the
+cumulative import time of the target module is taken from that report (median over the
+repeats) along with the slowest top-level dependencies. It also checks that heavy
+optional packages (pandas, pypdf, the openai SDK) are not imported at startup,
+since they are meant to load on first use.
+
+Results are compared with benchmarks/startup_baseline.json; the exit code is 1 when a
+target got slower than the tolerance allows or a deferred package is imported eagerly.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --save-baseline
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+TARGETS = ["models", "agents.master", "agents.sql_query_creator", "agents.file_reader", "main_langgraph", "main_batch"]
+DEFERRED_PACKAGES = ["pandas", "pypdf", "openai"]
+TIME_TOLERANCE = 0.30
+NOISE_FLOOR_MS = 30.0
+
+
+def import_report(module: str) -> list[tuple[int, int, str]]:
+    """(self_us, cumulative_us, name) for every module imported by `import module` in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def measure(module: str, repeats: int) -> dict:
+    totals = []
+    rows = []
+    for _ in range(repeats):
+        rows = import_report(module)
+        totals.append(next(cumulative for _, cumulative, name in rows if name.strip() == module))
+    loaded = {name.strip() for _, _, name in rows}
+    # direct dependencies are indented by two spaces more than the target itself
+    top_level = sorted(
+        ((cumulative, name.strip()) for _, cumulative, name in rows if name.startswith("  ") and not name.startswith("    ")),
+        reverse=True,
+    )[:5]
+    return {
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "modules": len(loaded),
+        "slowest_dependencies": {name: round(cumulative / 1000, 1) for cumulative, name in top_level},
+        "eager_deferred_packages": [package for package in DEFERRED_PACKAGES if package in loaded],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = {module: measure(module, args.repeats) for module in TARGETS}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["targets"]
+
+    print(f"{'target':28} {'import ms':>10} {'modules':>8} {'vs base':>8}  slowest dependencies")
+    for module, result in results.items():
+        base = baseline.get(module)
+        change = f"{result['import_ms'] / base['import_ms']:.2f}x" if base and base["import_ms"] else "-"
+        slowest = ", ".join(f"{name} {ms}ms" for name, ms in result["slowest_dependencies"].items())
+        print(f"{module:28} {result['import_ms']:>10} {result['modules']:>8} {change:>8}  {slowest}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "targets": results}, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    problems = []
+    for module, result in results.items():
+        if result["eager_deferred_packages"]:
+            problems.append(f"{module} imports {', '.join(result['eager_deferred_packages'])} at startup")
+        base = baseline.get(module)
+        if base and result["import_ms"] >= NOISE_FLOOR_MS and result["import_ms"] > base["import_ms"] * (1 + args.time_tolerance):
+            problems.append(f"{module}: {base['import_ms']}ms -> {result['import_ms']}ms")
+    if problems:
+        print("\nRegressions:")
+        for line in problems:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions" if baseline else "\nNo baseline to compare with; run with --save-baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
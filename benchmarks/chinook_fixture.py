@@ -0,0 +1,166 @@
+"""SQLite stand-in for the Chinook Postgres database used by the SQL agent.
+
+Same table and column names as `chinook_auto_increment` (snake_case), filled with
+deterministic synthetic rows so benchmarks need no external database.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+
+SCHEMA = """
+CREATE TABLE artist (
+    artist_id INTEGER PRIMARY KEY,
+    name VARCHAR(120)
+);
+CREATE TABLE album (
+    album_id INTEGER PRIMARY KEY,
+    title VARCHAR(160) NOT NULL,
+    artist_id INTEGER NOT NULL REFERENCES artist (artist_id)
+);
+CREATE TABLE genre (
+    genre_id INTEGER PRIMARY KEY,
+    name VARCHAR(120)
+);
+CREATE TABLE media_type (
+    media_type_id INTEGER PRIMARY KEY,
+    name VARCHAR(120)
+);
+CREATE TABLE track (
+    track_id INTEGER PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    album_id INTEGER REFERENCES album (album_id),
+    media_type_id INTEGER NOT NULL REFERENCES media_type (media_type_id),
+    genre_id INTEGER REFERENCES genre (genre_id),
+    composer VARCHAR(220),
+    milliseconds INTEGER NOT NULL,
+    bytes INTEGER,
+    unit_price NUMERIC(10, 2) NOT NULL
+);
+CREATE TABLE employee (
+    employee_id INTEGER PRIMARY KEY,
+    last_name VARCHAR(20) NOT NULL,
+    first_name VARCHAR(20) NOT NULL,
+    title VARCHAR(30),
+    reports_to INTEGER REFERENCES employee (employee_id),
+    hire_date TIMESTAMP,
+    country VARCHAR(40)
+);
+CREATE TABLE customer (
+    customer_id INTEGER PRIMARY KEY,
+    first_name VARCHAR(40) NOT NULL,
+    last_name VARCHAR(20) NOT NULL,
+    company VARCHAR(80),
+    city VARCHAR(40),
+    country VARCHAR(40),
+    email VARCHAR(60) NOT NULL,
+    support_rep_id INTEGER REFERENCES employee (employee_id)
+);
+CREATE TABLE invoice (
+    invoice_id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL REFERENCES customer (customer_id),
+    invoice_date TIMESTAMP NOT NULL,
+    billing_city VARCHAR(40),
+    billing_country VARCHAR(40),
+    total NUMERIC(10, 2) NOT NULL
+);
+CREATE TABLE invoice_line (
+    invoice_line_id INTEGER PRIMARY KEY,
+    invoice_id INTEGER NOT NULL REFERENCES invoice (invoice_id),
+    track_id INTEGER NOT NULL REFERENCES track (track_id),
+    unit_price NUMERIC(10, 2) NOT NULL,
+    quantity INTEGER NOT NULL
+);
+CREATE TABLE playlist (
+    playlist_id INTEGER PRIMARY KEY,
+    name VARCHAR(120)
+);
+CREATE TABLE playlist_track (
+    playlist_id INTEGER NOT NULL REFERENCES playlist (playlist_id),
+    track_id INTEGER NOT NULL REFERENCES track (track_id),
+    PRIMARY KEY (playlist_id, track_id)
+);
+"""
+
+GENRES = ["Rock", "Jazz", "Metal", "Alternative & Punk", "Blues", "Latin", "Reggae", "Pop", "Classical"]
+COUNTRIES = ["USA", "Canada", "Brazil", "France", "Germany", "United Kingdom", "India", "Portugal"]
+
+
+def build_chinook(path: str, scale: int = 1, seed: int = 7) -> str:
+    """Create (or overwrite) a Chinook-shaped SQLite database at `path`.
+
+    Args :
+        path (str): Where to write the database file.
+        scale (int): Multiplier for the number of artists, tracks and invoices.
+        seed (int): Random seed, so every build produces the same rows.
+
+    Returns :
+        str: The SQLAlchemy URL of the database.
+    """
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+
+    n_artists = 275 * scale
+    n_albums = 347 * scale
+    n_tracks = 3503 * scale
+    n_customers = 59 * scale
+    n_invoices = 412 * scale
+
+    connection.executemany("INSERT INTO artist VALUES (?, ?)",
+                           [(i, f"Artist {i}") for i in range(1, n_artists + 1)])
+    connection.executemany("INSERT INTO album VALUES (?, ?, ?)",
+                           [(i, f"Album {i}", rng.randint(1, n_artists)) for i in range(1, n_albums + 1)])
+    connection.executemany("INSERT INTO genre VALUES (?, ?)",
+                           [(i, name) for i, name in enumerate(GENRES, start=1)])
+    connection.executemany("INSERT INTO media_type VALUES (?, ?)",
+                           [(1, "MPEG audio file"), (2, "Protected AAC audio file"), (3, "AAC audio file")])
+    connection.executemany(
+        "INSERT INTO track VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (i, f"Track {i}", rng.randint(1, n_albums), rng.randint(1, 3), rng.randint(1, len(GENRES)),
+             None, rng.randint(60_000, 420_000), rng.randint(1_000_000, 12_000_000), rng.choice((0.99, 1.99)))
+            for i in range(1, n_tracks + 1)
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO employee VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(i, f"Last{i}", f"First{i}", "Sales Support Agent", None if i == 1 else 1, "2003-05-01", "Canada")
+         for i in range(1, 9)],
+    )
+    connection.executemany(
+        "INSERT INTO customer VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(i, f"First{i}", f"Last{i}", None, f"City{i % 20}", rng.choice(COUNTRIES), f"customer{i}@example.com",
+          rng.randint(3, 5)) for i in range(1, n_customers + 1)],
+    )
+
+    invoices, lines = [], []
+    line_id = 1
+    for invoice_id in range(1, n_invoices + 1):
+        total = 0.0
+        for _ in range(rng.randint(1, 14)):
+            price = rng.choice((0.99, 1.99))
+            lines.append((line_id, invoice_id, rng.randint(1, n_tracks), price, 1))
+            total += price
+            line_id += 1
+        invoices.append((invoice_id, rng.randint(1, n_customers),
+                         f"20{rng.randint(21, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 00:00:00",
+                         None, rng.choice(COUNTRIES), round(total, 2)))
+    connection.executemany("INSERT INTO invoice VALUES (?, ?, ?, ?, ?, ?)", invoices)
+    connection.executemany("INSERT INTO invoice_line VALUES (?, ?, ?, ?, ?)", lines)
+
+    connection.executemany("INSERT INTO playlist VALUES (?, ?)", [(1, "Music"), (2, "Favourites")])
+    connection.executemany("INSERT INTO playlist_track VALUES (?, ?)",
+                           [(1 + (i % 2), i) for i in range(1, n_tracks + 1)])
+    connection.commit()
+    connection.close()
+    return f"sqlite:///{path}"
+
+
+def temporary_chinook(scale: int = 1) -> str:
+    """Build a Chinook fixture in the temp directory and return its URL."""
+    path = os.path.join(tempfile.gettempdir(), f"chinook_bench_x{scale}.sqlite")
+    return build_chinook(path, scale=scale)
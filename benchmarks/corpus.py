@@ -0,0 +1,120 @@
+"""Synthetic, scaled copies of the sample `files/` corpus for benchmarks.
+
+CSVs are scaled by repeating the data rows of a sample file, JSON arrays by repeating
+their items; PDFs are written by hand
+(one Helvetica text stream per page) so no PDF writer library is needed. Generated files
+live in a temp directory and are reused while their parameters match.
+"""
+import os
+import json
+import random
+import tempfile
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files")
+SAMPLE_CSV = os.path.join(SAMPLE_DIR, "ai_job_dataset.csv")
+SAMPLE_JSON = os.path.join(SAMPLE_DIR, "structured_bike_data_cleaned.json")
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), "agents_bench_corpus")
+
+WORDS = (
+    "agent pipeline cache latency throughput schema query index token model request file "
+    "table column parser stream budget profile retry batch memory branch router summary "
+    "vector instruction register processor memory hazard forwarding superscalar"
+).split()
+
+
+def scaled_csv(factor: int, source: str = SAMPLE_CSV, directory: str = CORPUS_DIR) -> str:
+    """Write `source` with its data rows repeated `factor` times and return the path."""
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(directory, f"{name}_x{factor}.csv")
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+        return path
+
+    with open(source, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for _ in range(factor):
+            f.write(body)
+    os.replace(tmp_path, path)
+    return path
+
+
+def scaled_json(factor: int, source: str = SAMPLE_JSON, directory: str = CORPUS_DIR) -> str:
+    """Write the top-level array of `source` with its items repeated `factor` times and return the path."""
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(directory, f"{name}_x{factor}.json")
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+        return path
+
+    with open(source) as f:
+        items = [json.dumps(item, indent=4) for item in json.load(f)]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write("[\n")
+        for copy in range(factor):
+            f.write(",\n".join(items))
+            f.write(",\n" if copy < factor - 1 else "\n")
+        f.write("]\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _page_lines(rng: random.Random, page_number: int, lines: int = 40) -> list[str]:
+    text = [f"Page {page_number}"]
+    for _ in range(lines):
+        text.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+    return text
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(pages: int, directory: str = CORPUS_DIR, seed: int = 7) -> str:
+    """Write a text PDF with `pages` pages of deterministic filler and return the path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"synthetic_{pages}_pages.pdf")
+    if os.path.exists(path):
+        return path
+
+    rng = random.Random(seed)
+    # objects: 1 catalog, 2 pages tree, 3 font, then a (page, content) pair per page
+    objects: list[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for number in range(1, pages + 1):
+        stream = ["BT /F1 10 Tf 14 TL 50 800 Td"]
+        stream += [f"({_escape(line)}) '" for line in _page_lines(rng, number)]
+        stream.append("ET")
+        content = "\n".join(stream).encode()
+        content_id = len(objects) + 2
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(output)
+    os.replace(tmp_path, path)
+    return path
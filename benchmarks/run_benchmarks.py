@@ -0,0 +1,321 @@
+"""Offline benchmark suite: file parsing, search, SQL and full agent runs, no external services.
+
+Agents use scripted FunctionModels (see `benchmarks.stub_models`) with a configurable
+per-request latency, the database is the SQLite Chinook fixture, and files are the
+sample `files/` corpus plus scaled copies (10x/100x CSV rows, many-page PDFs).
+
+For every case it reports the median and best wall time over the repeats, the
+tracemalloc peak of one extra traced run, and throughput. Results are compared with a
+stored baseline and the exit code is 1 when a case got slower or heavier than the
+tolerance allows, so CI can flag regressions.
+
+    python -m benchmarks.run_benchmarks                   # compare with benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --quick           # skip the 100x CSV and 1000-page PDF
+    python -m benchmarks.run_benchmarks --save-baseline   # record a new baseline
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Keep every cache in memory and results out of the working tree
+os.environ.setdefault("AZURE_OPENAI_KEY", "offline-benchmark")
+os.environ["TEXT_INDEX_DIR"] = ""
+os.environ.pop("CONTENT_CACHE_PATH", None)
+os.environ.pop("FILE_INDEX_PATH", None)
+os.environ.setdefault("RESULT_SINK_PATH", os.path.join(tempfile.gettempdir(), "agents_bench_results.jsonl"))
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(tempfile.gettempdir(), "agents_bench_checkpoints.sqlite"))
+
+from langchain_core.messages import HumanMessage
+
+from main_langgraph import invoke_graph
+from benchmarks.chinook_fixture import temporary_chinook
+from benchmarks.corpus import SAMPLE_DIR, scaled_csv, scaled_json, synthetic_pdf
+from benchmarks.bench_schema_digest import SALES_QUERY
+from benchmarks.stub_models import stub_models
+from util_functions import text_index
+from util_functions.content_cache import ContentCache
+from util_functions.parse_executor import ParseExecutor
+from util_functions.engine_registry import get_engine
+from util_functions.file_index import FileIndex
+from util_functions.file_operations import read_csv, read_json, read_json_path, read_pdf, read_pdf_pages, read_txt
+from util_functions.query_cache import query_cache
+from util_functions.schema_catalog import get_catalog, invalidate_catalog, schema_digest_for
+from util_functions.sql_operations import run_sql_query
+from util_functions.sql_guard import cost_guard
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TIME_TOLERANCE = 0.30  # fraction slower than baseline before a case counts as a regression
+MEMORY_TOLERANCE = 0.20
+NOISE_FLOOR_SECONDS = 0.005  # cases faster than this are too noisy to compare on time
+NOISE_FLOOR_KB = 256  # peak memory growth below this is run-to-run noise (async scheduling, GC timing)
+
+GRAPH_REQUESTS = [
+    "Need to know about total album sales by artist",
+    "What is in the bike data json file?",
+    "Summarize the risc txt file",
+    "Show total album sales by artist and read the ai job dataset csv",
+]
+
+
+@dataclass
+class Case:
+    stage: str
+    name: str
+    run: Callable  # sync function or coroutine function, called with no arguments
+    repeats: int = 5
+    units: float = 1.0  # work items per run, for throughput
+    unit_name: str = "ops"
+    setup: Optional[Callable] = None  # called before every run, outside the timing
+    teardown: Optional[Callable] = None  # called once after all cases, even when the case was filtered out
+    full_only: bool = False  # skipped with --quick
+
+
+def _call(function: Callable):
+    result = function()
+    if asyncio.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def measure(case: Case) -> dict:
+    timings = []
+    for _ in range(case.repeats):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        _call(case.run)
+        timings.append(time.perf_counter() - start)
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        _call(case.run)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "stage": case.stage,
+        "median_seconds": round(median, 6),
+        "best_seconds": round(min(timings), 6),
+        "repeats": case.repeats,
+        "peak_memory_kb": round(peak / 1024, 1),
+        "throughput": round(case.units / median, 2) if median else None,
+        "throughput_unit": f"{case.unit_name}/s",
+    }
+
+
+def file_cases(quick: bool) -> list[Case]:
+    csv_path = os.path.join(SAMPLE_DIR, "ai_job_dataset.csv")
+    json_path = os.path.join(SAMPLE_DIR, "structured_bike_data_cleaned.json")
+    txt_path = os.path.join(SAMPLE_DIR, "risc.txt")
+    pdf_path = os.path.join(SAMPLE_DIR, "Specific Agents Versus Generality.pdf")
+    cases = [
+        Case("parse", "read_csv x1", lambda: read_csv(csv_path), repeats=3, units=os.path.getsize(csv_path) / 1e6, unit_name="MB"),
+        Case("parse", "read_json", lambda: read_json(json_path), units=os.path.getsize(json_path) / 1e6, unit_name="MB"),
+        Case("parse", "read_txt", lambda: read_txt(txt_path), units=os.path.getsize(txt_path) / 1e6, unit_name="MB"),
+        Case("parse", "read_pdf sample", lambda: read_pdf(pdf_path)),
+    ]
+    for factor, repeats in ((10, 2), (100, 1)):
+        path = scaled_csv(factor)
+        cases.append(Case(
+            "parse", f"read_csv x{factor}", lambda path=path: read_csv(path), repeats=repeats,
+            units=os.path.getsize(path) / 1e6, unit_name="MB", full_only=factor == 100,
+        ))
+    for factor, repeats in ((10, 2), (100, 1)):
+        path = scaled_json(factor)
+        cases.append(Case(
+            "parse", f"read_json x{factor}", lambda path=path: read_json(path), repeats=repeats,
+            units=os.path.getsize(path) / 1e6, unit_name="MB", full_only=factor == 100,
+        ))
+        cases.append(Case(
+            "parse", f"read_json_path x{factor} (last item)",
+            lambda path=path, factor=factor: read_json_path(path, f"$[{561 * factor - 1}].name"), repeats=repeats,
+            units=os.path.getsize(path) / 1e6, unit_name="MB", full_only=factor == 100,
+        ))
+    for pages in (200, 1000):
+        path = synthetic_pdf(pages)
+        cases.append(Case("parse", f"read_pdf {pages} pages", lambda path=path: read_pdf(path), full_only=pages == 1000))
+        cases.append(Case(
+            "parse", f"read_pdf_pages {pages} pages (last 10)",
+            lambda path=path, pages=pages: read_pdf_pages(path, pages - 9, pages), units=10, unit_name="pages",
+            full_only=pages == 1000,
+        ))
+
+    # a CSV, a whole 200-page PDF and a JSON array, parsed concurrently with a cold cache
+    mixed = [(read_csv, scaled_csv(10)), (read_pdf_pages, synthetic_pdf(200), 1, 200, 10 ** 7), (read_json, scaled_json(10))]
+    for kind in ("thread", "process"):
+        executor = ParseExecutor(kind=kind, cache=ContentCache(persist_path=None))
+        asyncio.run(executor.read(read_txt, txt_path))  # start the workers outside the timing
+        cases.append(Case(
+            "parse", f"parse_executor {len(mixed)} files ({kind})", lambda executor=executor: executor.read_many(mixed),
+            repeats=2, units=len(mixed), unit_name="files", setup=executor.cache.clear,
+            # a process pool left to the garbage collector stops its workers while the interpreter
+            # exits, which can leave a worker that is never joined on Python 3.11
+            teardown=lambda executor=executor: executor.shutdown(wait=True),
+        ))
+
+    cache = ContentCache(persist_path=None)
+    cache.get_or_read(read_csv, csv_path)
+    cases.append(Case("cache", "content_cache hit (csv)", lambda: cache.get_or_read(read_csv, csv_path), repeats=50))
+
+    big_pdf = synthetic_pdf(200)
+    cases.append(Case(
+        "search", "search_file cold build (200 pages)", lambda: text_index.search_file(big_pdf, "pipeline hazard forwarding"),
+        repeats=3, setup=text_index._indexes.clear,
+    ))
+    cases.append(Case(
+        "search", "search_file warm (200 pages)", lambda: text_index.search_file(big_pdf, "pipeline hazard forwarding"),
+        repeats=20,
+    ))
+
+    index = FileIndex(SAMPLE_DIR)
+    index.refresh(force=True)
+    cases.append(Case("index", "file_index lookup", lambda: index.lookup("what is in the bike data"), repeats=200))
+    return [case for case in cases if not (quick and case.full_only)]
+
+
+def sql_cases(db_url: str) -> list[Case]:
+    engine = get_engine(db_url)
+
+    def cold_catalog():
+        invalidate_catalog(engine)
+        return get_catalog(engine)
+
+    return [
+        Case("sql", "catalog load", cold_catalog, repeats=5),
+        Case("sql", "schema digest", lambda: schema_digest_for(engine), repeats=20, setup=lambda: invalidate_catalog(engine)),
+        Case("sql", "run_sql_query uncached", lambda: run_sql_query(engine, SALES_QUERY, 10, use_cache=False), repeats=5),
+        Case("sql", "run_sql_query cached", lambda: run_sql_query(engine, SALES_QUERY, 10), repeats=50,
+             setup=lambda: run_sql_query(engine, SALES_QUERY, 10)),
+        Case("sql", "cost guard explain", lambda: cost_guard.check(engine, SALES_QUERY, 10), repeats=20, setup=cost_guard.clear),
+        Case("sql", "cost guard cached verdict", lambda: cost_guard.check(engine, SALES_QUERY, 10), repeats=50,
+             setup=lambda: cost_guard.check(engine, SALES_QUERY, 10)),
+    ]
+
+
+def graph_cases(db_url: str, concurrency: int, requests: int) -> list[Case]:
+    async def one(text: str):
+        return await invoke_graph({"request": [HumanMessage(content=text)], "db_engine": db_url, "files": SAMPLE_DIR})
+
+    async def batch():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(text: str):
+            async with semaphore:
+                return await one(text)
+
+        texts = [GRAPH_REQUESTS[i % len(GRAPH_REQUESTS)] for i in range(requests)]
+        await asyncio.gather(*(bounded(text) for text in texts))
+
+    def clear_caches():
+        query_cache.clear()
+
+    cases = [
+        Case("graph", f"graph {label}", lambda text=text: one(text), repeats=3, setup=clear_caches)
+        for label, text in zip(("sql", "file json", "file txt", "both"), GRAPH_REQUESTS)
+    ]
+    cases.append(Case(
+        "graph", f"graph batch {requests} requests x{concurrency}", batch, repeats=2,
+        units=requests, unit_name="requests", setup=clear_caches,
+    ))
+    return cases
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float, memory_tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if max(result["median_seconds"], base["median_seconds"]) >= NOISE_FLOOR_SECONDS and \
+                result["median_seconds"] > base["median_seconds"] * (1 + time_tolerance):
+            regressions.append(f"{name}: {base['median_seconds']}s -> {result['median_seconds']}s")
+        if result["peak_memory_kb"] > max(base["peak_memory_kb"] * (1 + memory_tolerance), base["peak_memory_kb"] + NOISE_FLOOR_KB):
+            regressions.append(f"{name}: peak {base['peak_memory_kb']}KB -> {result['peak_memory_kb']}KB")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    print(f"{'case':45} {'median s':>10} {'best s':>10} {'peak KB':>10} {'throughput':>18} {'vs base':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        change = f"{result['median_seconds'] / base['median_seconds']:.2f}x" if base and base["median_seconds"] else "-"
+        throughput = f"{result['throughput']} {result['throughput_unit']}" if result["throughput"] else "-"
+        print(f"{name:45} {result['median_seconds']:>10} {result['best_seconds']:>10} "
+              f"{result['peak_memory_kb']:>10} {throughput:>18} {change:>8}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="skip the largest synthetic inputs")
+    parser.add_argument("--stage", action="append", help="only run these stages (parse, cache, search, index, sql, graph)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated latency per model request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=16, help="requests in the graph batch case")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--output", help="also write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    db_url = temporary_chinook()
+    cases = file_cases(args.quick) + sql_cases(db_url)
+    cases += graph_cases(db_url, args.concurrency, args.requests)
+    selected = [case for case in cases if case.stage in args.stage] if args.stage else cases
+
+    results = {}
+    with stub_models(latency_ms=args.latency_ms):
+        for case in selected:
+            results[case.name] = measure(case)
+            print(f"  {case.name}: {results[case.name]['median_seconds']}s", file=sys.stderr)
+    for case in cases:
+        if case.teardown:
+            case.teardown()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+
+    print_table(results, baseline)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "latency_ms": args.latency_ms,
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions" if baseline else "\nNo baseline to compare with; run with --save-baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
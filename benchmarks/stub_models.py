@@ -0,0 +1,97 @@
+"""Scripted stand-ins for the Azure OpenAI model, for offline benchmarks.
+
+Each script is a FunctionModel function that follows the agent's system prompt the
+way the real model is expected to, with an optional sleep per model request to mimic
+network latency.
+"""
+import os
+import ast
+import asyncio
+from contextlib import ExitStack, contextmanager
+
+os.environ.setdefault("AZURE_OPENAI_KEY", "offline-benchmark")
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agents.master import master_agent, SQL_AGENT, FILE_AGENT, BOTH_AGENT, NONE
+from agents.sql_query_creator import sql_query_creator_agent
+from agents.file_reader import file_reader_agent
+from benchmarks.bench_schema_digest import output_tool_name, scripted_sql_agent
+
+READ_TOOLS = {"csv": "read_csv_tool", "json": "read_json_tool", "txt": "read_text_tool", "pdf": "read_pdf_tool"}
+SQL_WORDS = ("sales", "artist", "album", "track", "invoice", "customer", "genre", "table", "database")
+FILE_WORDS = ("file", "pdf", "csv", "txt", "json", "document", "bike", "risc", "job", "dataset")
+
+
+def _parts(messages: list):
+    for message in messages:
+        if isinstance(message, ModelRequest):
+            yield from message.parts
+
+
+def user_prompt(messages: list) -> str:
+    return next((part.content for part in _parts(messages) if isinstance(part, UserPromptPart)), "")
+
+
+def scripted_master(messages: list, info: AgentInfo) -> ModelResponse:
+    prompt = user_prompt(messages).lower()
+    wants_sql = any(word in prompt for word in SQL_WORDS)
+    wants_file = any(word in prompt for word in FILE_WORDS)
+    agent = BOTH_AGENT if wants_sql and wants_file else SQL_AGENT if wants_sql else FILE_AGENT if wants_file else NONE
+    return ModelResponse(parts=[ToolCallPart(output_tool_name(info, "MasterAgentResponse"), {"agent": agent})])
+
+
+def _available_files(messages: list) -> list[str]:
+    marker = "Here is a list of available files: "
+    for part in _parts(messages):
+        if isinstance(part, SystemPromptPart) and marker in part.content:
+            listing = part.content.split(marker, 1)[1].split("\n", 1)[0]
+            return ast.literal_eval(listing)
+    return []
+
+
+def scripted_file_reader(messages: list, info: AgentInfo) -> ModelResponse:
+    returned = [part for part in _parts(messages) if isinstance(part, ToolReturnPart)]
+    if returned:
+        content = returned[-1].content
+        file_content = getattr(content, "file_content", None) or str(content)
+        return ModelResponse(parts=[ToolCallPart(
+            output_tool_name(info, "FileSuccess"),
+            {"file_content": file_content, "summary": getattr(content, "summary", "")},
+        )])
+
+    prompt = user_prompt(messages).lower()
+    files = _available_files(messages)
+    words = set(prompt.replace("?", " ").split())
+    matches = [
+        path for path in files
+        if words & {token for token in os.path.splitext(os.path.basename(path))[0].lower().split("_") if len(token) > 3}
+    ]
+    if not matches:
+        return ModelResponse(parts=[ToolCallPart(
+            output_tool_name(info, "InvalidRequest"), {"error_message": "File not found in available files."}
+        )])
+    path = matches[0]
+    tool = READ_TOOLS.get(os.path.splitext(path)[1].lstrip(".").lower(), "read_text_tool")
+    return ModelResponse(parts=[ToolCallPart(tool, {"file_path": path})])
+
+
+def with_latency(function, latency_seconds: float):
+    """Wrap a script so every model request takes at least `latency_seconds`."""
+    async def delayed(messages: list, info: AgentInfo) -> ModelResponse:
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        return function(messages, info)
+    return delayed
+
+
+@contextmanager
+def stub_models(latency_ms: float = 0.0):
+    """Override the master, SQL and file reader agents with scripted models."""
+    latency = latency_ms / 1000
+    with ExitStack() as stack:
+        stack.enter_context(master_agent.override(model=FunctionModel(with_latency(scripted_master, latency))))
+        stack.enter_context(sql_query_creator_agent.override(model=FunctionModel(with_latency(scripted_sql_agent, latency))))
+        stack.enter_context(file_reader_agent.override(model=FunctionModel(with_latency(scripted_file_reader, latency))))
+        yield
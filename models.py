@@ -1,32 +1,85 @@
+import os
+import threading
 from pydantic import BaseModel, Field
-from typing import Annotated, List, Dict, Any, Optional, Union
+from typing import Annotated, List, Dict, Any, Optional, Union, Callable
 from annotated_types import MinLen
-from openai import AsyncAzureOpenAI, AzureOpenAI
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.google_gla import GoogleGLAProvider
-from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic_ai.models import Model
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.profiles import ModelProfile
+from pydantic_ai.profiles.openai import openai_model_profile
 
 from dotenv import load_dotenv
-import os
 
-load_dotenv('.env')
+AZURE_OPENAI_ENDPOINT = "https://llmcoechangemateopenai2.openai.azure.com/"
+AZURE_OPENAI_API_VERSION = "2024-10-21"
+AZURE_OPENAI_DEPLOYMENT = "gpt-4o"
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
 
-# GEMINI_MODEL = GeminiModel('gemini-2.0-flash', provider=GoogleGLAProvider(api_key=GEMINI_API_KEY))
+class LazyModel(WrapperModel):
+    """A model that is only built (client, provider, credentials) the first time it is used.
 
-async_client = AsyncAzureOpenAI(
-    azure_endpoint = "https://llmcoechangemateopenai2.openai.azure.com/",
-    api_key=AZURE_OPENAI_KEY,
-    api_version="2024-10-21",
-    azure_deployment='gpt-4o'
-)
+    `model_name`, `system` and `profile` are known up front, so agents can be created,
+    named and rate limited without building the client.
+    """
+
+    def __init__(self, factory: Callable[[], Model], model_name: str, system: str, profile: Optional[ModelProfile] = None):
+        self._factory = factory
+        self._model_name = model_name
+        self._system = system
+        self._profile = profile
+        self._model: Optional[Model] = None
+        self._lock = threading.Lock()
+
+    @property
+    def wrapped(self) -> Model:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._factory()
+        return self._model
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def system(self) -> str:
+        return self._system
+
+    @property
+    def profile(self) -> ModelProfile:
+        # Agent() reads the profile when it is constructed
+        return self._profile or self.wrapped.profile
+
+    def __repr__(self) -> str:
+        return f"LazyModel({self._system}:{self._model_name}, built={self._model is not None})"
+
+
+def build_openai_model() -> Model:
+    # Imported here: the openai SDK is the single largest import of the app
+    from openai import AsyncAzureOpenAI
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+    load_dotenv('.env')
+    async_client = AsyncAzureOpenAI(
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        api_key=os.getenv("AZURE_OPENAI_KEY"),
+        api_version=AZURE_OPENAI_API_VERSION,
+        azure_deployment=AZURE_OPENAI_DEPLOYMENT
+    )
+    return OpenAIModel(
+        AZURE_OPENAI_DEPLOYMENT,
+        provider=OpenAIProvider(openai_client=async_client),
+    )
+
+# GEMINI_MODEL = GeminiModel('gemini-2.0-flash', provider=GoogleGLAProvider(api_key=os.getenv("GEMINI_API_KEY")))
 
-OPENAI_MODEL = OpenAIModel(
-    'gpt-4o',
-    provider=OpenAIProvider(openai_client=async_client),
+OPENAI_MODEL = LazyModel(
+    build_openai_model,
+    model_name=AZURE_OPENAI_DEPLOYMENT,
+    system="openai",
+    profile=openai_model_profile(AZURE_OPENAI_DEPLOYMENT),
 )
 
 class Request(BaseModel):
@@ -0,0 +1,131 @@
+import operator
+from typing import Annotated
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from util_functions.checkpoint_store import SQLiteCheckpointSaver
+
+
+class State(TypedDict):
+    steps: Annotated[list[str], operator.add]
+
+
+def build_graph(checkpointer, calls: dict, fail_once: bool = False):
+    def first(state: State):
+        calls["first"] = calls.get("first", 0) + 1
+        return {"steps": ["first"]}
+
+    def second(state: State):
+        calls["second"] = calls.get("second", 0) + 1
+        if fail_once and calls["second"] == 1:
+            raise RuntimeError("second failed")
+        return {"steps": ["second"]}
+
+    graph = StateGraph(State)
+    graph.add_node("first", first)
+    graph.add_node("second", second)
+    graph.add_edge(START, "first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoints.sqlite")
+
+
+@pytest.fixture
+def saver(path):
+    saver = SQLiteCheckpointSaver(path)
+    yield saver
+    saver.close()
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_state_round_trips(saver):
+    graph = build_graph(saver, {})
+    assert graph.invoke({"steps": []}, config("a")) == {"steps": ["first", "second"]}
+
+    snapshot = graph.get_state(config("a"))
+    assert snapshot.values == {"steps": ["first", "second"]}
+    assert snapshot.next == ()
+
+    history = list(saver.list(config("a")))
+    assert [item.metadata["step"] for item in history] == [2, 1, 0, -1]
+    assert history[0].parent_config == history[1].config
+    assert list(saver.list(config("a"), limit=2)) == history[:2]
+    assert list(saver.list(config("a"), before=history[1].config)) == history[2:]
+    assert saver.get_tuple(history[1].config).checkpoint["id"] == history[1].checkpoint["id"]
+    assert saver.get_tuple(config("other")) is None
+
+
+def test_checkpoints_are_committed_before_put_returns(saver, path):
+    graph = build_graph(saver, {})
+    graph.invoke({"steps": []}, config("a"))
+
+    # a second connection, as after a crash, sees the last checkpoint without any flush or close
+    reader = SQLiteCheckpointSaver(path, flush_seconds=3600)
+    try:
+        latest = reader.get_tuple(config("a"))
+        assert latest.checkpoint["channel_values"]["steps"] == ["first", "second"]
+    finally:
+        reader.close()
+
+
+def test_buffered_mode_commits_on_flush(path):
+    saver = SQLiteCheckpointSaver(path, buffered=True, flush_seconds=3600)
+    reader = SQLiteCheckpointSaver(path, flush_seconds=3600)
+    try:
+        build_graph(saver, {}).invoke({"steps": []}, config("a"))
+        assert saver.stats()["buffered_rows"] > 0
+        assert reader.get_tuple(config("a")) is None
+
+        saver.flush()
+        assert reader.get_tuple(config("a")) is not None
+    finally:
+        saver.close()
+        reader.close()
+
+
+def test_failed_run_resumes_at_the_failed_node(saver):
+    calls = {}
+    graph = build_graph(saver, calls, fail_once=True)
+    with pytest.raises(RuntimeError):
+        graph.invoke({"steps": []}, config("a"))
+    assert graph.get_state(config("a")).next == ("second",)
+
+    assert graph.invoke(None, config("a")) == {"steps": ["first", "second"]}
+    assert calls == {"first": 1, "second": 2}
+
+
+def test_pending_writes_are_stored(saver):
+    graph = build_graph(saver, {}, fail_once=True)
+    with pytest.raises(RuntimeError):
+        graph.invoke({"steps": []}, config("a"))
+
+    latest = saver.get_tuple(config("a"))
+    assert any(channel == "__error__" for _, channel, _ in latest.pending_writes)
+
+
+def test_retention_and_delete(path):
+    saver = SQLiteCheckpointSaver(path, keep_per_thread=2)
+    try:
+        graph = build_graph(saver, {})
+        graph.invoke({"steps": []}, config("a"))
+        graph.invoke({"steps": []}, config("b"))
+
+        saver.prune_expired()
+        assert len(list(saver.list(config("a")))) == 2
+        assert graph.get_state(config("a")).values == {"steps": ["first", "second"]}
+
+        saver.delete_thread("a")
+        assert saver.get_tuple(config("a")) is None
+        assert saver.get_tuple(config("b")) is not None
+    finally:
+        saver.close()
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from util_functions.content_cache import ContentCache
+
+
+def read_upper(file_path: str, suffix: str = "") -> dict:
+    read_upper.calls += 1
+    with open(file_path) as f:
+        return {"file_content": f.read().upper() + suffix}
+
+
+read_upper.calls = 0
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    read_upper.calls = 0
+    path = tmp_path / "notes.txt"
+    path.write_text("hello")
+    return str(path)
+
+
+def test_unchanged_file_is_read_once(text_file):
+    cache = ContentCache()
+
+    assert cache.get_or_read(read_upper, text_file) == {"file_content": "HELLO"}
+    assert cache.get_or_read(read_upper, text_file) == {"file_content": "HELLO"}
+    assert cache.get_or_read(read_upper, text_file, "!") == {"file_content": "HELLO!"}  # arguments are in the key
+    assert read_upper.calls == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["bytes_saved"] == 5
+
+
+def test_edited_file_is_read_again(text_file):
+    cache = ContentCache()
+    cache.get_or_read(read_upper, text_file)
+
+    with open(text_file, "w") as f:
+        f.write("hello again")
+    assert cache.get_or_read(read_upper, text_file) == {"file_content": "HELLO AGAIN"}
+    assert read_upper.calls == 2
+
+
+def test_memory_budget_evicts_the_least_recently_used(tmp_path):
+    cache = ContentCache(max_bytes=60)
+    keys = []
+    for name in "abc":
+        path = tmp_path / name
+        path.write_text(name)
+        key, _ = cache.make_key(str(path), "reader")
+        cache.store(key, "x" * 20)
+        keys.append(key)
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == "x" * 20
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persisted_entries_survive_a_restart(text_file, tmp_path):
+    store = str(tmp_path / "content.sqlite")
+    ContentCache(persist_path=store).get_or_read(read_upper, text_file)
+
+    restarted = ContentCache(persist_path=store)
+    assert restarted.get_or_read(read_upper, text_file) == {"file_content": "HELLO"}
+    assert read_upper.calls == 1
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_values_json_cannot_encode_stay_in_memory(text_file, tmp_path):
+    cache = ContentCache(persist_path=str(tmp_path / "content.sqlite"))
+    key, _ = cache.make_key(text_file, "reader")
+    cache.store(key, {"when": time})
+
+    assert cache.get(key) == {"when": time}
+    assert cache.stats()["not_persisted"] == 1
+    assert ContentCache(persist_path=str(tmp_path / "content.sqlite")).get(key) is None
+
+
+def test_prune_bounds_the_store(tmp_path):
+    cache = ContentCache(persist_path=str(tmp_path / "content.sqlite"), disk_max_bytes=100)
+    paths = []
+    for index in range(5):
+        path = tmp_path / f"file{index}.txt"
+        path.write_text(str(index))
+        paths.append(str(path))
+        cache.store(cache.make_key(str(path), "reader")[0], "x" * 40)  # 42 bytes encoded
+
+    assert cache.prune() == 3
+    restarted = ContentCache(persist_path=str(tmp_path / "content.sqlite"), disk_max_bytes=100)
+    kept = [path for path in paths if restarted.get(restarted.make_key(path, "reader")[0]) is not None]
+    assert kept == paths[-2:]
+
+    aged = ContentCache(persist_path=str(tmp_path / "content.sqlite"), max_age_days=0)
+    assert aged.stats()["disk_evictions"] == 2
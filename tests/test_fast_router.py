@@ -0,0 +1,38 @@
+import pytest
+
+from agents.fast_router import FAST_ROUTE_MIN_CONFIDENCE, classify
+from agents.master import SQL_AGENT, FILE_AGENT, BOTH_AGENT
+
+FILES = [
+    "files/risc.txt",
+    "files/structured_bike_data_cleaned.json",
+    "files/ai_job_dataset.csv",
+]
+TABLES = [
+    "album", "artist", "customer", "employee", "genre", "invoice", "invoice_line",
+    "media_type", "playlist", "playlist_track", "track",
+]
+
+
+@pytest.mark.parametrize("query", [
+    "Keep track of what the report says about RISC",
+    "Summarize the employee handbook",
+    "Who is our best customer according to the document?",
+])
+def test_single_words_do_not_skip_the_llm(query):
+    decision = classify(query, FILES, TABLES)
+    assert decision.confidence < FAST_ROUTE_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("query, agent", [
+    ("Need to know about total album sales by artist", SQL_AGENT),
+    ("How many tracks are in each genre?", SQL_AGENT),
+    ("list tables in the database", SQL_AGENT),
+    ("What is in the bike data json file?", FILE_AGENT),
+    ("Summarize the risc txt file", FILE_AGENT),
+    ("Show total album sales by artist and read the ai job dataset csv", BOTH_AGENT),
+])
+def test_clear_requests_take_the_fast_path(query, agent):
+    decision = classify(query, FILES, TABLES)
+    assert decision.agent == agent
+    assert decision.confidence >= FAST_ROUTE_MIN_CONFIDENCE
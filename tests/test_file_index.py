@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from util_functions.file_index import FileIndex
+
+
+def touch_dir(directory):
+    # file system timestamps are coarse: make sure the change shows in the directory's mtime
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "reports" / "q1").mkdir()
+    for name in ["risc.txt", "ai_job_dataset.csv", "reports/bike_sales.json", "reports/q1/crime_data.pdf"]:
+        (tmp_path / name).write_text(name)
+    return tmp_path
+
+
+def test_files_are_listed_recursively(tree):
+    index = FileIndex(str(tree))
+    assert [os.path.relpath(path, tree) for path in index.files()] == [
+        "ai_job_dataset.csv", "reports/bike_sales.json", "reports/q1/crime_data.pdf", "risc.txt",
+    ]
+    assert {entry.type for entry in index.entries()} == {"csv", "json", "pdf", "txt"}
+
+
+def test_refresh_only_rescans_changed_directories(tree, monkeypatch):
+    index = FileIndex(str(tree))
+    index.refresh(force=True)
+    scanned = []
+    scan_dir = FileIndex._scan_dir
+
+    def counting_scan_dir(self, directory, mtime):
+        scanned.append(directory)
+        scan_dir(self, directory, mtime)
+
+    monkeypatch.setattr(FileIndex, "_scan_dir", counting_scan_dir)
+
+    (tree / "reports" / "q1" / "new_notes.txt").write_text("new")
+    os.remove(tree / "risc.txt")
+    touch_dir(tree / "reports" / "q1")
+    touch_dir(tree)
+    index.refresh(force=True)
+
+    assert sorted(scanned) == sorted([str(tree), str(tree / "reports" / "q1")])
+    files = [os.path.relpath(path, tree) for path in index.files()]
+    assert "reports/q1/new_notes.txt" in files and "risc.txt" not in files
+    assert index.lookup("risc") == []
+
+
+def test_removed_directory_drops_its_files(tree):
+    index = FileIndex(str(tree))
+    index.refresh(force=True)
+    for name in os.listdir(tree / "reports" / "q1"):
+        os.remove(tree / "reports" / "q1" / name)
+    os.rmdir(tree / "reports" / "q1")
+    touch_dir(tree / "reports")
+    index.refresh(force=True)
+
+    assert not any("crime" in path for path in index.files())
+
+
+def test_lookup_ranks_by_file_name(tree):
+    index = FileIndex(str(tree))
+    assert os.path.basename(index.lookup("what does the bike sales data say?")[0]) == "bike_sales.json"
+    assert os.path.basename(index.lookup("crime data content", k=1)[0]) == "crime_data.pdf"
+    assert len(index.candidate_files("anything", k=10)) == 4  # small trees are shown whole
+    assert len(index.candidate_files("crime data", k=2)) <= 2
+
+
+def test_persisted_index_is_reused(tree, tmp_path_factory, monkeypatch):
+    persist_path = str(tmp_path_factory.mktemp("index") / "file_index.json")
+    FileIndex(str(tree), persist_path=persist_path).refresh(force=True)
+
+    monkeypatch.setattr(FileIndex, "_scan_dir", lambda *args: pytest.fail("unchanged directory re-listed"))
+    restored = FileIndex(str(tree), persist_path=persist_path)
+    assert len(restored.files()) == 4
+    assert os.path.basename(restored.lookup("risc")[0]) == "risc.txt"
@@ -0,0 +1,111 @@
+import pytest
+
+from benchmarks.corpus import synthetic_pdf
+from util_functions.file_operations import format_csv_profile, profile_csv, read_csv, read_pdf, read_pdf_pages
+
+CSV = """city,price,rooms
+Oslo,100.5,2
+Bergen,,3
+Oslo,300,
+Tromso,50,1
+Oslo,200,4
+"""
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "homes.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def columns(profile: dict) -> dict:
+    return {column["name"]: column for column in profile["columns"]}
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 5000])
+def test_profile_is_the_same_for_any_chunk_size(csv_file, chunk_rows):
+    profile = profile_csv(csv_file, chunk_rows=chunk_rows, head_rows=2)
+
+    assert profile["row_count"] == 5
+    assert profile["head"] == [
+        {"city": "Oslo", "price": 100.5, "rooms": 2.0},
+        {"city": "Bergen", "price": None, "rooms": 3.0},
+    ]
+    stats = columns(profile)
+    assert stats["price"] == {"name": "price", "dtype": "float64", "nulls": 1, "min": 50.0, "max": 300.0, "mean": 162.625}
+    assert stats["rooms"]["nulls"] == 1
+    assert stats["city"]["distinct"] == 3
+    assert stats["city"]["top_values"][0] == ("Oslo", 3)
+
+
+def test_column_that_stops_being_numeric_is_profiled_as_text(tmp_path):
+    path = tmp_path / "mixed.csv"
+    path.write_text("code\n" + "1\n" * 5 + "A7\n")
+
+    profile = profile_csv(str(path), chunk_rows=2)
+    (code,) = profile["columns"]
+    assert code["dtype"] == "str"
+    assert code["top_values"][0] == ("1", 5)
+
+
+def test_summary_respects_its_length(csv_file):
+    profile = profile_csv(csv_file)
+    assert format_csv_profile(profile).startswith("5 rows, 3 columns. city (text, 3 distinct, top: Oslo")
+    assert len(format_csv_profile(profile, max_length=40)) <= 43
+
+
+def test_read_csv(csv_file):
+    result = read_csv(csv_file)
+    assert result["profile"]["row_count"] == 5
+    assert result["file_content"].startswith('[{"city": "Oslo"')
+
+
+@pytest.fixture(scope="module")
+def pdf_file(tmp_path_factory):
+    return synthetic_pdf(20, directory=str(tmp_path_factory.mktemp("corpus")))
+
+
+@pytest.fixture
+def extracted_pages(monkeypatch):
+    """Page numbers whose text was extracted, in order."""
+    from pypdf import PageObject
+
+    pages = []
+    extract_text = PageObject.extract_text
+
+    def counting_extract_text(page, *args, **kwargs):
+        text = extract_text(page, *args, **kwargs)
+        pages.append(int(text.split("\n", 1)[0].split()[-1]))
+        return text
+
+    monkeypatch.setattr(PageObject, "extract_text", counting_extract_text)
+    return pages
+
+
+def test_read_pdf_stops_at_the_summary_budget(pdf_file, extracted_pages):
+    result = read_pdf(pdf_file, max_chars=500)
+
+    assert extracted_pages == [1]
+    assert result["summary"].startswith("Page 1") and result["summary"].endswith("...")
+    assert len(result["file_content"]) == 100
+
+
+def test_read_pdf_pages_reads_only_the_range(pdf_file, extracted_pages):
+    result = read_pdf_pages(pdf_file, 7, 8, max_chars=100_000)
+
+    assert extracted_pages == [7, 8]
+    assert [page["page"] for page in result["pages"]] == [7, 8]
+    assert result["page_count"] == 20
+    assert result["summary"] == "Pages 7-8 of 20"
+
+
+def test_read_pdf_pages_truncates_and_clamps(pdf_file, extracted_pages):
+    truncated = read_pdf_pages(pdf_file, 1, 20, max_chars=6000)
+    assert extracted_pages == [1, 2]
+    assert len(truncated["file_content"]) <= 6000 + len(truncated["pages"])
+    assert truncated["summary"].endswith("(truncated to 6000 characters)")
+
+    past_the_end = read_pdf_pages(pdf_file, 25, 30)
+    assert past_the_end["pages"] == []
+    assert past_the_end["summary"] == "No pages in range 25-30; the document has 20 pages"
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from util_functions.file_operations import read_json, read_json_path
+from util_functions.json_stream import iter_json_path, parse_json_path, summarize_json
+
+DOCUMENT = [
+    {"name": "Trek", "price": 1200.5, "tags": ["road", "carbon"], "specs": {"gears": 22, "weight kg": 8.1}},
+    {"name": "Giant", "price": 950, "tags": [], "specs": {"gears": 18, "weight kg": None}},
+    {"name": "Cube \"Pro\"", "price": 12345678901234567890, "tags": ["mtb"], "specs": {"gears": 12, "weight kg": 13.4}},
+]
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    path = tmp_path / "bikes.json"
+    path.write_text(json.dumps(DOCUMENT, indent=2))
+    return str(path)
+
+
+# chunks smaller than any value, splitting keys, strings and numbers across reads
+@pytest.mark.parametrize("chunk_chars", [1, 3, 16, 64 * 1024])
+def test_stream_rebuilds_the_document_for_any_chunk_size(json_file, chunk_chars):
+    assert list(iter_json_path(json_file, "$", chunk_chars=chunk_chars)) == [("$", DOCUMENT)]
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 16, 64 * 1024])
+def test_summary_for_any_chunk_size(json_file, chunk_chars):
+    summary = summarize_json(json_file, chunk_chars=chunk_chars)
+
+    assert summary["root_type"] == "array"
+    assert summary["length"] == 3
+    assert len(summary["head"]) == 3
+    paths = summary["paths"]
+    assert paths["$[*].name"]["count"] == 3
+    assert paths["$[*].price"]["types"] == {"number": 3}
+    assert paths["$[*].tags"]["min_length"] == 0 and paths["$[*].tags"]["max_length"] == 2
+    assert paths['$[*].specs["weight kg"]']["types"] == {"number": 2, "null": 1}
+    assert summary["dropped_paths"] == 0
+
+
+def test_summary_caps_tracked_paths(json_file):
+    summary = summarize_json(json_file, max_paths=3)
+    assert len(summary["paths"]) == 3
+    assert summary["dropped_paths"] > 0
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("$[*].name", [("$[0].name", "Trek"), ("$[1].name", "Giant"), ("$[2].name", 'Cube "Pro"')]),
+    ("$[1].specs", [("$[1].specs", {"gears": 18, "weight kg": None})]),
+    ("$[*].specs['weight kg']", [('$[0].specs["weight kg"]', 8.1), ('$[1].specs["weight kg"]', None), ('$[2].specs["weight kg"]', 13.4)]),
+    ("[0].tags[*]", [("$[0].tags[0]", "road"), ("$[0].tags[1]", "carbon")]),
+    ("$[5].name", []),
+])
+def test_json_path(json_file, expression, expected):
+    for chunk_chars in (4, 64 * 1024):
+        assert list(iter_json_path(json_file, expression, chunk_chars=chunk_chars)) == expected
+
+
+def test_unsupported_json_path():
+    with pytest.raises(ValueError, match="Unsupported JSONPath"):
+        parse_json_path("$..name")
+
+
+@pytest.mark.parametrize("text", ["[1, 2", '{"a" 1}', "[1] [2]", '{"a": tru}'])
+def test_invalid_json_is_reported(tmp_path, text):
+    path = tmp_path / "broken.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        summarize_json(str(path), chunk_chars=2)
+
+
+def test_readers(json_file):
+    result = read_json(json_file)
+    assert result["summary"].startswith("Array of 3 items.")
+    assert len(result["file_content"]) <= 100
+
+    matches = read_json_path(json_file, "$[*].name", max_matches=2)
+    assert [match["value"] for match in matches["matches"]] == ["Trek", "Giant"]
+    assert matches["summary"] == "2 matches for $[*].name (stopped at the first 2)"
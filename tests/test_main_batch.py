@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+import main_batch
+from main_batch import completed_ids, read_requests, run_batch
+
+
+@pytest.fixture
+def requests_file(tmp_path):
+    path = tmp_path / "requests.jsonl"
+    lines = [
+        {"request_id": "a", "query": "How many artists?"},
+        {"id": "b", "body": "Summarize risc.txt"},
+        {"title": "fail me"},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n\n")
+    return str(path)
+
+
+@pytest.fixture
+def invoked(monkeypatch):
+    """Thread ids the fake graph was invoked with; requests mentioning "fail" raise."""
+    calls = []
+
+    async def fake_invoke_graph(initial_state, thread_id):
+        calls.append(thread_id)
+        text = initial_state["request"][0].content
+        if "fail" in text:
+            raise RuntimeError("model unavailable")
+        return {"agent": "sql", "detail": text, "sql_error_message": None}
+
+    monkeypatch.setattr(main_batch, "invoke_graph", fake_invoke_graph)
+    return calls
+
+
+def test_requests_are_read_with_their_ids(requests_file):
+    assert list(read_requests(requests_file)) == [
+        ("a", "How many artists?"), ("b", "Summarize risc.txt"), ("3", "fail me"),
+    ]
+
+
+def test_results_are_appended_and_failures_recorded(requests_file, invoked, tmp_path):
+    output = tmp_path / "results.jsonl"
+    report = asyncio.run(run_batch(requests_file, str(output), 2, "sqlite://", "files"))
+
+    assert sorted(invoked) == ["3", "a", "b"]
+    assert (report["ok"], report["error"], report["skipped"]) == (2, 1, 0)
+    records = {record["request_id"]: record for record in map(json.loads, output.read_text().splitlines())}
+    assert records["a"]["detail"] == "How many artists?" and "sql_error_message" not in records["a"]
+    assert (records["3"]["status"], records["3"]["error"]) == ("error", "RuntimeError: model unavailable")
+
+
+def test_rerun_skips_completed_requests(requests_file, invoked, tmp_path):
+    output = tmp_path / "results.jsonl"
+    asyncio.run(run_batch(requests_file, str(output), 2, "sqlite://", "files"))
+    with open(output, "a") as f:
+        f.write('{"request_id": "torn')  # an interrupted run's last line
+    assert completed_ids(str(output)) == {"a", "b"}
+
+    invoked.clear()
+    report = asyncio.run(run_batch(requests_file, str(output), 2, "sqlite://", "files"))
+    assert invoked == ["3"]  # only the failed request is retried, on its own checkpoint thread
+    assert report["skipped"] == 2
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+from sqlalchemy import create_engine
+
+import main_langgraph
+from benchmarks.chinook_fixture import build_chinook
+from benchmarks.corpus import SAMPLE_DIR
+from benchmarks.stub_models import stub_models
+from main_langgraph import db_engine_for, graph
+from util_functions import result_sink
+from util_functions.result_sink import BackgroundResultWriter, JsonlSink
+
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    return build_chinook(str(tmp_path_factory.mktemp("db") / "chinook.sqlite"))
+
+
+def test_engine_in_config_is_used(database_url):
+    engine = create_engine(database_url)
+    assert db_engine_for({"configurable": {"db_engine": engine}}) is engine
+
+
+def test_url_in_config_or_environment(database_url, monkeypatch):
+    assert str(db_engine_for({"configurable": {"__database_url": database_url}}).url) == database_url
+
+    monkeypatch.setattr(main_langgraph, "DATABASE_URL", database_url)
+    assert str(db_engine_for({}).url) == database_url
+
+
+def test_missing_database_is_reported(monkeypatch):
+    monkeypatch.setattr(main_langgraph, "DATABASE_URL", None)
+    with pytest.raises(ValueError, match="DATABASE_URL"):
+        db_engine_for({"configurable": {}})
+
+
+def test_exported_graph_runs_without_thread_id(database_url, monkeypatch, tmp_path):
+    monkeypatch.setattr(main_langgraph, "DATABASE_URL", database_url)
+    writer = BackgroundResultWriter(JsonlSink(str(tmp_path / "results.jsonl")))
+    monkeypatch.setattr(result_sink, "_writer", writer)
+    state = {"request": [HumanMessage(content="How many tracks are in each genre?")], "files": SAMPLE_DIR}
+
+    with stub_models():
+        final_state = asyncio.run(graph.ainvoke(state))
+    writer.close()
+
+    assert final_state["sql_query"]
+    assert not final_state.get("sql_error_message")
+    assert writer.written == 1
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from util_functions.query_cache import QueryResultCache, bump_data_version, cached_query, normalize_sql
+from util_functions.schema_catalog import invalidate_catalog
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE genre (genre_id INTEGER PRIMARY KEY, name TEXT)")
+    connection.commit()
+    connection.close()
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    invalidate_catalog(engine)
+    engine.dispose()
+
+
+class Runner:
+    """Stands in for execute_query, counting how often the database is hit."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"result {self.calls}"
+
+
+@pytest.mark.parametrize("first, second", [
+    ("SELECT name FROM genre;", "select   name\nfrom GENRE"),
+    ("SELECT * FROM genre WHERE name = 'Rock'", "select * from genre where name='Rock'"),
+    ("SELECT COUNT( * ) FROM genre", "select count(*) from genre"),
+])
+def test_equivalent_queries_normalize_alike(first, second):
+    assert normalize_sql(first) == normalize_sql(second)
+
+
+def test_literals_keep_their_case():
+    assert normalize_sql("SELECT * FROM genre WHERE name = 'Rock'") != normalize_sql("SELECT * FROM genre WHERE name = 'rock'")
+
+
+def test_repeated_query_is_served_from_the_cache(db_engine):
+    cache, run = QueryResultCache(), Runner()
+
+    assert cached_query(db_engine, "SELECT name FROM genre", 10, run, cache=cache) == "result 1"
+    assert cached_query(db_engine, "select name from genre;", 10, run, cache=cache) == "result 1"
+    assert cached_query(db_engine, "SELECT name FROM genre", 20, run, cache=cache) == "result 2"  # limit is in the key
+    assert run.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_data_version_bump_invalidates(db_engine):
+    cache, run = QueryResultCache(), Runner()
+    cached_query(db_engine, "SELECT name FROM genre", 10, run, cache=cache)
+
+    bump_data_version(db_engine)
+    assert cached_query(db_engine, "SELECT name FROM genre", 10, run, cache=cache) == "result 2"
+
+
+def test_schema_change_invalidates(db_engine):
+    cache, run = QueryResultCache(), Runner()
+    cached_query(db_engine, "SELECT name FROM genre", 10, run, cache=cache)
+
+    with db_engine.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE genre ADD COLUMN description TEXT")
+    invalidate_catalog(db_engine)
+    assert cached_query(db_engine, "SELECT name FROM genre", 10, run, cache=cache) == "result 2"
+
+
+def test_volatile_tables_bypass_the_cache(db_engine):
+    cache, run = QueryResultCache(), Runner()
+    for _ in range(2):
+        cached_query(db_engine, "SELECT name FROM genre", 10, run, volatile_tables={"genre"}, cache=cache)
+
+    assert run.calls == 2
+    assert cache.stats()["bypasses"] == 2
+
+
+def test_ttl_and_byte_budget(monkeypatch):
+    cache = QueryResultCache(max_bytes=100, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr("util_functions.query_cache.time.monotonic", lambda: now[0])
+
+    cache.put(("a",), "a", 60)
+    cache.put(("b",), "b", 60)  # over budget: the least recently used entry goes
+    assert cache.get(("a",)) is None
+    assert cache.get(("b",)) == "b"
+    assert cache.stats()["evictions"] == 1
+
+    cache.put(("too big",), "x", 101)
+    assert cache.get(("too big",)) is None
+
+    now[0] += 10
+    assert cache.get(("b",)) is None
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.models.test import TestModel
+
+from util_functions import rate_limit
+from util_functions.rate_limit import RateLimitedModel, TokenBucket, install_rate_limits
+
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)  # 10 per second
+
+    async def take(count):
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(take(2)) < 0.05
+    assert 0.15 <= asyncio.run(take(2)) < 0.5
+
+
+def test_backoff_pauses_the_whole_bucket():
+    bucket = TokenBucket(rate_per_minute=6000, burst=10)
+    bucket.backoff(0.2)
+    start = time.monotonic()
+    asyncio.run(bucket.acquire())
+    assert time.monotonic() - start >= 0.2
+    assert bucket.throttled == 1
+
+
+class FlakyModel(TestModel):
+    """Answers with HTTP 429 for the first `failures` requests."""
+
+    def __init__(self, failures: int, status_code: int = 429):
+        super().__init__()
+        self.failures = failures
+        self.status_code = status_code
+        self.requests = 0
+
+    async def request(self, *args, **kwargs):
+        self.requests += 1
+        if self.requests <= self.failures:
+            raise ModelHTTPError(self.status_code, self.model_name)
+        return await super().request(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE_SECONDS", 0.01)
+
+
+def test_rate_limited_requests_are_retried():
+    flaky = FlakyModel(failures=2)
+    bucket = TokenBucket(rate_per_minute=60_000)
+    agent = Agent(RateLimitedModel(flaky, bucket))
+
+    assert asyncio.run(agent.run("hello")).output
+    assert flaky.requests == 3
+    assert bucket.throttled == 2
+
+
+@pytest.mark.parametrize("failures, status_code, max_retries", [(1, 500, 5), (3, 429, 2)])
+def test_other_errors_and_exhausted_retries_are_raised(failures, status_code, max_retries):
+    flaky = FlakyModel(failures=failures, status_code=status_code)
+    agent = Agent(RateLimitedModel(flaky, TokenBucket(rate_per_minute=60_000), max_retries=max_retries))
+
+    with pytest.raises(ModelHTTPError):
+        asyncio.run(agent.run("hello"))
+
+
+def test_agents_on_one_provider_share_a_bucket():
+    agents = [Agent(TestModel()), Agent(TestModel()), Agent(TestModel())]
+    buckets = install_rate_limits(agents[:2], {"test": 60})
+
+    assert list(buckets) == ["test"]
+    assert agents[0].model.bucket is agents[1].model.bucket is buckets["test"]
+    assert install_rate_limits(agents, {}) == {}  # unlisted providers stay unlimited
+    assert isinstance(agents[0].model.wrapped, TestModel) and isinstance(agents[2].model, TestModel)
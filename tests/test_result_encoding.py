@@ -0,0 +1,73 @@
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+
+from util_functions.result_encoding import encode_columnar, encode_records, encode_value, summarize_columns
+
+COLUMNS = ["artist", "total_sales"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    (Decimal("12.50"), 12.5),
+    (Decimal("3.00"), 3),
+    (Decimal("NaN"), None),
+    (78.47999999999998, 78.48),
+    (float("inf"), None),
+    (datetime.date(2024, 1, 31), "2024-01-31"),
+    (datetime.timedelta(minutes=1), 60.0),
+    (b"\x00\x01", "<2 bytes>"),
+    (None, None),
+])
+def test_encode_value(value, expected):
+    assert encode_value(value) == expected
+
+
+def test_columnar_sends_the_header_once():
+    rows = [("AC/DC", Decimal("90.09")), ("Aerosmith", Decimal("12.87"))]
+    payload = json.loads(encode_columnar(COLUMNS, rows, 2, False))
+
+    assert payload["columns"] == COLUMNS
+    assert payload["rows"] == [["AC/DC", 90.09], ["Aerosmith", 12.87]]
+    assert payload["returned_rows"] == payload["total_rows"] == 2
+    assert not payload["truncated"]
+
+
+def test_column_mixing_types_is_converted_everywhere():
+    # the first non-null value is an int, a later one a Decimal
+    rows = [("a", None), ("b", 3), ("c", Decimal("1.50")), ("d", datetime.date(2024, 1, 1))]
+    payload = json.loads(encode_columnar(["name", "value"], rows, 4, False))
+    assert payload["rows"] == [["a", None], ["b", 3], ["c", 1.5], ["d", "2024-01-01"]]
+
+
+def test_results_over_the_budget_keep_head_and_tail():
+    rows = [(f"Artist {i}", i) for i in range(500)]
+    payload = json.loads(encode_columnar(COLUMNS, rows, 500, False, token_budget=200))
+
+    kept = payload["rows"]
+    assert 0 < len(kept) < 500
+    assert payload["omitted_rows"] == 500 - len(kept)
+    head = payload["omitted_after_row"]
+    assert kept[:head] == [list(row) for row in rows[:head]]
+    assert kept[head:] == [list(row) for row in rows[500 - (len(kept) - head):]]
+    assert payload["summary"]["total_sales"] == {"min": 0, "max": 499, "mean": 249.5, "sum": 124750}
+
+
+def test_insights_replace_the_summary():
+    rows = [(f"Artist {i}", i) for i in range(500)]
+    payload = json.loads(encode_columnar(COLUMNS, rows, 500, False, token_budget=200, insights={"rows_analyzed": 500}))
+    assert payload["insights"] == {"rows_analyzed": 500}
+    assert "summary" not in payload
+
+
+def test_records_format():
+    payload = json.loads(encode_records(COLUMNS, [("AC/DC", Decimal("90.09"))], None, True))
+    assert payload["rows"] == [{"artist": "AC/DC", "total_sales": "90.09"}]
+    assert payload["total_rows"] is None and payload["truncated"]
+
+
+def test_summarize_columns():
+    summary = summarize_columns(["name", "n"], [("a", 1), ("b", None), ("a", 3)])
+    assert summary["name"] == {"distinct": 2, "nulls": 0}
+    assert summary["n"] == {"min": 1, "max": 3, "mean": 2.0, "sum": 4}
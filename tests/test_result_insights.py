@@ -0,0 +1,54 @@
+import datetime
+import json
+from decimal import Decimal
+
+from util_functions.result_insights import NULL_LABEL, compute_insights
+
+
+def test_too_few_rows():
+    assert compute_insights(["name", "total"], [("a", 1)]) is None
+
+
+def test_ranking_of_the_main_measure():
+    rows = [(f"Artist {i}", Decimal(i * 10)) for i in range(1, 11)]
+    insights = compute_insights(["artist", "total_sales"], rows, top_n=3)
+
+    assert insights["rows_analyzed"] == 10
+    assert insights["label_column"] == "artist"
+    assert insights["columns"]["total_sales"]["type"] == "number"
+    assert insights["columns"]["total_sales"]["sum"] == 550
+    ranking = insights["measures"]["total_sales"]["ranking"]
+    assert ranking["top"] == [["Artist 10", 100], ["Artist 9", 90], ["Artist 8", 80]]
+    assert ranking["bottom"] == [["Artist 1", 10], ["Artist 2", 20], ["Artist 3", 30]]
+    assert ranking["gaps"] == [10, 10, 10]
+
+
+def test_null_labels_are_named():
+    rows = [(None, 500), ("b", 2), ("c", 3), (None, 1), ("e", 4)]
+    insights = compute_insights(["name", "total"], rows, top_n=2)
+
+    ranking = insights["measures"]["total"]["ranking"]
+    assert ranking["top"][0] == [NULL_LABEL, 500]
+    assert ranking["bottom"][0] == [NULL_LABEL, 1]
+    # strict JSON: no NaN anywhere
+    json.dumps(insights, allow_nan=False, default=str)
+
+
+def test_identifier_columns_are_not_measures():
+    rows = [(i, f"Track {i}", i * 1000) for i in range(1, 6)]
+    insights = compute_insights(["track_id", "name", "milliseconds"], rows)
+    assert list(insights["measures"]) == ["milliseconds"]
+
+
+def test_outliers_and_trend():
+    start = datetime.date(2024, 1, 1)
+    rows = [(start + datetime.timedelta(days=31 * i), 100 + i) for i in range(12)]
+    rows.append((start + datetime.timedelta(days=400), 10_000))
+    insights = compute_insights(["invoice_date", "total"], rows)
+
+    measure = insights["measures"]["total"]
+    assert measure["outliers"]["examples"][0] == ["2025-02-04", 10000]
+    trend = measure["trends"]["invoice_date"]
+    assert trend["period"] == "month"
+    assert trend["peak"][1] == 10000
+    assert insights["columns"]["invoice_date"] == {"type": "date", "min": "2024-01-01", "max": "2025-02-04"}
@@ -0,0 +1,86 @@
+import json
+import os
+import sqlite3
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from models import ChartSuggestion
+from util_functions.result_sink import (
+    BackgroundResultWriter, JsonFileSink, JsonlSink, ResultSink, SQLiteSink, create_sink, encode_record,
+)
+
+RECORDS = [
+    {"request_id": str(index), "agent": "sql", "request": [HumanMessage(content=f"question {index}")]}
+    for index in range(5)
+]
+
+
+def test_state_objects_are_encoded():
+    result = ChartSuggestion(type="bar", x_axis="genre", y_axis="tracks", series=None, title=None)
+    encoded = json.loads(encode_record({"request": RECORDS[0]["request"], "result": result, 1: "key"}))
+    assert encoded == {"request": ["question 0"], "result": result.model_dump(), "1": "key"}
+
+
+def write_all(sink: ResultSink, **options):
+    writer = BackgroundResultWriter(sink, batch_size=2, flush_seconds=0.01, **options)
+    for record in RECORDS:
+        writer.submit(record)
+    writer.close()
+    return writer
+
+
+def test_jsonl_sink_appends_every_result(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write_all(JsonlSink(str(path)))
+    write_all(JsonlSink(str(path)), fsync="always")
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["request_id"] for line in lines] == [str(index) for index in range(5)] * 2
+    assert lines[0]["request"] == ["question 0"]
+
+
+def test_sqlite_sink_stores_one_row_per_result(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    writer = write_all(SQLiteSink(path), fsync="never")
+
+    assert writer.written == 5
+    rows = sqlite3.connect(path).execute("SELECT request_id, agent, record FROM results ORDER BY id").fetchall()
+    assert [(request_id, agent) for request_id, agent, _ in rows] == [(str(index), "sql") for index in range(5)]
+    assert json.loads(rows[-1][2])["request"] == ["question 4"]
+
+
+def test_json_file_sink_keeps_the_latest_result(tmp_path):
+    path = tmp_path / "checking_output.json"
+    write_all(JsonFileSink(str(path)))
+    assert json.loads(path.read_text())["request_id"] == "4"
+
+
+class FailingSink(ResultSink):
+    def write_batch(self, records):
+        raise OSError("disk full")
+
+
+def test_write_errors_are_counted_and_closed_writer_rejects_results():
+    writer = write_all(FailingSink())
+    assert (writer.written, writer.errors) == (0, 5)
+    with pytest.raises(RuntimeError, match="closed"):
+        writer.submit(RECORDS[0])
+    writer.close()  # closing twice is harmless
+
+
+@pytest.mark.parametrize("kind, sink_type, file_name", [
+    ("jsonl", JsonlSink, "agent_results.jsonl"),
+    ("sqlite", SQLiteSink, "agent_results.sqlite"),
+    ("json", JsonFileSink, None),
+])
+def test_create_sink_defaults(tmp_path, monkeypatch, kind, sink_type, file_name):
+    monkeypatch.chdir(tmp_path)
+    sink = create_sink(kind)
+    assert isinstance(sink, sink_type)
+    sink.close()
+    if file_name:
+        assert os.path.exists(file_name)
+
+    with pytest.raises(ValueError, match="Unknown result sink"):
+        create_sink("parquet")
@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from util_functions.schema_catalog import get_catalog, invalidate_catalog
+
+ODD_NAME = 'it\'s "odd" :x'
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE artist (artist_id INTEGER PRIMARY KEY, name TEXT)")
+    connection.execute("CREATE TABLE album (album_id INTEGER PRIMARY KEY, artist_id INTEGER REFERENCES artist (artist_id))")
+    connection.execute('CREATE TABLE "it\'s ""odd"" :x" (a INTEGER)')
+    connection.executemany("INSERT INTO artist VALUES (?, ?)", [(1, "a"), (2, "b")])
+    connection.commit()
+    connection.close()
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    invalidate_catalog(engine)
+    engine.dispose()
+
+
+def test_row_estimates_survive_quotes_in_table_names(db_engine):
+    catalog = get_catalog(db_engine)
+
+    assert sorted(catalog.table_names()) == sorted(["album", "artist", ODD_NAME])
+    assert catalog.get_table("artist").row_estimate == 2
+    assert catalog.get_table(ODD_NAME).row_estimate == 0
+
+
+def test_describe_lists_keys(db_engine):
+    album = get_catalog(db_engine).get_table("ALBUM").describe()
+
+    assert album["primary_key"] == ["album_id"]
+    assert album["foreign_keys"][0]["referred_table"] == "artist"
+    assert [column["name"] for column in album["columns"]] == ["album_id", "artist_id"]
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks.chinook_fixture import build_chinook
+from util_functions import sql_guard
+from util_functions.sql_guard import ALLOW, DOWNGRADE, REJECT, QueryRejected, _pg_estimate, cost_guard, explain_query, judge
+from util_functions.sql_operations import execute_guarded, run_sql_query
+
+CROSS_JOIN = "SELECT * FROM track t, invoice_line il"
+JOINED = "SELECT a.name, al.title FROM artist a JOIN album al ON al.artist_id = a.artist_id"
+
+
+@pytest.fixture(scope="module")
+def db_engine(tmp_path_factory):
+    engine = create_engine(build_chinook(str(tmp_path_factory.mktemp("db") / "chinook.sqlite")))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_verdicts():
+    cost_guard.clear()
+
+
+def test_sqlite_plans_are_estimated_from_row_counts(db_engine):
+    scan = explain_query(db_engine, "SELECT * FROM track ORDER BY name", limit=10)
+    assert (scan.total_cost, scan.limited_cost, scan.seq_scans) == (3503, 3503, ["track"])  # the sort reads every row
+
+    joined = explain_query(db_engine, JOINED, limit=10)
+    assert joined.join_types == ["Nested Loop (Inner)"] and joined.cross_joins == []
+    assert joined.limited_cost == 10
+
+
+def test_cross_join_is_rejected(db_engine):
+    verdict = cost_guard.check(db_engine, CROSS_JOIN, 10)
+    assert verdict.action == REJECT
+    assert verdict.reason["code"] == "cross_join"
+    assert verdict.reason["cross_joins"] == ["t x il (~11094001 rows)"]
+
+    with pytest.raises(QueryRejected, match="cartesian product"):
+        execute_guarded(db_engine, CROSS_JOIN)
+    rejected = json.loads(run_sql_query(db_engine, CROSS_JOIN, guard=True))
+    assert rejected["error"].startswith("Query rejected before running") and rejected["guard"]["code"] == "cross_join"
+
+
+def test_over_budget_query_is_downgraded_or_rejected(db_engine, monkeypatch):
+    monkeypatch.setattr(sql_guard, "SQL_GUARD_MAX_COST", 1000)
+    monkeypatch.setattr(sql_guard, "SQL_GUARD_DOWNGRADE_LIMIT", 5)
+
+    result = execute_guarded(db_engine, "SELECT * FROM track", limit=50)
+    assert len(result.rows) == 5 and result.total_rows is None  # no COUNT(*) probe
+    assert result.guard["code"] == "over_budget"
+
+    plan = explain_query(db_engine, "SELECT * FROM track", limit=50)
+    assert judge(plan).action == DOWNGRADE
+    assert judge(plan, action=REJECT).action == REJECT
+    assert judge(explain_query(db_engine, "SELECT * FROM genre", limit=50)).action == ALLOW
+
+
+def test_verdicts_are_cached_per_normalized_query(db_engine):
+    before = cost_guard.stats()
+    cost_guard.check(db_engine, JOINED, 10)
+    cost_guard.check(db_engine, JOINED.lower() + ";", 10)
+    cost_guard.check(db_engine, JOINED, 20)
+
+    stats = cost_guard.stats()
+    assert stats["explains"] - before["explains"] == 2
+    assert stats["cache_hits"] - before["cache_hits"] == 1
+
+
+def test_unplannable_query_is_allowed_and_fails_when_run(db_engine):
+    assert cost_guard.check(db_engine, "SELECT * FROM no_such_table", 10).action == ALLOW
+    assert run_sql_query(db_engine, "SELECT * FROM no_such_table", guard=True).startswith("Error running query")
+
+
+def test_postgres_plan_flags_a_nested_loop_without_condition():
+    plan = {"Plan": {
+        "Node Type": "Nested Loop", "Join Type": "Inner", "Startup Cost": 0.0, "Total Cost": 200000.0, "Plan Rows": 1000000,
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "track", "Alias": "t", "Plan Rows": 1000},
+            {"Node Type": "Materialize", "Plan Rows": 1000, "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "invoice_line", "Alias": "il", "Plan Rows": 1000},
+            ]},
+        ],
+    }}
+    estimate = _pg_estimate(plan, limit=10)
+
+    assert estimate.cross_joins == ["t x il (~1000000 rows)"]
+    assert estimate.seq_scans == ["track", "invoice_line"]
+    assert estimate.limited_cost == pytest.approx(2.0)  # a LIMIT only pays for the rows it reads
+    assert judge(estimate).reason["code"] == "cross_join"
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from benchmarks.chinook_fixture import build_chinook
+from util_functions.sql_operations import MAX_RESULT_ROWS, execute_query, run_sql_query
+
+ARTISTS = 275
+
+
+@pytest.fixture(scope="module")
+def db_engine(tmp_path_factory):
+    engine = create_engine(build_chinook(str(tmp_path_factory.mktemp("db") / "chinook.sqlite")))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(db_engine):
+    seen = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    yield seen
+    event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_limit_is_pushed_into_the_query(db_engine, statements):
+    result = execute_query(db_engine, "SELECT artist_id, name FROM artist ORDER BY artist_id", limit=5)
+
+    assert result.columns == ["artist_id", "name"]
+    assert result.rows == [(i, f"Artist {i}") for i in range(1, 6)]
+    assert any(statement.endswith("LIMIT 5") for statement in statements)
+
+
+def test_truncated_result_is_counted(db_engine):
+    result = execute_query(db_engine, "SELECT * FROM artist", limit=10)
+
+    assert len(result.rows) == 10
+    assert result.total_rows == ARTISTS
+    assert result.truncated
+
+
+def test_count_probe_can_be_skipped(db_engine, statements):
+    result = execute_query(db_engine, "SELECT * FROM artist", limit=10, count_total=False)
+
+    assert result.total_rows is None
+    assert result.truncated
+    assert not any("COUNT(*)" in statement for statement in statements)
+
+
+def test_complete_result_needs_no_probe(db_engine, statements):
+    result = execute_query(db_engine, "SELECT name FROM genre", limit=50)
+
+    assert result.total_rows == len(result.rows) == 9
+    assert not result.truncated
+    assert not any("COUNT(*)" in statement for statement in statements)
+
+
+@pytest.mark.parametrize("limit", [None, 0, -1, MAX_RESULT_ROWS * 10])
+def test_limit_is_clamped(db_engine, limit):
+    result = execute_query(db_engine, "SELECT * FROM track", limit=limit, count_total=False)
+    assert 1 <= len(result.rows) <= MAX_RESULT_ROWS
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT name FROM artist -- all rows",
+    "-- artists\nSELECT name FROM artist;",
+    "SELECT name FROM artist /* every artist */ ;",
+])
+def test_comments_do_not_break_the_wrappers(db_engine, query):
+    result = execute_query(db_engine, query, limit=3)
+    assert len(result.rows) == 3
+    assert result.total_rows == ARTISTS
+
+
+def test_read_only_transaction_blocks_writes(db_engine):
+    with pytest.raises(Exception):
+        execute_query(db_engine, "DELETE FROM artist")
+    assert execute_query(db_engine, "SELECT COUNT(*) FROM artist").rows == [(ARTISTS,)]
+
+
+def test_duplicate_column_names_are_suffixed(db_engine):
+    result = execute_query(
+        db_engine, "SELECT ar.name, al.title AS name FROM artist ar JOIN album al USING (artist_id)", limit=1,
+    )
+    assert result.columns == ["name", "name:1"]
+
+
+def test_run_sql_query_returns_json(db_engine):
+    payload = json.loads(run_sql_query(db_engine, "SELECT name FROM artist -- all rows", limit=2, use_cache=False))
+
+    assert payload["returned_rows"] == 2
+    assert payload["total_rows"] == ARTISTS
+    assert payload["truncated"]
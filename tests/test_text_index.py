@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from agents import file_reader
+from benchmarks.corpus import synthetic_pdf
+from util_functions import text_index
+from util_functions.parse_executor import ParseExecutor
+from util_functions.text_index import (
+    CHUNK_MAX_WORDS, CHUNK_MIN_WORDS, CHUNK_OVERLAP, chunk_sections, get_text_index, search_file,
+)
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_index, "TEXT_INDEX_DIR", str(tmp_path / "text_index"))
+    monkeypatch.setattr(text_index, "_indexes", {})
+    monkeypatch.setattr(text_index, "_file_locks", {})
+
+
+@pytest.fixture(scope="module")
+def pdf(tmp_path_factory):
+    return synthetic_pdf(12, directory=str(tmp_path_factory.mktemp("corpus")))
+
+
+def test_search_tool_extracts_text_in_the_parse_executor(pdf, monkeypatch):
+    executor = ParseExecutor(kind="thread", cache=None)
+    monkeypatch.setattr(file_reader, "parse_executor", executor)
+    try:
+        assert get_text_index(pdf, build=False) is None
+        first = asyncio.run(file_reader.search_file_tool(None, pdf, "pipeline hazard forwarding"))
+        assert executor.submitted == 1
+        assert get_text_index(pdf, build=False) is not None
+
+        second = asyncio.run(file_reader.search_file_tool(None, pdf, "pipeline hazard forwarding"))
+        assert executor.submitted == 1  # the index is up to date, nothing to extract
+        assert second == first
+    finally:
+        executor.shutdown(wait=True)
+
+
+def words(count: int, start: int = 0) -> str:
+    return " ".join(f"w{index}" for index in range(start, start + count))
+
+
+def test_chunks_overlap_and_respect_their_bounds():
+    chunks = chunk_sections([(1, words(2000))])
+
+    lengths = [len(chunk["text"].split()) for chunk in chunks]
+    assert all(length <= CHUNK_MAX_WORDS + CHUNK_OVERLAP for length in lengths)
+    assert all(length >= CHUNK_MIN_WORDS for length in lengths[:-1])
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk["text"].split()[:CHUNK_OVERLAP] == previous["text"].split()[-CHUNK_OVERLAP:]
+
+
+def test_an_edit_only_changes_the_chunks_around_it():
+    text = words(3000).split()
+    edited = text[:1500] + ["inserted"] + text[1500:]
+    before = {chunk["text"] for chunk in chunk_sections([(None, " ".join(text))])}
+    after = {chunk["text"] for chunk in chunk_sections([(None, " ".join(edited))])}
+    assert len(after - before) <= 3
+
+
+def test_search_ranks_the_matching_passage_first(tmp_path):
+    path = tmp_path / "notes.txt"
+    filler = " ".join(["general notes about the project schedule"] * 40)
+    path.write_text(f"{filler} The pipeline stalls on a data hazard unless forwarding is enabled. {filler}")
+
+    result = search_file(str(path), "How does forwarding avoid a pipeline hazard?", top_k=2)
+    assert len(result["chunks"]) == 1  # only one passage mentions the query terms
+    assert "forwarding" in result["chunks"][0]["text"]
+    assert result["summary"].startswith("1 of")
+
+    nothing = search_file(str(path), "quantum entanglement")
+    assert nothing["chunks"] == [] and nothing["summary"].startswith("No passages")
+
+
+def test_pdf_results_name_their_page(pdf):
+    result = search_file(pdf, "pipeline hazard forwarding", token_budget=100_000)
+    assert result["chunks"] and all(1 <= chunk["page"] <= 12 for chunk in result["chunks"])
+    assert result["file_content"].startswith(f"[page {result['chunks'][0]['page']}]")
+
+
+def test_index_is_rebuilt_only_when_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "notes.txt"
+    path.write_text(words(500))
+    first = get_text_index(str(path))
+    assert get_text_index(str(path)) is first
+
+    monkeypatch.setattr(text_index, "_indexes", {})
+    from_disk = get_text_index(str(path))
+    assert from_disk is not first and from_disk.chunks == first.chunks
+
+    path.write_text(words(500) + " appended")
+    assert get_text_index(str(path), build=False) is None
+    assert len(get_text_index(str(path)).chunks) >= len(first.chunks)
@@ -0,0 +1,474 @@
+import os
+import logging
+import json
+import time
+import atexit
+import random
+import asyncio
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+# Local durable checkpoints of graph runs, so a failed request resumes at the node that failed.
+# Set CHECKPOINT_PATH to an empty string to compile the graph without a checkpointer.
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite")
+# CHECKPOINT_BUFFERED=1 lets the background thread commit checkpoints too: faster, but a crash loses the last second
+CHECKPOINT_BUFFERED = os.getenv("CHECKPOINT_BUFFERED", "0") == "1"
+CHECKPOINT_BATCH_SIZE = int(os.getenv("CHECKPOINT_BATCH_SIZE", "200"))  # buffered rows that trigger a flush
+CHECKPOINT_FLUSH_SECONDS = float(os.getenv("CHECKPOINT_FLUSH_SECONDS", "1"))
+CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", "10"))  # latest checkpoints kept per thread
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))  # threads idle longer are deleted
+CHECKPOINT_PRUNE_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT, type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+    channel_versions TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL,
+    type TEXT NOT NULL, value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT, value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """LangGraph checkpointer backed by a local SQLite file, keyed by thread id.
+
+    A compiled graph saves a checkpoint after every superstep and the writes of every node
+    as it finishes. `put_writes` only serializes into an in-memory buffer, so nodes never wait
+    on the disk; `put` commits the buffer with the checkpoint in one transaction before it
+    returns, so a crash loses at most the writes of the superstep in progress (and those
+    nodes run again on resume). In buffered mode (CHECKPOINT_BUFFERED=1) `put` buffers too,
+    and only the daemon thread commits, when the buffer holds CHECKPOINT_BATCH_SIZE rows or
+    every CHECKPOINT_FLUSH_SECONDS. Reads flush first, so they always see everything written
+    before them.
+
+    Retention: each thread keeps its latest CHECKPOINT_KEEP_PER_THREAD checkpoints (the
+    channel values they don't reference are dropped), and threads not updated for
+    CHECKPOINT_TTL_SECONDS are deleted.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_PATH,
+        buffered: bool = CHECKPOINT_BUFFERED,
+        batch_size: int = CHECKPOINT_BATCH_SIZE,
+        flush_seconds: float = CHECKPOINT_FLUSH_SECONDS,
+        keep_per_thread: int = CHECKPOINT_KEEP_PER_THREAD,
+        ttl_seconds: float = CHECKPOINT_TTL_SECONDS,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.buffered = buffered
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.keep_per_thread = max(1, keep_per_thread)
+        self.ttl_seconds = ttl_seconds
+        self._connection: Optional[sqlite3.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # guards the buffers
+        self._db_lock = threading.RLock()  # guards the connection
+        self._wake = threading.Event()
+        self._closed = False
+        self._checkpoints: list[tuple] = []
+        self._blobs: list[tuple] = []
+        self._writes: list[tuple] = []  # (replace, row)
+        self._touched: set[str] = set()  # threads written since the last prune
+        self._next_prune = 0.0
+        self.flushes = 0
+        self.rows_written = 0
+        self.pruned_checkpoints = 0
+        self.expired_threads = 0
+
+    # The connection and the flusher thread are created on first use, so compiling the
+    # graph at import time costs nothing.
+    def _db(self) -> sqlite3.Connection:
+        with self._db_lock:
+            if self._connection is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(_SCHEMA)
+                connection.commit()
+                self._connection = connection
+                self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+                self._thread.start()
+            return self._connection
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+                if time.monotonic() >= self._next_prune:
+                    self.prune_expired()
+            except sqlite3.Error as e:
+                logger.error("Checkpoint writer error: %s", e)
+
+    def _buffered(self) -> int:
+        return len(self._checkpoints) + len(self._blobs) + len(self._writes)
+
+    def _enqueue(self, thread_id: str, checkpoints=(), blobs=(), writes=()):
+        if self._connection is None:
+            self._db()
+        with self._lock:
+            self._checkpoints.extend(checkpoints)
+            self._blobs.extend(blobs)
+            self._writes.extend(writes)
+            self._touched.add(thread_id)
+            full = self._buffered() >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Commit everything buffered so far in one transaction."""
+        with self._db_lock:
+            with self._lock:
+                checkpoints, self._checkpoints = self._checkpoints, []
+                blobs, self._blobs = self._blobs, []
+                writes, self._writes = self._writes, []
+            if not (checkpoints or blobs or writes):
+                return
+            connection = self._db()
+            now = time.time()
+            threads = {row[0] for row in checkpoints} | {row[0] for row in blobs} | {row[0] for _, row in writes}
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+                connection.executemany("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", checkpoints)
+                # like InMemorySaver: regular writes keep the first value, special ones (errors, interrupts) the last
+                connection.executemany(
+                    "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for replace, row in writes if not replace],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for replace, row in writes if replace],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO threads VALUES (?, ?)", [(thread_id, now) for thread_id in threads]
+                )
+            self.flushes += 1
+            self.rows_written += len(checkpoints) + len(blobs) + len(writes)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint; its channel values are stored once per (channel, version).
+
+        Committed before returning, together with the buffered writes, unless the saver is buffered.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        saved = checkpoint.copy()
+        values: dict[str, Any] = saved.pop("channel_values")  # type: ignore[misc]
+        blobs = []
+        for channel, version in new_versions.items():
+            value_type, value = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), value_type, value))
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(saved)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        row = (
+            thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+            checkpoint_type, checkpoint_bytes, metadata_type, metadata_bytes,
+            json.dumps({channel: str(version) for channel, version in checkpoint["channel_versions"].items()}),
+        )
+        self._enqueue(thread_id, checkpoints=[row], blobs=blobs)
+        if not self.buffered:
+            self.flush()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer the writes of one finished (or failed) node."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for index, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, index)
+            value_type, value_bytes = self.serde.dumps_typed(value)
+            rows.append((
+                channel in WRITES_IDX_MAP,
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value_type, value_bytes, task_path),
+            ))
+        self._enqueue(thread_id, writes=rows)
+
+    def _tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint_type, checkpoint_bytes, metadata_type, metadata_bytes = row
+        connection = self._db()
+        checkpoint: Checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_bytes))
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = connection.execute(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob is not None and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(blob)
+        writes = connection.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_bytes)),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_type, value))) for task_id, channel, value_type, value in writes],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The checkpoint named by `config`, or the thread's latest one when it has no checkpoint_id."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._db_lock:
+            self.flush()
+            connection = self._db()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = connection.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                # checkpoint ids are uuid6, so they sort by creation time
+                row = connection.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints matching `config`, newest first."""
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._db_lock:
+            self.flush()
+            rows = self._db().execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                f"FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+            matches = []
+            for row in rows:
+                if limit is not None and len(matches) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                matches.append(self._tuple(row))
+        # built under the lock, yielded outside it
+        yield from matches
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._db_lock:
+            self.flush()
+            connection = self._db()
+            with connection:
+                for table in ("checkpoints", "blobs", "writes", "threads"):
+                    connection.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+            else:
+                self._prune_thread(thread_id, keep=1)
+
+    def _prune_thread(self, thread_id: str, keep: int):
+        """Keep the `keep` latest checkpoints of each namespace of a thread, with their writes and blobs."""
+        connection = self._db()
+        namespaces = [row[0] for row in connection.execute(
+            "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+        )]
+        with connection:
+            for checkpoint_ns in namespaces:
+                rows = connection.execute(
+                    "SELECT checkpoint_id, channel_versions FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC",
+                    (thread_id, checkpoint_ns),
+                ).fetchall()
+                if len(rows) <= keep:
+                    continue
+                kept, dropped = rows[:keep], rows[keep:]
+                referenced = {(channel, version) for _, versions in kept for channel, version in json.loads(versions).items()}
+                stored = connection.execute(
+                    "SELECT channel, version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns)
+                ).fetchall()
+                connection.executemany(
+                    "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    [(thread_id, checkpoint_ns, channel, version) for channel, version in stored if (channel, version) not in referenced],
+                )
+                for table in ("checkpoints", "writes"):
+                    connection.executemany(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                        [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id, _ in dropped],
+                    )
+                self.pruned_checkpoints += len(dropped)
+
+    def prune_expired(self):
+        """Apply the retention policy: drop expired threads, trim the ones written since the last pass."""
+        self._next_prune = time.monotonic() + CHECKPOINT_PRUNE_SECONDS
+        with self._db_lock:
+            self.flush()
+            with self._lock:
+                touched, self._touched = self._touched, set()
+            connection = self._db()
+            if self.ttl_seconds:
+                expired = [row[0] for row in connection.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+                )]
+                for thread_id in expired:
+                    self.delete_thread(thread_id)
+                self.expired_threads += len(expired)
+            for thread_id in touched:
+                self._prune_thread(thread_id, self.keep_per_thread)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # put_writes (and put, when buffered) only touch the in-memory buffer, so they are safe to
+    # call on the event loop; anything that may hit the disk runs in a thread.
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        if self.buffered:
+            return self.put(config, checkpoint, metadata, new_versions)
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aprune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        await asyncio.to_thread(self.prune, thread_ids, strategy=strategy)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._db_lock:
+            if self._connection is not None:
+                self.flush()
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "buffered": self.buffered,
+            "buffered_rows": self._buffered(),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "pruned_checkpoints": self.pruned_checkpoints,
+            "expired_threads": self.expired_threads,
+        }
+
+
+_checkpointer: Optional[SQLiteCheckpointSaver] = None
+
+
+def get_checkpointer(allowed_types: Sequence[tuple[str, str]] = ()) -> Optional[SQLiteCheckpointSaver]:
+    """The process-wide checkpointer, or None when CHECKPOINT_PATH is empty.
+
+    Args :
+        allowed_types (Sequence[tuple[str, str]]): (module, class) of the state's own types, e.g.
+            pydantic models, that may be deserialized besides LangChain messages and builtins.
+    """
+    global _checkpointer
+    if not CHECKPOINT_PATH:
+        return None
+    if _checkpointer is None:
+        serde = JsonPlusSerializer(allowed_msgpack_modules=list(allowed_types))
+        _checkpointer = SQLiteCheckpointSaver(CHECKPOINT_PATH, serde=serde)
+        atexit.register(_checkpointer.close)
+    return _checkpointer
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Set to a file path (e.g. .cache/file_content.sqlite) to keep parsed content across restarts
+CONTENT_CACHE_PATH = os.getenv("CONTENT_CACHE_PATH") or None
+# Bounds of the persistent store: total encoded size, and days since an entry was last used
+CONTENT_CACHE_DISK_MAX_BYTES = int(os.getenv("CONTENT_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+CONTENT_CACHE_MAX_AGE_DAYS = float(os.getenv("CONTENT_CACHE_MAX_AGE_DAYS", "30"))
+CONTENT_CACHE_PRUNE_EVERY = 100  # saves between two prunes of the persistent store
+
+
+class ContentCache:
+    """LRU cache of parsed file content keyed by (path, size, mtime, reader, arguments).
+
+    Editing a file changes its size or mtime, so stale entries are never served; they
+    simply age out of the LRU. With `persist_path` set, entries are also written to a
+    local SQLite store and read back on a memory miss, so a restarted worker comes up warm.
+    The store drops entries unused for `max_age_days`, then the least recently used ones
+    beyond `disk_max_bytes`.
+
+    Values are stored as JSON, so readers must return JSON-native values (dicts, lists,
+    strings, numbers, booleans, None): a tuple would come back from the store as a list.
+    Values JSON can't encode are kept in memory only.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = CONTENT_CACHE_MAX_BYTES,
+        persist_path: Optional[str] = CONTENT_CACHE_PATH,
+        disk_max_bytes: int = CONTENT_CACHE_DISK_MAX_BYTES,
+        max_age_days: float = CONTENT_CACHE_MAX_AGE_DAYS,
+    ):
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0  # source file bytes that did not have to be re-read and parsed
+        self.disk_evictions = 0
+        self.not_persisted = 0  # values JSON couldn't encode
+        self._saves = 0
+
+        self._store = None
+        if persist_path:
+            directory = os.path.dirname(persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._store = sqlite3.connect(persist_path, check_same_thread=False)
+            columns = [row[1] for row in self._store.execute("PRAGMA table_info(content)")]
+            if columns and "accessed" not in columns:
+                self._store.execute("DROP TABLE content")  # written before the store was pruned
+            self._store.execute(
+                "CREATE TABLE IF NOT EXISTS content "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._store.execute("CREATE INDEX IF NOT EXISTS content_accessed ON content (accessed)")
+            self._store.commit()
+            self.prune()
+
+    @staticmethod
+    def make_key(file_path: str, reader: str, args: tuple = ()) -> tuple[str, int]:
+        stat = os.stat(file_path)
+        key = json.dumps([os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, reader, list(args)])
+        return key, stat.st_size
+
+    def get(self, key: str, file_size: int = 0) -> Optional[Any]:
+        """Cached value for a `make_key` key, from memory or the persistent store; None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += file_size
+                return entry[0]
+
+        value = self._load(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self.bytes_saved += file_size
+            self._put(key, value, len(json.dumps(value, default=str)))
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, key: str, value: Any):
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            self.not_persisted += 1
+            self._put(key, value, len(json.dumps(value, default=str)))
+            return
+        self._put(key, value, len(encoded))
+        self._save(key, encoded)
+
+    def get_or_read(self, read_fn: Callable[..., Any], file_path: str, *args) -> Any:
+        """Return `read_fn(file_path, *args)`, from cache when the file is unchanged."""
+        key, file_size = self.make_key(file_path, read_fn.__name__, args)
+        value = self.get(key, file_size)
+        if value is None:
+            value = read_fn(file_path, *args)
+            self.store(key, value)
+        return value
+
+    def _put(self, key: str, value: Any, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _load(self, key: str) -> Optional[Any]:
+        if self._store is None:
+            return None
+        with self._lock:
+            row = self._store.execute("SELECT value FROM content WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._store.execute("UPDATE content SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._store.commit()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, key: str, encoded: str):
+        if self._store is None:
+            return
+        with self._lock:
+            self._store.execute(
+                "INSERT OR REPLACE INTO content (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded), time.time()),
+            )
+            self._store.commit()
+            self._saves += 1
+            due = self._saves % CONTENT_CACHE_PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop persisted entries unused for max_age_days, then the least recently used beyond disk_max_bytes.
+
+        Returns :
+            int: Number of entries removed from the store.
+        """
+        if self._store is None:
+            return 0
+        with self._lock:
+            removed = self._store.execute(
+                "DELETE FROM content WHERE accessed < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+            removed += self._store.execute(
+                "DELETE FROM content WHERE key IN (SELECT key FROM "
+                "(SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS kept FROM content) WHERE kept > ?)",
+                (self.disk_max_bytes,),
+            ).rowcount
+            self._store.commit()
+            self.disk_evictions += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._store is not None:
+                self._store.execute("DELETE FROM content")
+                self._store.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "not_persisted": self.not_persisted,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+content_cache = ContentCache()
@@ -0,0 +1,196 @@
+import os
+import time
+import atexit
+import threading
+from dataclasses import dataclass, field, fields
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.pool import QueuePool
+
+# Pool settings, overridable from the environment
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+
+@dataclass
+class PoolMetrics:
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    wait_count: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, name: str):
+        # pool events fire on whichever thread checks a connection in or out
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics = getattr(self, "metrics", None)
+            if metrics is not None:
+                metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+_engines: dict[str, Engine] = {}
+_metrics: dict[str, PoolMetrics] = {}
+_pool_args: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _attach_metrics(engine: Engine, metrics: PoolMetrics):
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.count("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.count("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.count("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.count("invalidations")
+
+
+def _check_pool_args(url: str, pool_args: dict):
+    created_with = _pool_args.get(url)
+    if created_with is not None and created_with != pool_args:
+        changed = ", ".join(f"{name}={pool_args[name]!r} (pool has {created_with[name]!r})"
+                            for name in pool_args if pool_args[name] != created_with[name])
+        raise ValueError(f"The engine for this URL already exists with other pool settings: {changed}")
+
+
+def get_engine(
+    url: str,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = MAX_OVERFLOW,
+    pool_timeout: float = POOL_TIMEOUT,
+    pool_recycle: int = POOL_RECYCLE,
+    pool_pre_ping: bool = POOL_PRE_PING,
+) -> Engine:
+    """Return the process-wide pooled engine for `url`, creating it on first use.
+
+    Raises ValueError when the engine for `url` already exists with different pool settings.
+
+    Args :
+        url (str): The database URL, also the registry key.
+        pool_size (int): Connections kept open in the pool.
+        max_overflow (int): Extra connections allowed above pool_size under load.
+        pool_timeout (float): Seconds to wait for a free connection before erroring.
+        pool_recycle (int): Reconnect connections older than this many seconds.
+        pool_pre_ping (bool): Test connections on checkout and transparently replace dead ones.
+
+    Returns :
+        Engine: The shared engine for this URL.
+    """
+    pool_args = dict(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout,
+                     pool_recycle=pool_recycle, pool_pre_ping=pool_pre_ping)
+    engine = _engines.get(url)
+    if engine is not None:
+        _check_pool_args(url, pool_args)
+        return engine
+
+    with _lock:
+        engine = _engines.get(url)
+        if engine is not None:
+            _check_pool_args(url, pool_args)
+            return engine
+
+        if url.startswith("sqlite"):
+            # SQLite picks its own pool class; size/overflow don't apply.
+            engine = create_engine(url, pool_pre_ping=pool_pre_ping)
+        else:
+            engine = create_engine(
+                url,
+                poolclass=InstrumentedQueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+            )
+        metrics = PoolMetrics()
+        _attach_metrics(engine, metrics)
+        _metrics[url] = metrics
+        _pool_args[url] = pool_args
+        _engines[url] = engine
+        return engine
+
+
+def pool_stats(url: str | None = None) -> dict:
+    """Return checkout/wait metrics and current pool occupancy, per URL.
+
+    Args :
+        url (str | None): Only report this URL. Reports every engine when None.
+
+    Returns :
+        dict: {url: {...metrics, "pool_status": str, "checked_out": int, "overflow": int}}
+    """
+    stats = {}
+    for engine_url, engine in list(_engines.items()):
+        if url is not None and engine_url != url:
+            continue
+        metrics = _metrics[engine_url]
+        entry = metrics.snapshot()
+        entry["wait_seconds_avg"] = (
+            entry["wait_seconds_total"] / entry["wait_count"] if entry["wait_count"] else 0.0
+        )
+        pool = engine.pool
+        entry["pool_status"] = pool.status()
+        if isinstance(pool, QueuePool):
+            entry["checked_out"] = pool.checkedout()
+            entry["overflow"] = pool.overflow()
+            entry["size"] = pool.size()
+        stats[engine.url.render_as_string(hide_password=True)] = entry
+    return stats
+
+
+def dispose_engines():
+    """Close every pooled connection and drop all engines from the registry."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _metrics.clear()
+        _pool_args.clear()
+
+
+atexit.register(dispose_engines)
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+# Set to a file path (e.g. .cache/file_index.json) to keep the index across restarts
+FILE_INDEX_PATH = os.getenv("FILE_INDEX_PATH") or None
+# Directory mtimes are re-checked at most this often
+FILE_INDEX_REFRESH_SECONDS = float(os.getenv("FILE_INDEX_REFRESH_SECONDS", "2"))
+# Number of candidate files put in a prompt
+FILE_PROMPT_TOP_K = int(os.getenv("FILE_PROMPT_TOP_K", "20"))
+
+
+@dataclass
+class FileEntry:
+    path: str
+    type: str  # extension without the dot, e.g. "pdf"
+    size: int
+    mtime: float
+
+
+def _trigrams(text: str) -> set[str]:
+    trigrams = set()
+    for token in "".join(c if c.isalnum() else " " for c in text.lower()).split():
+        padded = f" {token} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class FileIndex:
+    """Recursive index of a directory tree with a trigram index over file names.
+
+    A refresh only re-lists directories whose mtime changed (a file was added, removed or
+    renamed in them); unchanged directories are skipped. Note that editing a file in place
+    does not change its directory's mtime, so size/mtime metadata can lag until the
+    directory is next re-listed.
+    """
+
+    def __init__(self, root: str, persist_path: Optional[str] = None):
+        self.root = root
+        self.persist_path = persist_path
+        self._lock = threading.Lock()
+        self._dir_mtimes: dict[str, int] = {}
+        self._subdirs: dict[str, list[str]] = {}
+        self._dir_files: dict[str, list[str]] = {}
+        self._files: dict[str, FileEntry] = {}
+        self._trigram_index: dict[str, set[str]] = {}
+        self._last_refresh = 0.0
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+    def refresh(self, force: bool = False):
+        """Bring the index up to date with the file system."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < FILE_INDEX_REFRESH_SECONDS:
+                return
+            changed = False
+            stack = [self.root]
+            while stack:
+                directory = stack.pop()
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except FileNotFoundError:
+                    self._remove_dir(directory)
+                    changed = True
+                    continue
+                if self._dir_mtimes.get(directory) != mtime:
+                    self._scan_dir(directory, mtime)
+                    changed = True
+                stack.extend(self._subdirs.get(directory, []))
+            self._last_refresh = time.monotonic()
+            if changed and self.persist_path:
+                self._save()
+
+    def _scan_dir(self, directory: str, mtime: int):
+        files, subdirs = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files.append(entry.path)
+                    if entry.path not in self._files:
+                        self._index_name(entry.path)
+                    self._files[entry.path] = FileEntry(
+                        path=entry.path,
+                        type=os.path.splitext(entry.name)[1].lstrip(".").lower(),
+                        size=stat.st_size,
+                        mtime=stat.st_mtime,
+                    )
+
+        for path in set(self._dir_files.get(directory, [])) - set(files):
+            self._remove_file(path)
+        for subdir in set(self._subdirs.get(directory, [])) - set(subdirs):
+            self._remove_dir(subdir)
+
+        self._dir_files[directory] = files
+        self._subdirs[directory] = subdirs
+        self._dir_mtimes[directory] = mtime
+
+    def _index_name(self, path: str):
+        for trigram in _trigrams(os.path.basename(path)):
+            self._trigram_index.setdefault(trigram, set()).add(path)
+
+    def _remove_file(self, path: str):
+        self._files.pop(path, None)
+        for trigram in _trigrams(os.path.basename(path)):
+            paths = self._trigram_index.get(trigram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._trigram_index[trigram]
+
+    def _remove_dir(self, directory: str):
+        for path in self._dir_files.pop(directory, []):
+            self._remove_file(path)
+        for subdir in self._subdirs.pop(directory, []):
+            self._remove_dir(subdir)
+        self._dir_mtimes.pop(directory, None)
+
+    # Readers take the lock too: a refresh on another thread mutates _files and _trigram_index
+
+    def files(self) -> list[str]:
+        self.refresh()
+        with self._lock:
+            return sorted(self._files)
+
+    def entries(self) -> list[FileEntry]:
+        self.refresh()
+        with self._lock:
+            return [self._files[path] for path in sorted(self._files)]
+
+    def lookup(self, query: str, k: int = FILE_PROMPT_TOP_K) -> list[str]:
+        """Return up to k file paths whose names best match the query (trigram similarity)."""
+        self.refresh()
+        query_trigrams = _trigrams(query)
+        shared: dict[str, int] = {}
+        with self._lock:
+            for trigram in query_trigrams:
+                for path in self._trigram_index.get(trigram, ()):
+                    shared[path] = shared.get(path, 0) + 1
+
+        # Fraction of each file name's trigrams found in the query, so a short name fully
+        # mentioned in a long request still ranks first
+        scores = {path: count / len(_trigrams(os.path.basename(path))) for path, count in shared.items()}
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return [path for path in ranked if scores[path] >= 0.25][:k]
+
+    def candidate_files(self, query: str, k: int = FILE_PROMPT_TOP_K) -> list[str]:
+        """Files to show the model for this query: everything for small trees, else the top-k matches."""
+        files = self.files()
+        if len(files) <= k:
+            return files
+        return self.lookup(query, k)
+
+    def _save(self):
+        directory = os.path.dirname(self.persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {
+            "root": self.root,
+            "dir_mtimes": self._dir_mtimes,
+            "subdirs": self._subdirs,
+            "dir_files": self._dir_files,
+            "files": [asdict(entry) for entry in self._files.values()],
+        }
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.persist_path)
+
+    def _load(self):
+        try:
+            with open(self.persist_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("root") != self.root:
+            return
+        self._dir_mtimes = state["dir_mtimes"]
+        self._subdirs = state["subdirs"]
+        self._dir_files = state["dir_files"]
+        for entry in state["files"]:
+            self._files[entry["path"]] = FileEntry(**entry)
+            self._index_name(entry["path"])
+
+
+_indexes: dict[str, FileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_file_index(root: str) -> FileIndex:
+    """Return the shared index for a directory tree, creating it on first use."""
+    index = _indexes.get(root)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(root)
+            if index is None:
+                persist_path = None
+                if FILE_INDEX_PATH:
+                    # one file per indexed root
+                    base, extension = os.path.splitext(FILE_INDEX_PATH)
+                    digest = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:12]
+                    persist_path = f"{base}_{digest}{extension or '.json'}"
+                index = FileIndex(root, persist_path=persist_path)
+                _indexes[root] = index
+    return index
@@ -1,32 +1,97 @@
 import os
 import json
+from collections import Counter
+from typing import Optional, TYPE_CHECKING
 
-from pypdf import PdfReader
-import pandas as pd
+# pandas and pypdf are imported inside the readers that need them, so importing this
+# module (and the file reader agent) stays cheap for requests that never read a CSV or PDF
+if TYPE_CHECKING:
+    from pypdf import PdfReader
 
-def list_files(dir: str) -> list[str]:
-    # return os.listdir(dir)
-    
-    full_paths = [os.path.join(dir, f) for f in os.listdir(dir)]
+from util_functions.file_index import get_file_index
+from util_functions.json_stream import summarize_json, format_json_summary, iter_json_path
 
-    return full_paths
+def list_files(dir: str) -> list[str]:
+    # Recursive, served from the incrementally refreshed file index
+    return get_file_index(dir).files()
 
 
 MAX_FILE_CONTENT_LENGTH = 100  # Max characters for file content
+SUMMARY_LENGTH = 500  # Max characters for the summary
+
+PDF_PAGES_MAX_CHARS = 4000  # Max characters returned by read_pdf_pages
+
 
-def read_pdf(file_path: str) -> dict:
+def iter_pdf_pages(reader: "PdfReader", start_page: int = 1, end_page: Optional[int] = None):
+    """Yield (page_number, text) for 1-based pages start_page..end_page, extracting each page only when asked for."""
+    page_count = len(reader.pages)
+    end_page = page_count if end_page is None else min(end_page, page_count)
+    for page_number in range(max(start_page, 1), end_page + 1):
+        yield page_number, reader.pages[page_number - 1].extract_text() or ""
+
+
+def read_pdf(file_path: str, max_chars: int = SUMMARY_LENGTH) -> dict:
+    from pypdf import PdfReader
+
+    # Extract pages only until the summary budget is filled
     with PdfReader(file_path) as file:
-        number_of_pages = len(file.pages)
-        texts = [file.pages[page].extract_text() for page in range(number_of_pages)]
+        texts = []
+        collected = 0
+        for _, text in iter_pdf_pages(file):
+            texts.append(text)
+            collected += len(text) + 1
+            if collected > max_chars:
+                break
         full_content = "\n".join(texts)
-        
-        summary = full_content[:500] + "..." if len(full_content) > 500 else full_content
-        
+
+        summary = full_content[:max_chars] + "..." if len(full_content) > max_chars else full_content
+
         return {
             "file_content": full_content[:MAX_FILE_CONTENT_LENGTH],
             "summary": summary
         }
-    
+
+
+def read_pdf_pages(file_path: str, start_page: int, end_page: Optional[int] = None, max_chars: int = PDF_PAGES_MAX_CHARS) -> dict:
+    """Extract text from a 1-based, inclusive page range of a PDF.
+
+    Args :
+        file_path (str): Path of the PDF file.
+        start_page (int): First page to read.
+        end_page (Optional[int]): Last page to read; defaults to start_page.
+        max_chars (int): Stop extracting once this many characters have been collected.
+
+    Returns :
+        dict: page_count, pages ([{"page": int, "text": str}]), file_content and summary.
+    """
+    from pypdf import PdfReader
+
+    end_page = start_page if end_page is None else end_page
+    with PdfReader(file_path) as file:
+        page_count = len(file.pages)
+        pages = []
+        collected = 0
+        for page_number, text in iter_pdf_pages(file, start_page, end_page):
+            text = text[:max_chars - collected]
+            pages.append({"page": page_number, "text": text})
+            collected += len(text)
+            if collected >= max_chars:
+                break
+
+    content = "\n".join(page["text"] for page in pages)
+    if pages:
+        summary = f"Pages {pages[0]['page']}-{pages[-1]['page']} of {page_count}"
+    else:
+        summary = f"No pages in range {start_page}-{end_page}; the document has {page_count} pages"
+    if collected >= max_chars:
+        summary += f" (truncated to {max_chars} characters)"
+    return {
+        "page_count": page_count,
+        "pages": pages,
+        "file_content": content,
+        "summary": summary,
+    }
+
 def read_txt(file_path: str) -> dict:
     with open(file_path, "r") as file:
         full_content = file.read()
@@ -36,23 +101,175 @@ def read_txt(file_path: str) -> dict:
             "summary": summary
         }
 
+CSV_CHUNK_ROWS = 5000  # rows parsed per chunk
+CSV_DTYPE_SAMPLE_ROWS = 1000  # rows used to infer column dtypes
+CSV_HEAD_ROWS = 5  # rows kept as a sample of the content
+CSV_TOP_K = 5  # most frequent values reported per text column
+CSV_MAX_DISTINCT = 10000  # distinct values tracked per text column before counts become approximate
+
+
+def infer_csv_dtypes(file_path: str, sample_rows: int = CSV_DTYPE_SAMPLE_ROWS) -> dict:
+    """Infer explicit column dtypes from the first rows: numbers as float64, everything else as str."""
+    import pandas as pd
+
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    return {
+        column: "float64" if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) else "str"
+        for column, dtype in sample.dtypes.items()
+    }
+
+
+def profile_csv(file_path: str, chunk_rows: int = CSV_CHUNK_ROWS, head_rows: int = CSV_HEAD_ROWS, top_k: int = CSV_TOP_K) -> dict:
+    """Profile a CSV in a single chunked pass, so memory stays flat as the file grows.
+
+    Args :
+        file_path (str): Path of the CSV file.
+        chunk_rows (int): Rows parsed per chunk.
+        head_rows (int): Rows kept as a sample.
+        top_k (int): Most frequent values reported per text column.
+
+    Returns :
+        dict: row_count, head (sample records) and per-column dtype, null count,
+            numeric min/max/mean or top-k text values.
+    """
+    import pandas as pd
+
+    dtypes = infer_csv_dtypes(file_path)
+    try:
+        chunks = pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_rows)
+        return _profile_chunks(chunks, dtypes, head_rows, top_k)
+    except ValueError:
+        # A column looked numeric in the sample but isn't further down; profile it as text
+        dtypes = {column: "str" for column in dtypes}
+        chunks = pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_rows)
+        return _profile_chunks(chunks, dtypes, head_rows, top_k)
+
+
+def _profile_chunks(chunks, dtypes: dict, head_rows: int, top_k: int) -> dict:
+    row_count = 0
+    head = []
+    nulls = {column: 0 for column in dtypes}
+    numeric = {column: {"min": None, "max": None, "sum": 0.0, "count": 0}
+               for column, dtype in dtypes.items() if dtype == "float64"}
+    counts = {column: Counter() for column, dtype in dtypes.items() if dtype != "float64"}
+    approximate = set()
+
+    for chunk in chunks:
+        if len(head) < head_rows:
+            head.extend(json.loads(chunk.head(head_rows - len(head)).to_json(orient="records")))
+        row_count += len(chunk)
+
+        for column, null_count in chunk.isna().sum().items():
+            nulls[column] += int(null_count)
+
+        for column, stats in numeric.items():
+            values = chunk[column]
+            if values.count() == 0:
+                continue
+            chunk_min, chunk_max = float(values.min()), float(values.max())
+            stats["min"] = chunk_min if stats["min"] is None else min(stats["min"], chunk_min)
+            stats["max"] = chunk_max if stats["max"] is None else max(stats["max"], chunk_max)
+            stats["sum"] += float(values.sum())
+            stats["count"] += int(values.count())
+
+        for column, counter in counts.items():
+            for value, count in chunk[column].value_counts().items():
+                if value in counter or len(counter) < CSV_MAX_DISTINCT:
+                    counter[value] += int(count)
+                else:
+                    approximate.add(column)
+
+    columns = []
+    for column, dtype in dtypes.items():
+        entry = {"name": column, "dtype": dtype, "nulls": nulls[column]}
+        if column in numeric:
+            stats = numeric[column]
+            entry.update(min=stats["min"], max=stats["max"],
+                         mean=round(stats["sum"] / stats["count"], 4) if stats["count"] else None)
+        else:
+            entry["distinct"] = len(counts[column])
+            entry["top_values"] = counts[column].most_common(top_k)
+            if column in approximate:
+                entry["approximate"] = True
+        columns.append(entry)
+
+    return {"row_count": row_count, "columns": columns, "head": head}
+
+
+def format_csv_profile(profile: dict, max_length: int = SUMMARY_LENGTH) -> str:
+    """Render the profile as text, stopping once `max_length` characters are reached."""
+    summary = f"{profile['row_count']} rows, {len(profile['columns'])} columns. "
+    for column in profile["columns"]:
+        if column["dtype"] == "float64":
+            part = f"{column['name']} (numeric, min {column['min']}, max {column['max']}, mean {column['mean']}"
+        else:
+            top = ", ".join(str(value) for value, _ in column["top_values"][:3])
+            distinct = f"{column['distinct']}+" if column.get("approximate") else column["distinct"]
+            part = f"{column['name']} (text, {distinct} distinct, top: {top}"
+        part += f", {column['nulls']} nulls); " if column["nulls"] else "); "
+        if len(summary) + len(part) > max_length:
+            return summary[:max_length] + "..."
+        summary += part
+    return summary.rstrip("; ")
+
+
 def read_csv(file_path: str) -> dict:
-    df = pd.read_csv(file_path)
-    full_content = df.to_json()
-    summary = full_content[:500] + "..." if len(full_content) > 500 else full_content
+    profile = profile_csv(file_path)
+    head = json.dumps(profile["head"], default=str)
     return {
-        "file_content": full_content[:MAX_FILE_CONTENT_LENGTH],
-        "summary": summary
+        "file_content": head[:MAX_FILE_CONTENT_LENGTH],
+        "summary": format_csv_profile(profile),
+        "profile": profile,
     }
 
+JSON_PATH_MAX_MATCHES = 50  # matches returned by read_json_path
+JSON_PATH_MAX_CHARS = 4000  # Max characters of matched values returned by read_json_path
+
+
 def read_json(file_path: str) -> dict:
-    with open(file_path, "r") as file:
-        full_content = json.dumps(json.load(file))
-        summary = full_content[:500] + "..." if len(full_content) > 500 else full_content
-        return {
-            "file_content": full_content[:MAX_FILE_CONTENT_LENGTH],
-            "summary": summary
-        }
+    # One streaming pass: the document is never loaded as a whole, so memory stays flat as it grows
+    structure = summarize_json(file_path)
+    head = json.dumps(structure["head"], default=str)
+    return {
+        "file_content": head[:MAX_FILE_CONTENT_LENGTH],
+        "summary": format_json_summary(structure, SUMMARY_LENGTH),
+        "structure": structure,
+    }
+
+
+def read_json_path(file_path: str, json_path: str, max_matches: int = JSON_PATH_MAX_MATCHES, max_chars: int = JSON_PATH_MAX_CHARS) -> dict:
+    """Extract the values at a JSONPath (e.g. `$.items[*].name`) without loading the rest of the file.
+
+    Args :
+        file_path (str): Path of the JSON file.
+        json_path (str): JSONPath subset: $, .key, ['key'], [index], [*] and .*.
+        max_matches (int): Stop reading after this many matches.
+        max_chars (int): Max characters of matched values in file_content.
+
+    Returns :
+        dict: matches ([{"path": str, "value": Any}]), file_content and summary.
+    """
+    matches = []
+    for path, value in iter_json_path(file_path, json_path):
+        matches.append({"path": path, "value": value})
+        if len(matches) >= max_matches:
+            break
+
+    content = json.dumps([match["value"] for match in matches], default=str)
+    summary = f"{len(matches)} match{'es' if len(matches) != 1 else ''} for {json_path}"
+    if len(matches) >= max_matches:
+        summary += f" (stopped at the first {max_matches})"
+    if len(content) > max_chars:
+        content = content[:max_chars]
+        summary += f" (truncated to {max_chars} characters)"
+    return {
+        "matches": matches,
+        "file_content": content,
+        "summary": summary,
+    }
+
+# Reader for each file extension, used when several files are read at once
+FILE_READERS = {".json": read_json, ".csv": read_csv, ".txt": read_txt, ".pdf": read_pdf}
 
 if __name__=="__main__":
     print(list_files(dir ="/mnt/c/Projects/Pydantic_Langgraph_SQL_and_File_Reader_Agents/files"))
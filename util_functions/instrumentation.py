@@ -0,0 +1,306 @@
+import os
+import json
+import time
+import atexit
+import inspect
+import functools
+import threading
+from contextvars import ContextVar
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+from pydantic_ai import ModelRetry
+
+# Write a snapshot here at exit; a ".prom" extension writes Prometheus text, anything else JSON
+METRICS_PATH = os.getenv("METRICS_PATH") or None
+# Serve /metrics (Prometheus text) and /metrics.json on this local port
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+
+class SpanStats:
+    """Running totals for one node, tool or agent.
+
+    cpu_seconds stays None for async functions: their work runs in worker threads or
+    processes, so the event loop thread's CPU time would say nothing about it.
+    """
+
+    __slots__ = ("calls", "errors", "wall_seconds", "cpu_seconds", "max_wall_seconds", "bytes_returned")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds: Optional[float] = None
+        self.max_wall_seconds = 0.0
+        self.bytes_returned = 0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class AgentStats:
+    __slots__ = ("runs", "llm_requests", "input_tokens", "output_tokens", "validator_retries")
+
+    def __init__(self):
+        self.runs = 0
+        self.llm_requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.validator_retries = 0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Metrics:
+    """Process-wide registry for node, tool and agent measurements."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: dict[tuple[str, str], SpanStats] = {}
+        self.agents: dict[str, AgentStats] = {}
+
+    def record_span(self, kind: str, name: str, wall: float, cpu: Optional[float], size: int, error: bool):
+        with self._lock:
+            stats = self.spans.get((kind, name))
+            if stats is None:
+                stats = self.spans[(kind, name)] = SpanStats()
+            stats.calls += 1
+            stats.errors += error
+            stats.wall_seconds += wall
+            if cpu is not None:
+                stats.cpu_seconds = (stats.cpu_seconds or 0.0) + cpu
+            stats.max_wall_seconds = max(stats.max_wall_seconds, wall)
+            stats.bytes_returned += size
+
+    def add_agent(self, name: str, **counts: int):
+        with self._lock:
+            stats = self.agents.get(name)
+            if stats is None:
+                stats = self.agents[name] = AgentStats()
+            for field, value in counts.items():
+                setattr(stats, field, getattr(stats, field) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            spans: dict[str, dict] = {}
+            for (kind, name), stats in sorted(self.spans.items()):
+                spans.setdefault(kind, {})[name] = {
+                    **stats.as_dict(),
+                    "wall_seconds": round(stats.wall_seconds, 6),
+                    "cpu_seconds": None if stats.cpu_seconds is None else round(stats.cpu_seconds, 6),
+                    "max_wall_seconds": round(stats.max_wall_seconds, 6),
+                }
+            return {**spans, "agent": {name: stats.as_dict() for name, stats in sorted(self.agents.items())}}
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.agents.clear()
+
+    def to_prometheus(self) -> str:
+        lines = []
+        snapshot = self.snapshot()
+        span_metrics = [
+            ("calls_total", "calls", "counter"),
+            ("errors_total", "errors", "counter"),
+            ("wall_seconds_total", "wall_seconds", "counter"),
+            ("cpu_seconds_total", "cpu_seconds", "counter"),
+            ("max_wall_seconds", "max_wall_seconds", "gauge"),
+            ("returned_bytes_total", "bytes_returned", "counter"),
+        ]
+        for kind in ("node", "tool"):
+            for suffix, field, metric_type in span_metrics:
+                metric = f"agents_{kind}_{suffix}"
+                lines.append(f"# TYPE {metric} {metric_type}")
+                for name, stats in snapshot.get(kind, {}).items():
+                    if stats[field] is not None:
+                        lines.append(f'{metric}{{{kind}="{name}"}} {stats[field]}')
+        for field in AgentStats.__slots__:
+            metric = f"agents_agent_{field}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in snapshot["agent"].items():
+                lines.append(f'{metric}{{agent="{name}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+# Spans of the request being processed, when a trace is active (see `trace_request`)
+_current_trace: ContextVar[Optional[list]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def trace_request():
+    """Collect every node/tool span recorded while the block runs (including in tasks and threads it starts).
+
+    Usage :
+        with trace_request() as spans:
+            await invoke_graph(state)
+        print(summarize_trace(spans))
+    """
+    spans: list = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+
+def summarize_trace(spans: list[dict]) -> dict:
+    """Wall/CPU time and bytes per span name for one traced request (CPU time only for sync spans)."""
+    summary: dict[str, dict] = {}
+    for span in spans:
+        entry = summary.setdefault(f"{span['kind']}:{span['name']}", {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": None, "bytes": 0})
+        entry["calls"] += 1
+        entry["wall_seconds"] = round(entry["wall_seconds"] + span["wall_seconds"], 6)
+        if span["cpu_seconds"] is not None:
+            entry["cpu_seconds"] = round((entry["cpu_seconds"] or 0.0) + span["cpu_seconds"], 6)
+        entry["bytes"] += span["bytes"]
+    return summary
+
+
+def result_size(value: Any) -> int:
+    """Approximate size in bytes of what a tool hands back to the model."""
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if hasattr(value, "model_dump_json"):
+        return len(value.model_dump_json())
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value, default=str))
+    return len(str(value))
+
+
+def _finish(kind: str, name: str, start_wall: float, start_cpu: Optional[float], result: Any, error: bool):
+    wall = time.perf_counter() - start_wall
+    cpu = None if start_cpu is None else time.thread_time() - start_cpu
+    size = result_size(result) if kind == "tool" else 0
+    metrics.record_span(kind, name, wall, cpu, size, error)
+    spans = _current_trace.get()
+    if spans is not None:
+        spans.append({"kind": kind, "name": name, "wall_seconds": wall, "cpu_seconds": cpu, "bytes": size, "error": error})
+
+
+def timed(kind: str, name: Optional[str] = None) -> Callable:
+    """Decorator recording wall time, CPU time, errors and (for tools) returned bytes.
+
+    Works on sync and async functions and keeps their signature, so it can sit under
+    `@agent.tool`. CPU time is only recorded for sync functions: coroutines do their work
+    in `asyncio.to_thread` or the parse executor, and the event loop thread's CPU time
+    while one is pending belongs mostly to other tasks.
+    """
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__name__
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                start_wall, start_cpu = time.perf_counter(), None
+                try:
+                    result = await function(*args, **kwargs)
+                except BaseException:
+                    _finish(kind, span_name, start_wall, start_cpu, None, True)
+                    raise
+                _finish(kind, span_name, start_wall, start_cpu, result, False)
+                return result
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start_wall, start_cpu = time.perf_counter(), time.thread_time()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                _finish(kind, span_name, start_wall, start_cpu, None, True)
+                raise
+            _finish(kind, span_name, start_wall, start_cpu, result, False)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_node(name: Optional[str] = None) -> Callable:
+    return timed("node", name)
+
+
+def instrument_tool(name: Optional[str] = None) -> Callable:
+    return timed("tool", name)
+
+
+def count_validator_retries(agent_name: str) -> Callable:
+    """Decorator for output validators counting the ModelRetry exceptions they raise."""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            try:
+                return function(*args, **kwargs)
+            except ModelRetry:
+                metrics.add_agent(agent_name, validator_retries=1)
+                raise
+        return wrapper
+    return decorator
+
+
+def record_agent_run(agent_name: str, result: Any):
+    """Add the LLM round trips and tokens of a finished agent run (an AgentRunResult)."""
+    usage = result.usage()
+    metrics.add_agent(
+        agent_name,
+        runs=1,
+        llm_requests=usage.requests,
+        input_tokens=usage.request_tokens or 0,
+        output_tokens=usage.response_tokens or 0,
+    )
+
+
+def write_metrics(path: str):
+    """Write the current snapshot to a file, as Prometheus text for *.prom and JSON otherwise."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        if path.endswith(".prom"):
+            f.write(metrics.to_prometheus())
+        else:
+            json.dump(metrics.snapshot(), f, indent=4)
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = metrics.to_prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def serve_metrics(port: int = METRICS_PORT, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """Start (once) a local HTTP endpoint serving /metrics and /metrics.json from a daemon thread."""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"Serving metrics on http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+if METRICS_PATH:
+    atexit.register(write_metrics, METRICS_PATH)
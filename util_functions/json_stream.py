@@ -0,0 +1,457 @@
+import os
+import re
+import json
+from json.decoder import scanstring
+from typing import Any, Iterator, Optional
+
+# Characters read per chunk; values that fit in the buffer are decoded whole by the C decoder
+JSON_STREAM_CHUNK_CHARS = int(os.getenv("JSON_STREAM_CHUNK_CHARS", str(64 * 1024)))
+JSON_SUMMARY_MAX_PATHS = 200  # distinct paths tracked before new ones are only counted
+JSON_SUMMARY_SAMPLES = 3  # sample values kept per path
+JSON_SAMPLE_MAX_CHARS = 200  # samples longer than this (as JSON) are kept as truncated text
+JSON_HEAD_ITEMS = 3  # first top-level items kept as the document head
+
+START_MAP, START_ARRAY, END_MAP, END_ARRAY, VALUE = "start_map", "start_array", "end_map", "end_array", "value"
+WILDCARD = object()  # `[*]` / `.*` step of a parsed JSONPath
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = frozenset(" \t\n\r,]}")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_PATH_STEP = re.compile(
+    r"""\.(?P<name>[A-Za-z_][A-Za-z0-9_-]*)|(?P<dot_star>\.\*)|\[\s*(?:(?P<index>\d+)|(?P<star>\*)"""
+    r"""|'(?P<single>(?:[^'\\]|\\.)*)'|"(?P<double>(?:[^"\\]|\\.)*)")\s*\]"""
+)
+
+
+class JsonEventReader:
+    """Walk a JSON document chunk by chunk, yielding (path, event, value) tuples.
+
+    A value that fits in the read buffer is decoded whole and reported as one VALUE event.
+    Larger objects and arrays are entered instead: START_MAP/START_ARRAY, events for each
+    child, then END_MAP/END_ARRAY. Memory therefore stays around the chunk size however
+    large the document is. `path` is a tuple of object keys and array indexes.
+    """
+
+    def __init__(self, file, chunk_chars: int = JSON_STREAM_CHUNK_CHARS):
+        self._file = file
+        self._chunk_chars = chunk_chars
+        self._buffer = ""
+        self._pos = 0
+        self._offset = 0  # characters dropped from the front of the buffer
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_chars)
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at the end of the document."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid JSON at character {self._offset + self._pos}: {message}")
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise self._error(f"expected {char!r}")
+        self._pos += 1
+
+    def _key(self) -> str:
+        if self._peek() != '"':
+            raise self._error("expected a string key")
+        while True:
+            try:
+                key, end = scanstring(self._buffer, self._pos + 1)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise self._error("unterminated string")
+            self._pos = end
+            self._expect(":")
+            return key
+
+    def _whole_value(self) -> tuple[bool, Any]:
+        """Decode the value at the cursor; (False, None) means it is a container too large to decode whole."""
+        container = self._buffer[self._pos] in "{["
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+                # a number at the buffer edge may continue in the next chunk ("12" + "34", "1" + ".5")
+                if self._eof or (end < len(self._buffer) and (self._buffer[end - 1] in '"]}' or self._buffer[end] in _DELIMITERS)):
+                    self._pos = end
+                    return True, value
+            except json.JSONDecodeError:
+                if container and (self._eof or len(self._buffer) - self._pos >= self._chunk_chars):
+                    return False, None
+                if self._eof:
+                    raise self._error("invalid value")
+            self._fill()
+
+    def events(self) -> Iterator[tuple[tuple, str, Any]]:
+        path: list = []
+        open_containers: list[str] = []
+        state = "value"
+        while True:
+            if state == "value":
+                char = self._peek()
+                if not char:
+                    raise self._error("unexpected end of document")
+                whole, value = self._whole_value()
+                if whole:
+                    yield tuple(path), VALUE, value
+                    state = "next"
+                else:
+                    self._pos += 1
+                    yield tuple(path), START_MAP if char == "{" else START_ARRAY, None
+                    open_containers.append(char)
+                    path.append(None)
+                    state = "first"
+                continue
+
+            if not open_containers:
+                if self._peek():
+                    raise self._error("extra data after the document")
+                return
+
+            is_map = open_containers[-1] == "{"
+            char = self._peek()
+            if char == ("}" if is_map else "]"):
+                self._pos += 1
+                open_containers.pop()
+                path.pop()
+                yield tuple(path), END_MAP if is_map else END_ARRAY, None
+                state = "next"
+            elif state == "first" or char == ",":
+                if state == "next":
+                    self._pos += 1
+                if is_map:
+                    path[-1] = self._key()
+                else:
+                    path[-1] = 0 if state == "first" else path[-1] + 1
+                state = "value"
+            else:
+                raise self._error("expected ',' or a closing bracket")
+
+
+def iter_json_events(file_path: str, chunk_chars: int = JSON_STREAM_CHUNK_CHARS) -> Iterator[tuple[tuple, str, Any]]:
+    with open(file_path, "r", encoding="utf-8") as file:
+        yield from JsonEventReader(file, chunk_chars).events()
+
+
+def format_path(path: tuple, wildcard_indexes: bool = False) -> str:
+    """Render a path tuple as JSONPath, e.g. ("items", 0, "name") -> $.items[0].name."""
+    parts = ["$"]
+    for step in path:
+        if isinstance(step, int):
+            parts.append("[*]" if wildcard_indexes else f"[{step}]")
+        elif _IDENTIFIER.match(step):
+            parts.append(f".{step}")
+        else:
+            parts.append(f"[{json.dumps(step)}]")
+    return "".join(parts)
+
+
+_TYPE_NAMES = {dict: "object", list: "array", str: "string", bool: "boolean", type(None): "null"}
+
+
+def _type_name(value: Any) -> str:
+    return _TYPE_NAMES.get(type(value), "number")
+
+
+def _sample(value: Any) -> Any:
+    if isinstance(value, str):
+        return value[:80] + "..." if len(value) > 80 else value
+    if isinstance(value, (dict, list)):
+        encoded = json.dumps(value, separators=(",", ":"), default=str)
+        return value if len(encoded) <= JSON_SAMPLE_MAX_CHARS else encoded[:JSON_SAMPLE_MAX_CHARS] + "..."
+    return value
+
+
+class _StructureStats:
+    """Per-path counts, types, array lengths and samples, fed by JsonEventReader events."""
+
+    def __init__(self, max_paths: int, samples: int):
+        self.max_paths = max_paths
+        self.samples = samples
+        self.paths: dict[str, dict] = {}
+        self.dropped_paths = 0
+        self._suffixes: dict[str, str] = {}
+
+    def _entry(self, path: str) -> Optional[dict]:
+        entry = self.paths.get(path)
+        if entry is None:
+            if len(self.paths) >= self.max_paths:
+                self.dropped_paths += 1
+                return None
+            entry = self.paths[path] = {"count": 0, "types": {}, "samples": []}
+        return entry
+
+    def record(self, path: str, type_name: str, value: Any = None, sampled: bool = False) -> Optional[dict]:
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        entry["count"] += 1
+        entry["types"][type_name] = entry["types"].get(type_name, 0) + 1
+        if sampled and len(entry["samples"]) < self.samples:
+            entry["samples"].append(_sample(value))
+        return entry
+
+    def record_length(self, entry: Optional[dict], length: int):
+        if entry is not None:
+            entry["min_length"] = min(entry.get("min_length", length), length)
+            entry["max_length"] = max(entry.get("max_length", length), length)
+
+    def key_suffix(self, key: str) -> str:
+        suffix = self._suffixes.get(key)
+        if suffix is None:
+            suffix = f".{key}" if _IDENTIFIER.match(key) else f"[{json.dumps(key)}]"
+            if len(self._suffixes) < self.max_paths:
+                self._suffixes[key] = suffix
+        return suffix
+
+    def observe(self, path: str, value: Any):
+        """Record a decoded value and, recursively, everything inside it."""
+        type_name = _TYPE_NAMES.get(type(value), "number")
+        # inlined record(): this runs once for every value in the document
+        entry = self.paths.get(path) or self._entry(path)
+        if entry is not None:
+            entry["count"] += 1
+            types = entry["types"]
+            types[type_name] = types.get(type_name, 0) + 1
+            if len(entry["samples"]) < self.samples:
+                entry["samples"].append(_sample(value))
+        if type_name == "object":
+            for key, child in value.items():
+                self.observe(path + (self._suffixes.get(key) or self.key_suffix(key)), child)
+        elif type_name == "array":
+            self.record_length(entry, len(value))
+            child_path = path + "[*]"
+            for child in value:
+                self.observe(child_path, child)
+
+
+def summarize_json(
+    file_path: str,
+    max_paths: int = JSON_SUMMARY_MAX_PATHS,
+    samples: int = JSON_SUMMARY_SAMPLES,
+    chunk_chars: int = JSON_STREAM_CHUNK_CHARS,
+) -> dict:
+    """Describe the structure of a JSON file in one streaming pass.
+
+    Args :
+        file_path (str): Path of the JSON file.
+        max_paths (int): Distinct paths tracked; further paths are only counted in dropped_paths.
+        samples (int): Sample values kept per path.
+        chunk_chars (int): Characters read per chunk.
+
+    Returns :
+        dict: root_type, length (top-level items or keys), head (the first of them), paths ({"$[*].name": {count, types,
+            samples, min_length/max_length for arrays}}) and dropped_paths.
+    """
+    stats = _StructureStats(max_paths, samples)
+    root_type = None
+    length = None
+    head: Any = None
+    # (path, stats entry, child count) for each container that was entered rather than decoded whole
+    entered: list[tuple[str, Optional[dict], int]] = []
+
+    for path, event, value in iter_json_events(file_path, chunk_chars):
+        if event in (END_MAP, END_ARRAY):
+            _, entry, children = entered.pop()
+            if event == END_ARRAY:
+                stats.record_length(entry, children)
+            if not entered:
+                length = children
+            continue
+
+        if entered:
+            parent_path, parent_entry, children = entered[-1]
+            entered[-1] = (parent_path, parent_entry, children + 1)
+            key = path[-1]
+            path_text = parent_path + ("[*]" if isinstance(key, int) else stats.key_suffix(key))
+        else:
+            path_text = "$"
+
+        if event == VALUE:
+            stats.observe(path_text, value)
+            item = value
+        else:
+            type_name = "object" if event == START_MAP else "array"
+            entered.append((path_text, stats.record(path_text, type_name), 0))
+            item = "{...}" if event == START_MAP else "[...]"
+
+        if not path:
+            root_type = _type_name(value) if event == VALUE else ("object" if event == START_MAP else "array")
+            if isinstance(value, (dict, list)):
+                length = len(value)
+            if isinstance(value, list):
+                head = value[:JSON_HEAD_ITEMS]
+            elif isinstance(value, dict):
+                head = dict(list(value.items())[:JSON_HEAD_ITEMS])
+            elif event == VALUE:
+                head = value
+            else:
+                head = {} if event == START_MAP else []
+        elif len(path) == 1 and len(head) < JSON_HEAD_ITEMS:
+            if isinstance(head, list):
+                head.append(item)
+            else:
+                head[path[0]] = item
+
+    return {
+        "root_type": root_type,
+        "length": length,
+        "head": head,
+        "paths": stats.paths,
+        "dropped_paths": stats.dropped_paths,
+    }
+
+
+def format_json_summary(summary: dict, max_length: int) -> str:
+    """Render a summarize_json result as text, stopping once `max_length` characters are reached."""
+    if summary["root_type"] == "array":
+        text = f"Array of {summary['length']} items. "
+    elif summary["root_type"] == "object":
+        text = f"Object with {summary['length']} top-level keys. "
+    else:
+        text = f"Single {summary['root_type']} value: {json.dumps(summary['head'], default=str)[:max_length]}"
+    for path, entry in summary["paths"].items():
+        if path == "$":
+            continue
+        part = f"{path} ({'/'.join(entry['types'])} x{entry['count']}"
+        if "max_length" in entry:
+            part += f", length {entry['min_length']}-{entry['max_length']}"
+        scalar = next((sample for sample in entry["samples"] if not isinstance(sample, (dict, list))), None)
+        if scalar is not None and "object" not in entry["types"] and "array" not in entry["types"]:
+            part += f", e.g. {json.dumps(scalar, default=str)[:40]}"
+        part += "); "
+        if len(text) + len(part) > max_length:
+            return text[:max_length] + "..."
+        text += part
+    if summary["dropped_paths"]:
+        text += f"{summary['dropped_paths']} more values under untracked paths."
+    return text.rstrip("; ")
+
+
+def parse_json_path(expression: str) -> list:
+    """Parse a JSONPath subset: $, .key, ['key'], [index], [*] and .* (the leading $ is optional)."""
+    expression = expression.strip()
+    if expression.startswith("$"):
+        expression = expression[1:]
+    elif expression and not expression.startswith("["):
+        expression = "." + expression
+    steps = []
+    pos = 0
+    while pos < len(expression):
+        match = _PATH_STEP.match(expression, pos)
+        if match is None:
+            raise ValueError(f"Unsupported JSONPath syntax at {expression[pos:]!r}")
+        if match["name"] is not None:
+            steps.append(match["name"])
+        elif match["index"] is not None:
+            steps.append(int(match["index"]))
+        elif match["single"] is not None:
+            steps.append(match["single"].replace("\\'", "'"))
+        elif match["double"] is not None:
+            steps.append(json.loads(f'"{match["double"]}"'))
+        else:
+            steps.append(WILDCARD)
+        pos = match.end()
+    return steps
+
+
+def _step_matches(step: Any, key: Any) -> bool:
+    return step is WILDCARD or (step == key and isinstance(step, int) == isinstance(key, int))
+
+
+def _navigate(value: Any, steps: list, path: tuple) -> Iterator[tuple[tuple, Any]]:
+    """Apply the remaining JSONPath steps to an already decoded value."""
+    if not steps:
+        yield path, value
+        return
+    step, rest = steps[0], steps[1:]
+    if isinstance(value, dict):
+        if step is WILDCARD:
+            children = value.items()
+        else:
+            children = [(step, value[step])] if isinstance(step, str) and step in value else []
+    elif isinstance(value, list):
+        if step is WILDCARD:
+            children = enumerate(value)
+        else:
+            children = [(step, value[step])] if isinstance(step, int) and step < len(value) else []
+    else:
+        return
+    for key, child in children:
+        yield from _navigate(child, rest, path + (key,))
+
+
+class _SubtreeBuilder:
+    """Rebuild an entered container from its events."""
+
+    def __init__(self, event: str):
+        self.root: Any = {} if event == START_MAP else []
+        self._stack = [self.root]
+
+    def feed(self, path: tuple, event: str, value: Any) -> bool:
+        """Add one event; True once the container is complete."""
+        if event in (END_MAP, END_ARRAY):
+            self._stack.pop()
+            return not self._stack
+        item = value if event == VALUE else ({} if event == START_MAP else [])
+        parent = self._stack[-1]
+        if isinstance(parent, dict):
+            parent[path[-1]] = item
+        else:
+            parent.append(item)
+        if event != VALUE:
+            self._stack.append(item)
+        return False
+
+
+def iter_json_path(file_path: str, expression: str, chunk_chars: int = JSON_STREAM_CHUNK_CHARS) -> Iterator[tuple[str, Any]]:
+    """Yield (path, value) for every match of a JSONPath expression, reading the file as a stream.
+
+    Only matched sub-trees are materialized, and a path without wildcards stops reading at
+    its first match.
+    """
+    steps = parse_json_path(expression)
+    single_match = not any(step is WILDCARD for step in steps)
+    builder: Optional[_SubtreeBuilder] = None
+    match_path: tuple = ()
+
+    for path, event, value in iter_json_events(file_path, chunk_chars):
+        if builder is not None:
+            if builder.feed(path, event, value):
+                yield format_path(match_path), builder.root
+                if single_match:
+                    return
+                builder = None
+            continue
+        if event in (END_MAP, END_ARRAY) or len(path) > len(steps):
+            continue
+        if not all(_step_matches(step, key) for step, key in zip(steps, path)):
+            continue
+
+        if event == VALUE:
+            for found_path, found in _navigate(value, steps[len(path):], path):
+                yield format_path(found_path), found
+                if single_match:
+                    return
+        elif len(path) == len(steps):
+            builder = _SubtreeBuilder(event)
+            match_path = path
@@ -0,0 +1,213 @@
+import os
+import atexit
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import CancelledError as CancelledFuture, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from util_functions.content_cache import ContentCache, content_cache
+
+# "process" parses in worker processes so a big PDF can't stall the event loop; "thread" parses in-process
+PARSE_EXECUTOR = os.getenv("PARSE_EXECUTOR", "process")
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "60"))  # per file
+PARSE_MAX_FILES = int(os.getenv("PARSE_MAX_FILES", "10"))  # files read by one read_files call
+
+
+class ParseTimeout(TimeoutError):
+    pass
+
+
+class _Parse:
+    """A submitted parse and the number of reads waiting on it."""
+
+    __slots__ = ("pool", "future", "waiters")
+
+    def __init__(self, pool: Executor, future: Future):
+        self.pool = pool
+        self.future = future
+        self.waiters = 0
+
+
+class ParseExecutor:
+    """Runs file readers off the event loop, in a bounded pool of worker processes.
+
+    The content cache is checked in the calling process, so hits never touch the pool and
+    workers only parse; readers return plain dicts, which pickle cheaply. A read that times
+    out, or whose caller is cancelled (e.g. an aborted agent run), is dropped from the queue
+    if it hasn't started. A running parse can only be stopped by killing its worker, so the
+    pool is replaced and the other reads that were in flight on it are resubmitted once.
+    """
+
+    def __init__(
+        self,
+        workers: int = PARSE_WORKERS,
+        kind: str = PARSE_EXECUTOR,
+        timeout: float = PARSE_TIMEOUT_SECONDS,
+        cache: Optional[ContentCache] = content_cache,
+    ):
+        self.workers = max(1, workers)
+        self.kind = kind
+        self.timeout = timeout
+        self.cache = cache
+        self._pool: Optional[Executor] = None
+        self._inflight: dict[str, _Parse] = {}  # cache key -> parse not finished yet
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.cache_hits = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.pool_restarts = 0
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    # spawn: workers don't inherit the parent's threads, connection pools or event loop
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="parse")
+            return self._pool
+
+    def _discard_pool(self, pool: Executor):
+        """Stop using `pool` and kill its workers, abandoning whatever they are parsing."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self.pool_restarts += 1
+        # ProcessPoolExecutor has no public way to stop a running task (3.14 adds terminate_workers)
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _abandon(self, pool: Executor, future: Future):
+        if not future.cancel() and future.running() and self.kind == "process":
+            self._discard_pool(pool)
+
+    def _lookup(self, read_fn: Callable[..., Any], file_path: str, args: tuple) -> tuple[str, Any]:
+        key, file_size = self.cache.make_key(file_path, read_fn.__name__, args)
+        return key, self.cache.get(key, file_size)
+
+    def _submit(self, key: Optional[str], read_fn: Callable[..., Any], file_path: str, args: tuple) -> _Parse:
+        pool = self._get_pool()
+        parse = _Parse(pool, pool.submit(read_fn, file_path, *args))
+        self.submitted += 1
+        if key is not None:
+            self._inflight[key] = parse
+            parse.future.add_done_callback(lambda _: self._inflight.get(key) is parse and self._inflight.pop(key, None))
+        return parse
+
+    async def _wait(self, parse: _Parse, file_path: str, timeout: float) -> Any:
+        """Wait for a parse that other reads may share; it is abandoned once none of them is waiting.
+
+        A timed-out parse is stopped, killing its worker if it already runs. A cancelled one
+        (e.g. a prefetch the route didn't need) is only dropped from the queue; if it is running
+        it is left to finish, so routine cancellations don't keep replacing the pool.
+        """
+        parse.waiters += 1
+        timed_out = False
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(parse.future)), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            timed_out = True
+            raise ParseTimeout(f"Reading {file_path} took longer than {timeout:g} seconds")
+        except asyncio.CancelledError:
+            if parse.future.cancelled() and not asyncio.current_task().cancelling():
+                raise CancelledFuture()  # dropped from the queue of a discarded pool, not cancelled by our caller
+            self.cancelled += 1
+            raise
+        finally:
+            parse.waiters -= 1
+            if not parse.waiters and not parse.future.done():
+                if timed_out:
+                    self._abandon(parse.pool, parse.future)
+                else:
+                    parse.future.cancel()
+
+    async def read(self, read_fn: Callable[..., Any], file_path: str, *args, timeout: Optional[float] = None) -> Any:
+        """Return `read_fn(file_path, *args)`, from the content cache or parsed in the pool.
+
+        A read of a file that is already being parsed with the same arguments (e.g. by a
+        prefetch) waits for that parse instead of starting another.
+
+        Args :
+            read_fn (Callable): A module-level reader such as read_pdf (it must be picklable).
+            file_path (str): Path of the file.
+            *args: Extra reader arguments, also part of the cache key.
+            timeout (Optional[float]): Seconds before ParseTimeout; defaults to PARSE_TIMEOUT_SECONDS.
+
+        Returns :
+            Any: The reader's result.
+        """
+        key = None
+        if self.cache is not None:
+            key, value = await asyncio.to_thread(self._lookup, read_fn, file_path, args)
+            if value is not None:
+                self.cache_hits += 1
+                return value
+
+        timeout = self.timeout if timeout is None else timeout
+        parse = self._inflight.get(key) if key is not None else None
+        if parse is not None:
+            self.shared += 1
+        for attempt in range(2):
+            if parse is None:
+                parse = self._submit(key, read_fn, file_path, args)
+            try:
+                value = await self._wait(parse, file_path, timeout)
+            except (BrokenProcessPool, CancelledFuture) as e:
+                # a worker died (killed for another read's timeout, or crashed on this file),
+                # or the parse was queued on a pool that has since been replaced
+                if isinstance(e, BrokenProcessPool):
+                    self._discard_pool(parse.pool)
+                if attempt:
+                    raise
+                parse = None
+                continue
+            break
+
+        self.completed += 1
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.store, key, value)
+        return value
+
+    async def read_many(self, requests: list[tuple], timeout: Optional[float] = None) -> list[Any]:
+        """Run `read` for several (read_fn, file_path, *args) tuples concurrently.
+
+        Returns :
+            list[Any]: One result per request, in order; failed reads give their exception.
+        """
+        return await asyncio.gather(
+            *(self.read(read_fn, file_path, *args, timeout=timeout) for read_fn, file_path, *args in requests),
+            return_exceptions=True,
+        )
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "cache_hits": self.cache_hits,
+            "shared": self.shared,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "pool_restarts": self.pool_restarts,
+        }
+
+
+parse_executor = ParseExecutor()
+atexit.register(parse_executor.shutdown)
@@ -0,0 +1,239 @@
+import os
+import logging
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Awaitable, Optional
+
+from util_functions.file_index import get_file_index
+from util_functions.file_operations import FILE_READERS
+from util_functions.parse_executor import parse_executor
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+logger = logging.getLogger(__name__)
+
+# Warm the SQL and file paths while the master agent is still routing the request
+PREFETCH = os.getenv("PREFETCH", "1") != "0"
+PREFETCH_MAX_FILES = int(os.getenv("PREFETCH_MAX_FILES", "2"))  # best name matches parsed ahead of the file reader
+PREFETCH_MAX_SESSIONS = 256  # requests whose prefetch is kept; older ones are closed when a caller never finishes them
+
+SQL_PREFETCH = "sql"
+FILE_PREFETCH = "files"
+
+
+class PrefetchStats:
+    """Running totals for one kind of prefetch.
+
+    used: taken by the node it was for; ready: of those, already finished when taken.
+    wasted: never taken (the route didn't need it); cancelled: of those, stopped while running.
+    seconds_saved: prefetch time the taking node didn't have to spend; seconds_wasted: run time of wasted ones.
+    files_parsed / files_used: files pre-parsed, and those the file reader's tools then read.
+    """
+
+    __slots__ = ("started", "used", "ready", "wasted", "cancelled", "failed",
+                 "seconds_saved", "seconds_wasted", "files_parsed", "files_used")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> dict:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["seconds_saved"] = round(self.seconds_saved, 6)
+        stats["seconds_wasted"] = round(self.seconds_wasted, 6)
+        return stats
+
+
+_stats_lock = threading.Lock()
+_stats: dict[str, PrefetchStats] = {SQL_PREFETCH: PrefetchStats(), FILE_PREFETCH: PrefetchStats()}
+
+
+def _count(kind: str, **amounts):
+    with _stats_lock:
+        stats = _stats[kind]
+        for field, amount in amounts.items():
+            setattr(stats, field, getattr(stats, field) + amount)
+
+
+def prefetch_stats() -> dict:
+    with _stats_lock:
+        return {kind: stats.as_dict() for kind, stats in _stats.items()}
+
+
+def reset_prefetch_stats():
+    with _stats_lock:
+        for kind in _stats:
+            _stats[kind] = PrefetchStats()
+
+
+def _warm_sql(engine: "Engine") -> Optional[str]:
+    """Open a pooled connection and load the schema catalog and digest the SQL agent starts from."""
+    # imported here so the file reader, which only reports its reads, doesn't load SQLAlchemy
+    from util_functions.schema_catalog import schema_digest_for
+
+    with engine.connect():
+        pass
+    return schema_digest_for(engine)
+
+
+async def _parse_matching_files(files_root: str, query: str) -> list[str]:
+    """Parse the files whose names best match the query into the content cache."""
+    paths = await asyncio.to_thread(get_file_index(files_root).lookup, query, PREFETCH_MAX_FILES)
+    requests = [(FILE_READERS[os.path.splitext(path)[1].lower()], path) for path in paths
+                if os.path.splitext(path)[1].lower() in FILE_READERS]
+    results = await parse_executor.read_many(requests)
+    return [path for (_, path), result in zip(requests, results) if not isinstance(result, BaseException)]
+
+
+class Prefetch:
+    """Speculative work for one request, started before the route is known.
+
+    Results reach the downstream nodes through the shared caches (schema catalog and digest,
+    connection pool, content cache); a node that arrives while its prefetch is still running
+    waits for it rather than starting the same work again.
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.started_at: dict[str, float] = {}
+        self.finished_at: dict[str, float] = {}
+        self.taken: set[str] = set()
+        self.files_read: set[str] = set()  # paths the file reader's tools asked for
+        self.closed = False
+
+    def start(self, kind: str, work: Awaitable[Any]):
+        if kind in self.tasks:
+            work.close()
+            return
+        self.started_at[kind] = time.perf_counter()
+        self.tasks[kind] = task = asyncio.ensure_future(work)
+        task.add_done_callback(lambda _: self.finished_at.setdefault(kind, time.perf_counter()))
+        _count(kind, started=1)
+
+    def _run_time(self, kind: str) -> float:
+        """Seconds the prefetch has been running, up to when it finished."""
+        return self.finished_at.get(kind, time.perf_counter()) - self.started_at[kind]
+
+    async def take(self, kind: str, wait: bool = True) -> Any:
+        """Claim a prefetch for the node it was meant for.
+
+        Args :
+            kind (str): SQL_PREFETCH or FILE_PREFETCH.
+            wait (bool): Wait for it to finish; otherwise only mark it used (e.g. when the
+                node's reads join the running parses by themselves).
+
+        Returns :
+            Any: Its result, or None when it wasn't started, failed, or `wait` is False.
+        """
+        task = self.tasks.get(kind)
+        if task is None or task.cancelled():
+            return None
+        if kind not in self.taken:
+            self.taken.add(kind)
+            _count(kind, used=1, ready=int(task.done()), seconds_saved=self._run_time(kind))
+        if not wait:
+            return None
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        except Exception as e:
+            logger.warning("Prefetch %s for %s failed: %s", kind, self.request_id, e)
+            return None
+
+    def keep(self, kinds: set[str]):
+        """The route is known: cancel the prefetches it doesn't need."""
+        for kind, task in self.tasks.items():
+            if kind not in kinds and kind not in self.taken and not task.done():
+                task.cancel()
+
+    def close(self):
+        """Account for every prefetch of the request and cancel what is still running."""
+        if self.closed:
+            return
+        self.closed = True
+        for kind, task in self.tasks.items():
+            if not task.done():
+                try:
+                    task.cancel()
+                except RuntimeError:
+                    pass  # its event loop is already closed
+            if kind not in self.taken:
+                _count(kind, wasted=1, cancelled=int(task.cancelled() or not task.done()),
+                       seconds_wasted=self._run_time(kind))
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                _count(kind, failed=1)
+        task = self.tasks.get(FILE_PREFETCH)
+        if task is not None and task.done() and not task.cancelled() and task.exception() is None:
+            parsed = set(task.result())
+            _count(FILE_PREFETCH, files_parsed=len(parsed), files_used=len(parsed & self.files_read))
+
+
+_sessions: "OrderedDict[str, Prefetch]" = OrderedDict()
+_current_prefetch: ContextVar[Optional[Prefetch]] = ContextVar("current_prefetch", default=None)
+
+
+def _request_id(config: Optional[dict]) -> Optional[str]:
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def start_prefetch(config: Optional[dict], db_engine: "Engine", files_root: str, query: str) -> Optional[Prefetch]:
+    """Start warming both branches for a request, keyed by the run's thread_id.
+
+    Args :
+        config (Optional[dict]): The graph run config.
+        db_engine (Engine): Database engine of the request.
+        files_root (str): Directory of the request's files.
+        query (str): The request text, matched against file names.
+
+    Returns :
+        Optional[Prefetch]: The request's prefetch (the existing one when a run is resumed),
+            or None when PREFETCH is off or the run has no thread_id.
+    """
+    request_id = _request_id(config)
+    if not PREFETCH or request_id is None:
+        return None
+    prefetch = _sessions.get(request_id)
+    if prefetch is None or prefetch.closed:
+        prefetch = _sessions[request_id] = Prefetch(request_id)
+        while len(_sessions) > PREFETCH_MAX_SESSIONS:
+            _sessions.popitem(last=False)[1].close()
+    prefetch.start(SQL_PREFETCH, asyncio.to_thread(_warm_sql, db_engine))
+    prefetch.start(FILE_PREFETCH, _parse_matching_files(files_root, query))
+    return prefetch
+
+
+def get_prefetch(config: Optional[dict]) -> Optional[Prefetch]:
+    return _sessions.get(_request_id(config))
+
+
+def finish_prefetch(config: Optional[dict]):
+    """Close the request's prefetch once its run is over."""
+    prefetch = _sessions.pop(_request_id(config), None)
+    if prefetch is not None:
+        prefetch.close()
+
+
+@contextmanager
+def use_prefetch(prefetch: Optional[Prefetch]):
+    """Make `prefetch` the one `note_file_read` reports to while the block runs."""
+    token = _current_prefetch.set(prefetch)
+    try:
+        yield prefetch
+    finally:
+        _current_prefetch.reset(token)
+
+
+def note_file_read(file_path: str):
+    """Called by the file reader's tools, to measure how many pre-parsed files were actually used."""
+    prefetch = _current_prefetch.get()
+    if prefetch is not None:
+        prefetch.files_read.add(file_path)
@@ -0,0 +1,176 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from sqlalchemy import Engine
+
+from util_functions.schema_catalog import get_catalog
+
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "300"))  # seconds
+# Comma-separated tables whose queries always go to the database
+VOLATILE_TABLES = {
+    table.strip().lower() for table in os.getenv("QUERY_CACHE_VOLATILE_TABLES", "").split(",") if table.strip()
+}
+
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_WORDS = re.compile(r"[a-z_][a-z0-9_$]*")
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace, lowercase everything outside quotes and drop trailing semicolons.
+
+    String literals and quoted identifiers are kept verbatim, so `WHERE name = 'Rock'`
+    and `where name='Rock'` normalize to the same text but `'rock'` does not.
+    """
+    parts = _QUOTED.split(query.strip().rstrip(";"))
+    normalized = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            normalized.append(part)
+        else:
+            part = " ".join(part.split()).lower()
+            # no space needed around punctuation
+            part = re.sub(r"\s*([(),=<>+*/-])\s*", r"\1", part)
+            normalized.append(part)
+    return "".join(normalized).strip()
+
+
+def referenced_words(normalized_query: str) -> set[str]:
+    return set(_WORDS.findall(_QUOTED.sub(" ", normalized_query)))
+
+
+class QueryResultCache:
+    """Bounded LRU of query results with a byte budget and a TTL per entry."""
+
+    def __init__(self, max_bytes: int = QUERY_CACHE_MAX_BYTES, ttl: float = QUERY_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[Any, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: Any, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: tuple):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+query_cache = QueryResultCache()
+
+_data_versions: dict[str, int] = {}
+
+
+def _engine_key(db_engine: Engine) -> str:
+    return db_engine.url.render_as_string(hide_password=False)
+
+
+def bump_data_version(db_engine: Engine):
+    """Invalidate every cached result for this engine, e.g. after a data load."""
+    key = _engine_key(db_engine)
+    _data_versions[key] = _data_versions.get(key, 0) + 1
+
+
+def version_token(db_engine: Engine) -> str:
+    """Schema version from the catalog plus the manual data version for this engine."""
+    key = _engine_key(db_engine)
+    try:
+        schema_version = get_catalog(db_engine).version
+    except Exception:
+        schema_version = "unknown"
+    return f"{schema_version}:{_data_versions.get(key, 0)}"
+
+
+def _estimate_size(result: Any) -> int:
+    rows = getattr(result, "rows", None)
+    if rows is None:
+        return len(str(result))
+    return 64 + sum(16 + len(str(value)) for row in rows for value in row)
+
+
+def cached_query(
+    db_engine: Engine,
+    query: str,
+    limit: Optional[int],
+    run: Callable[[], Any],
+    volatile_tables: set[str] = VOLATILE_TABLES,
+    cache: QueryResultCache = query_cache,
+) -> Any:
+    """Return the cached result for this query, or call `run()` and cache what it returns.
+
+    Args :
+        db_engine (Engine): The engine the query runs on.
+        query (str): The SQL text; it is normalized before it becomes part of the key.
+        limit (Optional[int]): The row limit, also part of the key.
+        run (Callable): Executes the query on a cache miss.
+        volatile_tables (set[str]): Queries touching these tables bypass the cache.
+        cache (QueryResultCache): The cache to use.
+
+    Returns :
+        Any: The query result.
+    """
+    normalized = normalize_sql(query)
+    if volatile_tables and referenced_words(normalized) & volatile_tables:
+        cache.bypasses += 1
+        return run()
+
+    key = (_engine_key(db_engine), normalized, limit, version_token(db_engine))
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    result = run()
+    cache.put(key, result, _estimate_size(result))
+    return result
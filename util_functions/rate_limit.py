@@ -0,0 +1,103 @@
+import logging
+import time
+import random
+import asyncio
+from typing import Any
+
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.models import Model
+from pydantic_ai.models.wrapper import WrapperModel
+
+logger = logging.getLogger(__name__)
+
+MAX_RATE_LIMIT_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    """Async token bucket: `rate_per_minute` requests on average, bursts of up to `burst`.
+
+    After a 429 the whole bucket is paused with `backoff`, so every worker sharing the
+    provider slows down rather than each one hammering it independently.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int | None = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute // 6)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+        self.throttled = 0
+
+    async def acquire(self):
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        self.waited_seconds += time.monotonic() - start
+
+    def backoff(self, seconds: float):
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class RateLimitedModel(WrapperModel):
+    """Model wrapper that takes a bucket token per request and backs off on HTTP 429."""
+
+    def __init__(self, wrapped: Model, bucket: TokenBucket, max_retries: int = MAX_RATE_LIMIT_RETRIES):
+        super().__init__(wrapped)
+        self.bucket = bucket
+        self.max_retries = max_retries
+
+    async def request(self, *args: Any, **kwargs: Any):
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                return await self.wrapped.request(*args, **kwargs)
+            except ModelHTTPError as e:
+                if e.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) * (1 + random.random() / 2)
+                logger.info("Rate limited by %s, backing off %.1fs", self.system, delay)
+                self.bucket.backoff(delay)
+                attempt += 1
+
+
+def install_rate_limits(agents: list[Agent], limits: dict[str, float], default_rate: float | None = None) -> dict[str, TokenBucket]:
+    """Wrap each agent's model in a RateLimitedModel sharing one bucket per provider.
+
+    Args :
+        agents (list[Agent]): Agents whose models should be rate limited.
+        limits (dict[str, float]): Requests per minute by provider (the model's `system`, e.g. "openai").
+        default_rate (float | None): Limit for providers not in `limits`; unlimited when None.
+
+    Returns :
+        dict[str, TokenBucket]: The bucket for each provider, for reporting.
+    """
+    buckets: dict[str, TokenBucket] = {}
+    for agent in agents:
+        model = agent.model
+        if model is None or isinstance(model, str) or isinstance(model, RateLimitedModel):
+            continue
+        provider = model.system
+        rate = limits.get(provider, default_rate)
+        if rate is None:
+            continue
+        bucket = buckets.setdefault(provider, TokenBucket(rate))
+        agent.model = RateLimitedModel(model, bucket)
+    return buckets
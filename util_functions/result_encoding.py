@@ -0,0 +1,204 @@
+import os
+import logging
+import json
+import math
+import uuid
+import datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from util_functions.text_index import estimate_tokens
+from util_functions.result_insights import SQL_RESULT_INSIGHTS, compute_insights
+
+logger = logging.getLogger(__name__)
+
+# "columnar" (header once, rows as arrays) or "records" (one object per row, the old format)
+SQL_RESULT_FORMAT = os.getenv("SQL_RESULT_FORMAT", "columnar")
+# Approximate tokens of rows sent to the model; larger results keep their head and tail rows plus a summary
+SQL_RESULT_TOKEN_BUDGET = int(os.getenv("SQL_RESULT_TOKEN_BUDGET", "1500"))
+TAIL_SHARE = 0.25  # fraction of the kept rows taken from the end of a truncated result
+
+
+def encode_value(value: Any) -> Any:
+    """Convert a database value to its JSON form, keeping numbers numeric."""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        # 12 significant digits drops binary noise such as 78.47999999999998
+        return float(f"{value:.12g}") if math.isfinite(value) else None
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            return None
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return str(value)
+
+
+def encode_records(
+    columns: list[str],
+    rows: list[tuple],
+    total_rows: Optional[int],
+    truncated: bool,
+    insights: Optional[dict] = None,
+    guard: Optional[dict] = None,
+) -> str:
+    """The original format: one JSON object per row, stringifying anything json can't encode."""
+    recordset = [dict(zip(columns, row)) for row in rows]
+    payload = {
+        "rows": recordset,
+        "returned_rows": len(recordset),
+        "total_rows": total_rows,
+        "truncated": truncated,
+    }
+    if insights:
+        payload["insights"] = insights
+    if guard:
+        payload["guard"] = guard
+    return json.dumps(payload, default=str)
+
+
+_PLAIN_TYPES = (int, str, bool, type(None))
+
+
+def _converted_columns(rows: list[tuple]) -> list[int]:
+    """Columns holding any value that needs encode_value.
+
+    Every value is checked: a column can mix types, e.g. int and Decimal from a CASE or a UNION.
+    """
+    if not rows:
+        return []
+    return [
+        index for index in range(len(rows[0]))
+        if any(type(row[index]) not in _PLAIN_TYPES for row in rows)
+    ]
+
+
+def summarize_columns(columns: list[str], rows: list) -> dict:
+    """Per-column min/max/mean for numeric columns and distinct counts for the rest, over `rows`."""
+    summary = {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows if row[index] is not None]
+        numbers = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if values and len(numbers) == len(values):
+            summary[column] = {
+                "min": min(numbers),
+                "max": max(numbers),
+                "mean": round(sum(numbers) / len(numbers), 4),
+                "sum": round(sum(numbers), 4),
+            }
+        else:
+            summary[column] = {"distinct": len(set(map(str, values))), "nulls": len(rows) - len(values)}
+    return summary
+
+
+def _select_rows(encoded_rows: list[str], token_budget: int) -> tuple[list[int], list[int]]:
+    """Indexes of head and tail rows that fit the budget, taking roughly TAIL_SHARE from the end."""
+    head, tail = [], []
+    used = 0
+    low, high = 0, len(encoded_rows) - 1
+    while low <= high:
+        take_tail = len(tail) < TAIL_SHARE * (len(head) + len(tail) + 1)
+        index = high if take_tail else low
+        cost = estimate_tokens(encoded_rows[index]) + 1
+        if used + cost > token_budget:
+            break
+        used += cost
+        if take_tail:
+            tail.append(index)
+            high -= 1
+        else:
+            head.append(index)
+            low += 1
+    return head, tail[::-1]
+
+
+def encode_columnar(
+    columns: list[str],
+    rows: list[tuple],
+    total_rows: Optional[int],
+    truncated: bool,
+    token_budget: Optional[int] = SQL_RESULT_TOKEN_BUDGET,
+    insights: Optional[dict] = None,
+    guard: Optional[dict] = None,
+) -> str:
+    """Encode a result as a header plus row arrays, trimmed to a token budget.
+
+    Only columns holding non-JSON types (Decimal, dates, ...) are converted. When the rows
+    don't fit `token_budget`, the first and last rows that do fit are kept, `omitted_rows`
+    says how many were dropped from the middle and `summary` describes every returned row
+    (not only the kept ones).
+
+    Args :
+        columns (list[str]): Column names.
+        rows (list[tuple]): Fetched rows.
+        total_rows (Optional[int]): Row count of the full result, when known.
+        truncated (bool): Whether the database returned fewer rows than the full result.
+        token_budget (Optional[int]): Approximate token budget for the rows; None for no limit.
+        insights (Optional[dict]): Pre-computed statistics from compute_insights, sent as-is.
+        guard (Optional[dict]): Why the cost guard downgraded the query, sent as-is.
+
+    Returns :
+        str: JSON with `columns`, `rows`, `returned_rows`, `total_rows`, `truncated`,
+            `insights` and `guard` when given and, when rows were dropped, `omitted_rows` and (without
+            insights) `summary`.
+    """
+    converted = _converted_columns(rows)
+    values = rows
+    if converted:
+        values = []
+        for row in rows:
+            row = list(row)
+            for index in converted:
+                row[index] = encode_value(row[index])
+            values.append(row)
+
+    # One encoder call for the whole result; rows are only encoded one by one when trimming
+    rows_json = json.dumps(values, separators=(",", ":"))
+    extra = ""
+    if token_budget is not None and estimate_tokens(rows_json) > token_budget:
+        encoded_rows = [json.dumps(row, separators=(",", ":")) for row in values]
+        head, tail = _select_rows(encoded_rows, token_budget)
+        rows_json = "[" + ",".join(encoded_rows[index] for index in head + tail) + "]"
+        omitted = len(encoded_rows) - len(head) - len(tail)
+        extra = f',"omitted_rows":{omitted},"omitted_after_row":{len(head)}'
+        if not insights:  # insights already cover every returned row
+            extra += f',"summary":{json.dumps(summarize_columns(columns, values), separators=(",", ":"))}'
+    if insights:
+        extra += f',"insights":{json.dumps(insights, separators=(",", ":"), default=str)}'
+    if guard:
+        extra += f',"guard":{json.dumps(guard, separators=(",", ":"), default=str)}'
+
+    return (
+        f'{{"columns":{json.dumps(columns, separators=(",", ":"))},"rows":{rows_json}'
+        f',"returned_rows":{len(rows)},"total_rows":{json.dumps(total_rows)}'
+        f',"truncated":{json.dumps(truncated)}{extra}}}'
+    )
+
+
+def encode_result(
+    result,
+    result_format: str = SQL_RESULT_FORMAT,
+    token_budget: Optional[int] = SQL_RESULT_TOKEN_BUDGET,
+    with_insights: bool = SQL_RESULT_INSIGHTS,
+) -> str:
+    """Encode a QueryResult in the configured format, with pre-computed insights unless disabled."""
+    insights = None
+    if with_insights:
+        if getattr(result, "insights", None) is None:
+            try:
+                result.insights = compute_insights(result.columns, result.rows)
+            except Exception as e:
+                # insights are optional; the rows still go to the model without them
+                logger.warning("Result insights failed: %s", e)
+        insights = result.insights
+    guard = getattr(result, "guard", None)
+    if result_format == "records":
+        return encode_records(result.columns, result.rows, result.total_rows, result.truncated, insights, guard)
+    return encode_columnar(result.columns, result.rows, result.total_rows, result.truncated, token_budget, insights, guard)
@@ -0,0 +1,222 @@
+import os
+import re
+import math
+from decimal import Decimal
+from typing import Any, Optional
+
+# Attach pre-computed statistics to run_sql_tool results so the model doesn't do the arithmetic
+SQL_RESULT_INSIGHTS = os.getenv("SQL_RESULT_INSIGHTS", "1") == "1"
+INSIGHTS_TOP_N = int(os.getenv("INSIGHTS_TOP_N", "5"))
+INSIGHTS_MAX_MEASURES = 3  # numeric columns analysed in depth (top/bottom, outliers, trends)
+INSIGHTS_MAX_OUTLIERS = 5
+Z_SCORE_THRESHOLD = 3.0
+IQR_FACTOR = 1.5
+NULL_LABEL = "(null)"
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _number(value: Any) -> Any:
+    """Round to 6 significant digits and drop the fraction of whole numbers, for a compact block."""
+    if value is None:
+        return None
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    if value == int(value) and abs(value) < 1e15:
+        return int(value)
+    return float(f"{value:.6g}")
+
+
+def _is_identifier(column: str) -> bool:
+    name = column.lower()
+    return name == "id" or name.endswith("_id")
+
+
+def _classify_columns(frame) -> tuple[list[str], list[str], list[str]]:
+    """Split columns into numeric, date and other, converting Decimal and ISO date columns in place."""
+    import pandas as pd
+
+    numeric, dates, other = [], [], []
+    for column in frame.columns:
+        series = frame[column]
+        non_null = series.dropna()
+        if pd.api.types.is_bool_dtype(series):
+            other.append(column)
+        elif pd.api.types.is_numeric_dtype(series):
+            numeric.append(column)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            dates.append(column)
+        elif len(non_null) and all(isinstance(value, (Decimal, int, float)) for value in non_null):
+            frame[column] = pd.to_numeric(series, errors="coerce")
+            numeric.append(column)
+        elif len(non_null) and all(hasattr(value, "isoformat") or (isinstance(value, str) and _ISO_DATE.match(value)) for value in non_null):
+            converted = pd.to_datetime(series, errors="coerce", format="ISO8601", utc=True)
+            if converted.notna().sum() == len(non_null):
+                frame[column] = converted
+                dates.append(column)
+            else:
+                other.append(column)
+        else:
+            other.append(column)
+    return numeric, dates, other
+
+
+def _numeric_stats(series) -> dict:
+    values = series.dropna()
+    if values.empty:
+        return {"nulls": int(series.isna().sum())}
+    return {
+        "min": _number(values.min()),
+        "max": _number(values.max()),
+        "mean": _number(values.mean()),
+        "median": _number(values.median()),
+        "std": _number(values.std()) if len(values) > 1 else 0,
+        "sum": _number(values.sum()),
+        "nulls": int(series.isna().sum()),
+    }
+
+
+def _row_labels(frame, label: Optional[str]):
+    """Strings naming each row in rankings and outlier lists: the label column, or the row number."""
+    import pandas as pd
+
+    if label is None:
+        return pd.Series([f"row {index + 1}" for index in frame.index], index=frame.index)
+    # Missing labels become "(null)": astype(str) keeps NaN under pandas 3, and NaN is not valid JSON
+    if pd.api.types.is_datetime64_any_dtype(frame[label]):
+        return frame[label].dt.strftime("%Y-%m-%d").fillna(NULL_LABEL)
+    return frame[label].fillna(NULL_LABEL).astype(str)
+
+
+def _ranking(frame, measure: str, labels, top_n: int) -> dict:
+    import numpy as np
+
+    ranked = frame[measure].dropna().sort_values(ascending=False)
+    values = ranked.to_numpy(dtype=float)
+    labels = labels[ranked.index].tolist()
+    if not len(values):
+        return {}
+
+    def entries(indexes):
+        return [[labels[i], _number(values[i])] for i in indexes]
+
+    top = list(range(min(top_n, len(values))))
+    bottom = list(range(len(values) - 1, max(len(values) - 1 - top_n, -1), -1))
+    total = values.sum()
+    ranking = {
+        "top": entries(top),
+        # drop from each rank to the next, for "#1 leads #2 by ..." style statements
+        "gaps": [_number(gap) for gap in -np.diff(values[:top_n + 1])],
+    }
+    if len(values) > top_n:
+        ranking["bottom"] = entries(bottom)
+    if total and (values >= 0).all():
+        ranking["top_share_of_total"] = _number(values[:top_n].sum() / total)
+    return ranking
+
+
+def _outliers(frame, measure: str, labels) -> dict:
+    values = frame[measure].dropna()
+    if len(values) < 4:
+        return {}
+    q1, q3 = values.quantile(0.25), values.quantile(0.75)
+    iqr = q3 - q1
+    low, high = q1 - IQR_FACTOR * iqr, q3 + IQR_FACTOR * iqr
+    iqr_mask = (values < low) | (values > high)
+
+    std = values.std()
+    z_mask = ((values - values.mean()).abs() / std > Z_SCORE_THRESHOLD) if std else iqr_mask & False
+
+    flagged = values[iqr_mask | z_mask]
+    flagged = flagged.reindex(flagged.sub(values.median()).abs().sort_values(ascending=False).index)[:INSIGHTS_MAX_OUTLIERS]
+    return {
+        "iqr_bounds": [_number(low), _number(high)],
+        "iqr_outliers": int(iqr_mask.sum()),
+        "z_outliers": int(z_mask.sum()),
+        "examples": [
+            [labels[index], _number(value)]
+            for index, value in flagged.items()
+        ],
+    }
+
+
+def _trend(frame, date_column: str, measure: str) -> dict:
+    import numpy as np
+
+    data = frame[[date_column, measure]].dropna()
+    if len(data) < 3:
+        return {}
+    dates = data[date_column].dt.tz_localize(None)
+    span_days = (dates.max() - dates.min()).days
+    period = "Y" if span_days > 3 * 365 else "M" if span_days > 62 else "D"
+    series = data[measure].groupby(dates.dt.to_period(period)).sum().sort_index()
+    if len(series) < 2:
+        return {}
+
+    values = series.to_numpy(dtype=float)
+    slope = np.polyfit(np.arange(len(values)), values, 1)[0]
+    first, last = values[0], values[-1]
+    return {
+        "period": {"Y": "year", "M": "month", "D": "day"}[period],
+        "periods": len(values),
+        "first": [str(series.index[0]), _number(first)],
+        "last": [str(series.index[-1]), _number(last)],
+        "change_pct": _number((last - first) / abs(first) * 100) if first else None,
+        "slope_per_period": _number(slope),
+        "peak": [str(series.idxmax()), _number(series.max())],
+        "low": [str(series.idxmin()), _number(series.min())],
+    }
+
+
+def compute_insights(columns: list[str], rows: list[tuple], top_n: int = INSIGHTS_TOP_N) -> Optional[dict]:
+    """Statistics over a query result, computed with pandas/numpy instead of by the model.
+
+    Args :
+        columns (list[str]): Column names.
+        rows (list[tuple]): Fetched rows.
+        top_n (int): Entries in each top/bottom list.
+
+    Returns :
+        Optional[dict]: rows_analyzed, per-column stats, and for the main numeric columns
+            top/bottom N with rank gaps, IQR/z-score outliers and per-date-column trends.
+            None when there are fewer than two rows.
+    """
+    if len(rows) < 2:
+        return None
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    numeric, dates, other = _classify_columns(frame)
+    measures = [column for column in numeric if not _is_identifier(column)][:INSIGHTS_MAX_MEASURES]
+    label = next((column for column in other if not _is_identifier(column)), None) or next(iter(dates + other), None)
+    labels = _row_labels(frame, label)
+
+    insights: dict[str, Any] = {"rows_analyzed": len(frame), "columns": {}}
+    for column in columns:
+        if column in numeric:
+            entry = {"type": "number", **_numeric_stats(frame[column])}
+        elif column in dates:
+            values = frame[column].dropna()
+            entry = {
+                "type": "date",
+                "min": values.min().date().isoformat() if len(values) else None,
+                "max": values.max().date().isoformat() if len(values) else None,
+            }
+        else:
+            counts = frame[column].dropna().astype(str).value_counts()
+            entry = {"type": "text", "distinct": int(len(counts)), "nulls": int(frame[column].isna().sum())}
+            if 0 < len(counts) < len(frame):
+                entry["most_common"] = [[value, int(count)] for value, count in counts.head(top_n).items()]
+        insights["columns"][column] = entry
+
+    for measure in measures:
+        analysis = {"ranking": _ranking(frame, measure, labels, top_n), "outliers": _outliers(frame, measure, labels)}
+        trends = {date_column: _trend(frame, date_column, measure) for date_column in dates}
+        trends = {date_column: trend for date_column, trend in trends.items() if trend}
+        if trends:
+            analysis["trends"] = trends
+        insights.setdefault("measures", {})[measure] = {key: value for key, value in analysis.items() if value}
+    if label and measures:
+        insights["label_column"] = label
+    return insights
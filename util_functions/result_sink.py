@@ -0,0 +1,226 @@
+import os
+import logging
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# "jsonl" (default), "sqlite", or "json" for the old single-file overwrite of checking_output.json
+RESULT_SINK = os.getenv("RESULT_SINK", "jsonl")
+RESULT_SINK_PATH = os.getenv("RESULT_SINK_PATH") or None
+# "always": fsync after every batch; "interval": at most every RESULT_SINK_FSYNC_SECONDS; "never": leave it to the OS
+RESULT_SINK_FSYNC = os.getenv("RESULT_SINK_FSYNC", "interval")
+RESULT_SINK_FSYNC_SECONDS = float(os.getenv("RESULT_SINK_FSYNC_SECONDS", "1"))
+RESULT_SINK_BATCH_SIZE = int(os.getenv("RESULT_SINK_BATCH_SIZE", "64"))
+RESULT_SINK_FLUSH_SECONDS = float(os.getenv("RESULT_SINK_FLUSH_SECONDS", "0.2"))
+RESULT_SINK_QUEUE_SIZE = 10000
+
+DEFAULT_PATHS = {"jsonl": "agent_results.jsonl", "sqlite": "agent_results.sqlite", "json": "checking_output.json"}
+
+
+def _default(value: Any):
+    """Encode the non-JSON objects found in graph state: pydantic models and chat messages."""
+    if hasattr(value, "model_dump"):
+        if hasattr(value, "content") and hasattr(value, "type"):
+            return value.content  # langchain message
+        return value.model_dump()
+    return str(value)
+
+
+def encode_record(record: dict) -> bytes:
+    """Serialize a result once, straight from the state objects, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(record, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(record, default=_default).encode()
+
+
+class ResultSink(ABC):
+    """Receives encoded results from the background writer in batches."""
+
+    @abstractmethod
+    def write_batch(self, records: list[tuple[dict, bytes]]):
+        """Write (record, encoded record) pairs, in order."""
+
+    def sync(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonlSink(ResultSink):
+    """Append-only JSON lines file."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "ab")
+
+    def write_batch(self, records):
+        self.file.write(b"".join(encoded + b"\n" for _, encoded in records))
+        self.file.flush()
+
+    def sync(self):
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class SQLiteSink(ResultSink):
+    """Local SQLite store, one row per result."""
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, "
+            "request_id TEXT, agent TEXT, record TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def write_batch(self, records):
+        now = time.time()
+        self.connection.executemany(
+            "INSERT INTO results (created_at, request_id, agent, record) VALUES (?, ?, ?, ?)",
+            [(now, record.get("request_id"), record.get("agent"), encoded.decode()) for record, encoded in records],
+        )
+        self.connection.commit()
+
+    def set_fsync(self, policy: str):
+        # SQLite syncs on commit itself; map the policy onto its synchronous setting
+        level = {"always": "FULL", "interval": "NORMAL", "never": "OFF"}.get(policy, "NORMAL")
+        self.connection.execute(f"PRAGMA synchronous={level}")
+
+    def close(self):
+        self.connection.close()
+
+
+class JsonFileSink(ResultSink):
+    """The original behavior: overwrite one JSON file with the latest result."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write_batch(self, records):
+        record, _ = records[-1]
+        with open(self.path, "w") as f:
+            json.dump(json.loads(encode_record(record)), f, indent=4)
+
+
+class BackgroundResultWriter:
+    """Queues results and writes them from a daemon thread in batches.
+
+    `submit` only encodes the record and enqueues it, so graph nodes never wait on disk I/O.
+    """
+
+    def __init__(
+        self,
+        sink: ResultSink,
+        batch_size: int = RESULT_SINK_BATCH_SIZE,
+        flush_seconds: float = RESULT_SINK_FLUSH_SECONDS,
+        fsync: str = RESULT_SINK_FSYNC,
+        fsync_seconds: float = RESULT_SINK_FSYNC_SECONDS,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self.fsync_seconds = fsync_seconds
+        if isinstance(sink, SQLiteSink):
+            sink.set_fsync(fsync)
+        self._queue: queue.Queue = queue.Queue(maxsize=RESULT_SINK_QUEUE_SIZE)
+        self._last_sync = time.monotonic()
+        self._closed = False
+        self.written = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict):
+        if self._closed:
+            raise RuntimeError("Result writer is closed")
+        self._queue.put((record, encode_record(record)))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: list):
+        try:
+            self.sink.write_batch(batch)
+            self.written += len(batch)
+            now = time.monotonic()
+            if self.fsync == "always" or (self.fsync == "interval" and now - self._last_sync >= self.fsync_seconds):
+                self.sink.sync()
+                self._last_sync = now
+        except Exception as e:
+            self.errors += len(batch)
+            logger.error("Result writer failed to write %d results: %s", len(batch), e)
+
+    def close(self):
+        """Write everything still queued, sync and close the sink."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self.fsync != "never":
+            self.sink.sync()
+        self.sink.close()
+
+
+def create_sink(kind: str = RESULT_SINK, path: Optional[str] = RESULT_SINK_PATH) -> ResultSink:
+    if kind not in DEFAULT_PATHS:
+        raise ValueError(f"Unknown result sink '{kind}', expected one of {sorted(DEFAULT_PATHS)}")
+    path = path or DEFAULT_PATHS[kind]
+    if kind == "jsonl":
+        return JsonlSink(path)
+    if kind == "sqlite":
+        return SQLiteSink(path)
+    return JsonFileSink(path)
+
+
+_writer: Optional[BackgroundResultWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_result_writer() -> BackgroundResultWriter:
+    """Return the process-wide result writer, configured from the RESULT_SINK* variables."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = BackgroundResultWriter(create_sink())
+                atexit.register(_writer.close)
+    return _writer
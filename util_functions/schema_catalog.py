@@ -0,0 +1,249 @@
+import os
+import logging
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.inspection import inspect
+from sqlalchemy.sql.expression import text
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "600"))  # seconds
+
+
+@dataclass
+class TableInfo:
+    name: str
+    columns: list[dict] = field(default_factory=list)
+    primary_key: list[str] = field(default_factory=list)
+    foreign_keys: list[dict] = field(default_factory=list)
+    row_estimate: Optional[int] = None
+
+    def describe(self) -> dict:
+        return {
+            "table": self.name,
+            "columns": self.columns,
+            "primary_key": self.primary_key,
+            "foreign_keys": self.foreign_keys,
+            "row_estimate": self.row_estimate,
+        }
+
+
+@dataclass
+class SchemaCatalog:
+    tables: dict[str, TableInfo]
+    version: str
+    loaded_at: float
+
+    def table_names(self) -> list[str]:
+        return list(self.tables)
+
+    def get_table(self, table_name: str) -> Optional[TableInfo]:
+        table = self.tables.get(table_name)
+        if table is None:
+            table = self.tables.get(table_name.lower())
+        return table
+
+
+_catalogs: dict[str, SchemaCatalog] = {}
+_lock = threading.Lock()
+
+
+def _engine_key(db_engine: Engine) -> str:
+    return db_engine.url.render_as_string(hide_password=False)
+
+
+def _row_estimates(db_engine: Engine, table_names: list[str]) -> dict[str, int]:
+    """Row counts for all tables in one query: planner statistics on Postgres, exact counts on SQLite."""
+    if not table_names:
+        return {}
+    dialect = db_engine.dialect.name
+    with db_engine.connect() as connection:
+        if dialect == "postgresql":
+            rows = connection.execute(text(
+                "SELECT c.relname, c.reltuples::bigint FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()"
+            ))
+            # reltuples is -1 for tables that were never analyzed
+            return {name: int(count) for name, count in rows if count is not None and count >= 0}
+        if dialect == "sqlite":
+            # Names are quoted by the dialect and labels bound as parameters, so a quote in a table
+            # name can't break the query; exec_driver_sql keeps a ":" in a name from reading as a bind
+            quote = connection.dialect.identifier_preparer.quote
+            union = " UNION ALL ".join(f"SELECT ?, COUNT(*) FROM {quote(name)}" for name in table_names)
+            return {name: int(count) for name, count in connection.exec_driver_sql(union, tuple(table_names))}
+    return {}
+
+
+def _load_catalog(db_engine: Engine) -> SchemaCatalog:
+    inspector = inspect(db_engine)
+    table_names = inspector.get_table_names()
+
+    # get_multi_* fetch every table in one round trip per kind instead of one per table
+    columns = inspector.get_multi_columns()
+    primary_keys = inspector.get_multi_pk_constraint()
+    foreign_keys = inspector.get_multi_foreign_keys()
+    try:
+        row_estimates = _row_estimates(db_engine, table_names)
+    except Exception:
+        row_estimates = {}
+
+    known_tables = set(table_names)
+    tables = {}
+    for (schema, table_name), table_columns in columns.items():
+        if table_name not in known_tables:
+            continue
+        pk = primary_keys.get((schema, table_name)) or {}
+        fks = foreign_keys.get((schema, table_name)) or []
+        tables[table_name] = TableInfo(
+            name=table_name,
+            columns=[
+                {
+                    "name": column["name"],
+                    "type": str(column["type"]),
+                    "nullable": column.get("nullable", True),
+                    "default": column.get("default"),
+                }
+                for column in table_columns
+            ],
+            primary_key=list(pk.get("constrained_columns") or []),
+            foreign_keys=[
+                {
+                    "columns": fk["constrained_columns"],
+                    "referred_table": fk["referred_table"],
+                    "referred_columns": fk["referred_columns"],
+                }
+                for fk in fks
+            ],
+            row_estimate=row_estimates.get(table_name),
+        )
+
+    structure = json.dumps(
+        {name: [table.columns, table.primary_key, table.foreign_keys] for name, table in sorted(tables.items())},
+        default=str,
+        sort_keys=True,
+    )
+    version = hashlib.sha1(structure.encode()).hexdigest()[:16]
+    return SchemaCatalog(tables=tables, version=version, loaded_at=time.monotonic())
+
+
+def get_catalog(db_engine: Engine, ttl: float = SCHEMA_CACHE_TTL) -> SchemaCatalog:
+    """Return the cached schema catalog for this engine, introspecting the database when stale.
+
+    Args :
+        db_engine (Engine): The SQLAlchemy engine to use.
+        ttl (float): Seconds a catalog stays valid before it is reloaded.
+
+    Returns :
+        SchemaCatalog: All tables with their columns, keys and row estimates.
+    """
+    key = _engine_key(db_engine)
+    catalog = _catalogs.get(key)
+    if catalog is not None and time.monotonic() - catalog.loaded_at < ttl:
+        return catalog
+
+    with _lock:
+        catalog = _catalogs.get(key)
+        if catalog is not None and time.monotonic() - catalog.loaded_at < ttl:
+            return catalog
+        catalog = _load_catalog(db_engine)
+        _catalogs[key] = catalog
+        return catalog
+
+
+def invalidate_catalog(db_engine: Optional[Engine] = None):
+    """Drop the cached catalog for one engine, or for every engine when none is given.
+
+    Call this after migrations or DDL so the next lookup re-introspects.
+    """
+    with _lock:
+        if db_engine is None:
+            _catalogs.clear()
+        else:
+            _catalogs.pop(_engine_key(db_engine), None)
+
+
+SCHEMA_DIGEST_MAX_CHARS = int(os.getenv("SCHEMA_DIGEST_MAX_CHARS", "6000"))
+
+SCHEMA_DIGEST_CACHE_SIZE = 64  # digests kept; row counts that change create new ones
+
+_digests: dict[tuple, str] = {}
+
+
+def _compact_type(type_name: str) -> str:
+    type_name = type_name.lower()
+    for long_name, short_name in (
+        ("character varying", "varchar"),
+        ("timestamp without time zone", "timestamp"),
+        ("double precision", "double"),
+    ):
+        type_name = type_name.replace(long_name, short_name)
+    return type_name
+
+
+def build_schema_digest(catalog: SchemaCatalog) -> str:
+    """Render the catalog as one compact line per table, with foreign keys as join paths.
+
+    Example line: album(album_id int PK, title varchar(160), artist_id int -> artist.artist_id) ~347 rows
+
+    The digest is cached per catalog version and row estimates, so it is rebuilt when the schema
+    changes or a reloaded catalog reports other row counts.
+    """
+    key = (catalog.version, tuple(table.row_estimate for table in catalog.tables.values()))
+    digest = _digests.get(key)
+    if digest is not None:
+        return digest
+
+    lines = []
+    for table in catalog.tables.values():
+        references = {}
+        for fk in table.foreign_keys:
+            for column, referred_column in zip(fk["columns"], fk["referred_columns"]):
+                references[column] = f'{fk["referred_table"]}.{referred_column}'
+
+        columns = []
+        for column in table.columns:
+            entry = f'{column["name"]} {_compact_type(column["type"])}'
+            if column["name"] in table.primary_key:
+                entry += " PK"
+            if column["name"] in references:
+                entry += f' -> {references[column["name"]]}'
+            columns.append(entry)
+
+        line = f'{table.name}({", ".join(columns)})'
+        if table.row_estimate is not None:
+            line += f" ~{table.row_estimate} rows"
+        lines.append(line)
+
+    digest = "\n".join(lines)
+    if len(_digests) >= SCHEMA_DIGEST_CACHE_SIZE:
+        _digests.clear()
+    _digests[key] = digest
+    return digest
+
+
+def schema_digest_for(db_engine: Engine, max_chars: int = SCHEMA_DIGEST_MAX_CHARS) -> Optional[str]:
+    """Return the schema digest for this engine, or None when it exceeds the size budget.
+
+    Args :
+        db_engine (Engine): The SQLAlchemy engine to use.
+        max_chars (int): Largest digest worth putting in a prompt. Bigger schemas should be
+            explored with list_tables_tool / describe_table_tool instead.
+
+    Returns :
+        Optional[str]: The digest, or None if it is too large or introspection failed.
+    """
+    try:
+        digest = build_schema_digest(get_catalog(db_engine))
+    except Exception as e:
+        logger.warning("Schema digest unavailable: %s", e)
+        return None
+    if len(digest) > max_chars:
+        return None
+    return digest
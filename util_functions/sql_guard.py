@@ -0,0 +1,309 @@
+import os
+import logging
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.sql.expression import text
+
+from util_functions.schema_catalog import get_catalog
+from util_functions.query_cache import normalize_sql, version_token
+
+logger = logging.getLogger(__name__)
+
+# Estimate every generated SELECT with EXPLAIN before it runs, and stop the ones that would hurt the database
+SQL_COST_GUARD = os.getenv("SQL_COST_GUARD", "1") == "1"
+# Over these estimates a query is downgraded (or rejected, with SQL_GUARD_ACTION=reject)
+SQL_GUARD_MAX_COST = float(os.getenv("SQL_GUARD_MAX_COST", "100000"))  # planner cost units of the full query
+SQL_GUARD_MAX_ROWS = float(os.getenv("SQL_GUARD_MAX_ROWS", "1000000"))  # largest row estimate of any plan step
+SQL_GUARD_ACTION = os.getenv("SQL_GUARD_ACTION", "downgrade")
+# Always rejected: fetching even the first `limit` rows costs more than this, or a join without a condition
+# multiplies two inputs into more than SQL_GUARD_CROSS_JOIN_ROWS rows
+SQL_GUARD_REJECT_COST = float(os.getenv("SQL_GUARD_REJECT_COST", "10000000"))
+SQL_GUARD_CROSS_JOIN_ROWS = float(os.getenv("SQL_GUARD_CROSS_JOIN_ROWS", "100000"))
+# A downgraded query fetches at most this many rows, with a shorter timeout and no COUNT(*) probe
+SQL_GUARD_DOWNGRADE_LIMIT = int(os.getenv("SQL_GUARD_DOWNGRADE_LIMIT", "100"))
+SQL_GUARD_DOWNGRADE_TIMEOUT_MS = int(os.getenv("SQL_GUARD_DOWNGRADE_TIMEOUT_MS", "5000"))
+SQL_GUARD_CACHE_SIZE = int(os.getenv("SQL_GUARD_CACHE_SIZE", "1024"))
+SQL_GUARD_CACHE_TTL = float(os.getenv("SQL_GUARD_CACHE_TTL", "3600"))  # seconds; row estimates drift as data grows
+
+ALLOW = "allow"
+DOWNGRADE = "downgrade"
+REJECT = "reject"
+
+_JOIN_NODES = {"Nested Loop", "Hash Join", "Merge Join"}
+_SQLITE_TABLE = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?([\w\"]+)")
+_ALIAS = re.compile(r'\b(?:from|join|,)\s*("?\w+"?)\s+(?:as\s+)?(\w+)', re.IGNORECASE)
+_NOT_ALIASES = {"on", "join", "inner", "left", "right", "full", "cross", "natural", "where", "group",
+                "order", "limit", "using", "union", "having", "window", "offset", "except", "intersect"}
+
+
+@dataclass
+class PlanEstimate:
+    total_cost: float  # of the full query
+    limited_cost: float  # of fetching the first `limit` rows
+    rows: float  # largest row estimate of any step
+    join_types: list[str] = field(default_factory=list)
+    seq_scans: list[str] = field(default_factory=list)
+    cross_joins: list[str] = field(default_factory=list)
+
+
+@dataclass
+class GuardVerdict:
+    action: str  # ALLOW, DOWNGRADE or REJECT
+    reason: Optional[dict] = None  # structured explanation for the agent when not allowed
+    plan: Optional[PlanEstimate] = None
+
+    def apply_limit(self, limit: int) -> int:
+        return min(limit, SQL_GUARD_DOWNGRADE_LIMIT) if self.action == DOWNGRADE else limit
+
+
+class QueryRejected(Exception):
+    def __init__(self, verdict: GuardVerdict):
+        super().__init__(verdict.reason.get("message", "rejected by the cost guard") if verdict.reason else "")
+        self.verdict = verdict
+
+
+def _pg_estimate(plan: dict, limit: int) -> PlanEstimate:
+    """Read cost, rows, join types and cartesian products from an EXPLAIN (FORMAT JSON) plan."""
+    root = plan["Plan"]
+    estimate = PlanEstimate(total_cost=root["Total Cost"], limited_cost=root["Total Cost"], rows=0)
+
+    def has_index_condition(node: dict) -> bool:
+        return "Index Cond" in node or "Recheck Cond" in node or any(has_index_condition(child) for child in node.get("Plans", ()))
+
+    def walk(node: dict, depth: int):
+        node_type = node["Node Type"]
+        relation = node.get("Relation Name")
+        estimate.rows = max(estimate.rows, node.get("Plan Rows", 0))
+        children = node.get("Plans", [])
+        if node_type in _JOIN_NODES:
+            estimate.join_types.append(f"{node_type} ({node.get('Join Type', 'Inner')})")
+            # a nested loop with no join filter whose inner side isn't an index lookup on the
+            # outer row pairs every row with every row: usually a forgotten join condition
+            if node_type == "Nested Loop" and "Join Filter" not in node and len(children) == 2 \
+                    and not has_index_condition(children[1]):
+                pairs = children[0].get("Plan Rows", 0) * children[1].get("Plan Rows", 0)
+                if pairs >= SQL_GUARD_CROSS_JOIN_ROWS:
+                    estimate.cross_joins.append(f"{_relations(children[0])} x {_relations(children[1])} (~{pairs:.0f} rows)")
+        if node_type == "Seq Scan" and relation:
+            estimate.seq_scans.append(relation)
+        for child in children:
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    # Postgres costs a LIMIT as the startup cost plus the fraction of the run cost for the rows it needs
+    plan_rows = root.get("Plan Rows") or 1
+    startup = root.get("Startup Cost", 0.0)
+    estimate.limited_cost = startup + (estimate.total_cost - startup) * min(1.0, limit / plan_rows)
+    return estimate
+
+
+def _relations(node: dict) -> str:
+    names = []
+
+    def collect(node: dict):
+        if node.get("Relation Name"):
+            names.append(node.get("Alias") or node["Relation Name"])
+        for child in node.get("Plans", ()):
+            collect(child)
+
+    collect(node)
+    return "+".join(names) or node["Node Type"]
+
+
+def _table_aliases(query: str, table_names: list[str]) -> dict[str, str]:
+    """Map table names and the aliases in `FROM artist ar` / `JOIN album AS al` clauses (lowercased) to tables."""
+    aliases = {name.lower(): name for name in table_names}
+    for table, alias in _ALIAS.findall(query):
+        table = aliases.get(table.strip('"').lower())
+        if table is not None and alias.lower() not in _NOT_ALIASES:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def _sqlite_estimate(rows: list[tuple], db_engine: Engine, query: str, limit: int) -> PlanEstimate:
+    """SQLite's EXPLAIN QUERY PLAN has no costs: estimate them from the catalog's row counts.
+
+    Within one loop nest (plan lines sharing a parent), each SCAN multiplies the work by the
+    table's size and a SEARCH through an index counts as one row per outer row; separate
+    nests (subqueries) add up.
+    """
+    catalog = get_catalog(db_engine)
+    aliases = _table_aliases(query, catalog.table_names())
+    estimate = PlanEstimate(total_cost=0.0, limited_cost=0.0, rows=0)
+    blocking = False
+    nests: dict[int, list[tuple[str, str, float]]] = {}
+    for _, parent, _, detail in rows:
+        if detail.startswith("USE TEMP B-TREE"):
+            blocking = True  # ORDER BY / GROUP BY / DISTINCT over the whole result
+        match = _SQLITE_TABLE.match(detail)
+        if not match:
+            continue
+        name = match.group(2).strip('"').lower()
+        table = catalog.get_table(aliases.get(name, name))
+        size = float(table.row_estimate or 1) if table is not None else 1.0
+        nests.setdefault(parent, []).append((match.group(1), name, size))
+
+    for nest in nests.values():
+        work = 1.0
+        for access, name, size in nest:
+            if access == "SCAN":
+                work *= max(size, 1.0)
+                estimate.seq_scans.append(aliases.get(name, name))
+        estimate.join_types.extend(["Nested Loop (Inner)"] * (len(nest) - 1))
+        estimate.total_cost += work
+        estimate.rows = max(estimate.rows, work)
+        # two full scans in a row: every outer row reads the whole inner table
+        for (outer_access, outer, outer_size), (inner_access, inner, inner_size) in zip(nest, nest[1:]):
+            if outer_access == inner_access == "SCAN" and outer_size * inner_size >= SQL_GUARD_CROSS_JOIN_ROWS:
+                estimate.cross_joins.append(f"{outer} x {inner} (~{outer_size * inner_size:.0f} rows)")
+    estimate.limited_cost = estimate.total_cost if blocking else min(estimate.total_cost, float(limit))
+    return estimate
+
+
+def explain_query(db_engine: Engine, query: str, limit: int) -> Optional[PlanEstimate]:
+    """Plan `query` without running it. None for databases the guard can't read plans from."""
+    dialect = db_engine.dialect.name
+    with db_engine.connect() as connection:
+        with connection.begin():
+            if dialect == "postgresql":
+                connection.execute(text("SET TRANSACTION READ ONLY"))
+                plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}")).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return _pg_estimate(plan[0], limit)
+            if dialect == "sqlite":
+                rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {query}").fetchall()
+                return _sqlite_estimate(rows, db_engine, query, limit)
+    return None
+
+
+def judge(plan: PlanEstimate, action: str = SQL_GUARD_ACTION) -> GuardVerdict:
+    """Compare a plan with the thresholds."""
+    estimates = {
+        "estimated_cost": round(plan.total_cost, 2),
+        "estimated_rows": round(plan.rows),
+        "join_types": plan.join_types,
+        "seq_scans": plan.seq_scans,
+    }
+    if plan.cross_joins:
+        return GuardVerdict(REJECT, {
+            "code": "cross_join",
+            "message": "The query joins tables without a join condition, producing a cartesian product.",
+            "cross_joins": plan.cross_joins,
+            **estimates,
+            "hint": "Add the missing ON/WHERE condition between these tables (follow their foreign keys).",
+        }, plan)
+    if plan.limited_cost > SQL_GUARD_REJECT_COST:
+        return GuardVerdict(REJECT, {
+            "code": "too_expensive",
+            "message": "Even the first rows of this query are estimated to cost more than the database allows.",
+            "max_cost": SQL_GUARD_REJECT_COST,
+            **estimates,
+            "hint": "Filter earlier (WHERE on indexed columns), aggregate fewer rows or join fewer tables.",
+        }, plan)
+    if plan.total_cost > SQL_GUARD_MAX_COST or plan.rows > SQL_GUARD_MAX_ROWS:
+        reason = {
+            "code": "over_budget",
+            "max_cost": SQL_GUARD_MAX_COST,
+            "max_rows": SQL_GUARD_MAX_ROWS,
+            **estimates,
+            "hint": "Add filters or aggregate in SQL so the query touches fewer rows.",
+        }
+        if action == REJECT:
+            return GuardVerdict(REJECT, {"message": "The query is estimated to exceed the cost budget.", **reason}, plan)
+        return GuardVerdict(DOWNGRADE, {
+            "message": f"The query exceeds the cost budget, so at most {SQL_GUARD_DOWNGRADE_LIMIT} rows were fetched "
+                       "and the total row count was not computed.",
+            **reason,
+        }, plan)
+    return GuardVerdict(ALLOW, None, plan)
+
+
+class CostGuard:
+    """EXPLAIN-based admission check for generated SQL, with verdicts cached per normalized query.
+
+    The cache key is the normalized query text, the limit and the schema/data version of the engine,
+    so a repeated query skips the EXPLAIN until the schema changes or the entry expires.
+    """
+
+    def __init__(self, max_entries: int = SQL_GUARD_CACHE_SIZE, ttl: float = SQL_GUARD_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._verdicts: OrderedDict[tuple, tuple[GuardVerdict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.explains = 0
+        self.cache_hits = 0
+        self.allowed = 0
+        self.downgraded = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def check(self, db_engine: Engine, query: str, limit: int) -> GuardVerdict:
+        """Return the verdict for running `query` with `limit` rows.
+
+        Args :
+            db_engine (Engine): The engine the query will run on.
+            query (str): A cleaned SELECT query.
+            limit (int): Rows the caller wants.
+
+        Returns :
+            GuardVerdict: ALLOW, DOWNGRADE (run with `apply_limit`) or REJECT with a structured reason.
+                ALLOW as well when the plan can't be read; running the query then reports the error.
+        """
+        key = (db_engine.url.render_as_string(hide_password=False), normalize_sql(query), limit, version_token(db_engine))
+        with self._lock:
+            cached = self._verdicts.get(key)
+            if cached is not None and time.monotonic() < cached[1]:
+                self._verdicts.move_to_end(key)
+                self.cache_hits += 1
+                verdict = cached[0]
+                self._count(verdict)
+                return verdict
+
+        try:
+            plan = explain_query(db_engine, query, limit)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Cost guard could not plan the query: %s", e)
+            return GuardVerdict(ALLOW)
+        self.explains += 1
+        verdict = judge(plan) if plan is not None else GuardVerdict(ALLOW)
+        with self._lock:
+            self._verdicts[key] = (verdict, time.monotonic() + self.ttl)
+            while len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+            self._count(verdict)
+        return verdict
+
+    def _count(self, verdict: GuardVerdict):
+        if verdict.action == REJECT:
+            self.rejected += 1
+        elif verdict.action == DOWNGRADE:
+            self.downgraded += 1
+        else:
+            self.allowed += 1
+
+    def clear(self):
+        with self._lock:
+            self._verdicts.clear()
+
+    def stats(self) -> dict:
+        return {
+            "explains": self.explains,
+            "cache_hits": self.cache_hits,
+            "allowed": self.allowed,
+            "downgraded": self.downgraded,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "cached_verdicts": len(self._verdicts),
+        }
+
+
+cost_guard = CostGuard()
@@ -0,0 +1,271 @@
+import os
+import re
+import json
+import math
+import zlib
+import hashlib
+import threading
+from collections import Counter
+from typing import Optional
+
+# Where per-file indexes are cached; set TEXT_INDEX_DIR= (empty) to keep them in memory only
+TEXT_INDEX_DIR = os.getenv("TEXT_INDEX_DIR", ".cache/text_index") or None
+# Chunk boundaries are content-defined: a chunk ends after a word pair whose hash hits
+# CHUNK_BOUNDARY_DIVISOR, so an edit only moves the boundaries next to it and the other
+# chunks keep their hash (and their term counts) across rebuilds.
+CHUNK_MIN_WORDS = 60
+CHUNK_MAX_WORDS = 240
+CHUNK_BOUNDARY_DIVISOR = 60  # chunks average about CHUNK_MIN_WORDS + this many words
+CHUNK_OVERLAP = 30  # words of the previous chunk repeated at the start of the next
+SEARCH_TOP_K = 5
+SEARCH_TOKEN_BUDGET = 800  # approximate tokens returned by a search
+BM25_K1 = 1.5
+BM25_B = 0.75
+INDEX_FORMAT_VERSION = 2
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was", "were", "be",
+    "it", "this", "that", "with", "as", "by", "at", "from", "what", "which", "about", "i", "me", "my",
+    "do", "does", "how", "need", "know", "want", "tell", "file", "content",
+}
+
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "ed", "ly", "s", "e")
+
+
+def _stem(token: str) -> str:
+    # Crude suffix stripping so "pipelining" and "pipeline" share a term
+    for suffix in _SUFFIXES:
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return [_stem(token) for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def extract_sections(file_path: str) -> list[tuple[Optional[int], str]]:
+    """(page, text) sections of a file: one per page for PDFs, a single section for text files.
+
+    A module-level function, so the file reader agent can run it in the parse executor.
+    """
+    if file_path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        with PdfReader(file_path) as reader:
+            return [(number, page.extract_text() or "") for number, page in enumerate(reader.pages, start=1)]
+    with open(file_path, "r", errors="replace") as file:
+        return [(None, file.read())]
+
+
+def _is_boundary(previous_word: str, word: str) -> bool:
+    return zlib.crc32(f"{previous_word} {word}".encode()) % CHUNK_BOUNDARY_DIVISOR == 0
+
+
+def chunk_sections(sections: list[tuple[Optional[int], str]], overlap: int = CHUNK_OVERLAP) -> list[dict]:
+    """Split sections into chunks at content-defined word boundaries, each prefixed with the
+    last `overlap` words of the previous chunk of the same section."""
+    chunks = []
+    for page, text in sections:
+        words = text.split()
+        start = 0
+        previous_tail: list[str] = []
+        for end in range(1, len(words) + 1):
+            length = end - start
+            if end < len(words) and (length < CHUNK_MIN_WORDS or (
+                    length < CHUNK_MAX_WORDS and not _is_boundary(words[end - 2] if end > 1 else "", words[end - 1]))):
+                continue
+            chunks.append({"page": page, "text": " ".join(previous_tail + words[start:end])})
+            previous_tail = words[max(start, end - overlap):end]
+            start = end
+    return chunks
+
+
+class FileTextIndex:
+    """BM25 index over the chunks of one file."""
+
+    def __init__(self, signature: list, chunks: list[dict]):
+        self.signature = signature
+        self.chunks = chunks  # {"page", "text", "hash", "terms": {term: count}, "length"}
+        self.doc_freq: Counter = Counter()
+        for chunk in chunks:
+            self.doc_freq.update(chunk["terms"].keys())
+        self.avg_length = sum(chunk["length"] for chunk in chunks) / len(chunks) if chunks else 0.0
+
+    @classmethod
+    def build(
+        cls,
+        file_path: str,
+        signature: list,
+        previous: Optional["FileTextIndex"] = None,
+        sections: Optional[list] = None,
+    ) -> "FileTextIndex":
+        # Reuse term counts of chunks whose text did not change since the previous build
+        reusable = {chunk["hash"]: chunk for chunk in previous.chunks} if previous else {}
+        chunks = []
+        if sections is None:
+            sections = extract_sections(file_path)
+        for chunk in chunk_sections(sections):
+            chunk_hash = hashlib.sha1(chunk["text"].encode()).hexdigest()[:16]
+            old = reusable.get(chunk_hash)
+            if old is not None:
+                terms, length = old["terms"], old["length"]
+            else:
+                tokens = tokenize(chunk["text"])
+                terms, length = dict(Counter(tokens)), len(tokens)
+            chunks.append({**chunk, "hash": chunk_hash, "terms": terms, "length": length})
+        return cls(signature, chunks)
+
+    def search(self, query: str, top_k: int = SEARCH_TOP_K) -> list[tuple[float, dict]]:
+        terms = set(tokenize(query))
+        n = len(self.chunks)
+        scored = []
+        for chunk in self.chunks:
+            score = 0.0
+            for term in terms:
+                frequency = chunk["terms"].get(term)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (n - self.doc_freq[term] + 0.5) / (self.doc_freq[term] + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * chunk["length"] / (self.avg_length or 1))
+                score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            if score > 0:
+                scored.append((score, chunk))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:top_k]
+
+    def to_json(self) -> dict:
+        return {"version": INDEX_FORMAT_VERSION, "signature": self.signature, "chunks": self.chunks}
+
+
+_indexes: dict[str, FileTextIndex] = {}
+_lock = threading.Lock()  # guards _indexes and _file_locks; held only briefly
+_file_locks: dict[str, threading.Lock] = {}  # one build at a time per file; other files aren't blocked
+
+
+def _signature(file_path: str) -> list:
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _cache_path(file_path: str) -> Optional[str]:
+    if not TEXT_INDEX_DIR:
+        return None
+    digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+    return os.path.join(TEXT_INDEX_DIR, f"{digest}.json")
+
+
+def _load_from_disk(file_path: str) -> Optional[FileTextIndex]:
+    path = _cache_path(file_path)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != INDEX_FORMAT_VERSION:
+        return None
+    return FileTextIndex(state["signature"], state["chunks"])
+
+
+def _save_to_disk(file_path: str, index: FileTextIndex):
+    path = _cache_path(file_path)
+    if path is None:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index.to_json(), f)
+    os.replace(tmp_path, path)
+
+
+def get_text_index(file_path: str, sections: Optional[list] = None, build: bool = True) -> Optional[FileTextIndex]:
+    """Return the BM25 index for a .txt or .pdf file, rebuilding it only when the file changed.
+
+    Args :
+        file_path (str): Path of a .txt or .pdf file.
+        sections (Optional[list]): The file's extract_sections() when the caller already has them,
+            e.g. parsed in the parse executor; extracted here when None.
+        build (bool): Whether to build a missing or outdated index; when False, None is returned instead.
+
+    Returns :
+        Optional[FileTextIndex]: The index, or None when it would need building and `build` is False.
+    """
+    key = os.path.abspath(file_path)
+    signature = _signature(file_path)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None and index.signature == signature:
+            return index
+        file_lock = _file_locks.setdefault(key, threading.Lock())
+
+    with file_lock:
+        with _lock:
+            index = _indexes.get(key)
+        if index is not None and index.signature == signature:
+            return index  # built by another thread while this one waited
+        if index is None:
+            index = _load_from_disk(file_path)
+            if index is not None and index.signature == signature:
+                with _lock:
+                    _indexes[key] = index
+                return index
+        if not build:
+            return None
+        index = FileTextIndex.build(file_path, signature, previous=index, sections=sections)
+        with _lock:
+            _indexes[key] = index
+        _save_to_disk(file_path, index)
+        return index
+
+
+def search_file(
+    file_path: str,
+    query: str,
+    top_k: int = SEARCH_TOP_K,
+    token_budget: int = SEARCH_TOKEN_BUDGET,
+    sections: Optional[list] = None,
+) -> dict:
+    """Return the chunks of a text or PDF file most relevant to the query, within a token budget.
+
+    Args :
+        file_path (str): Path of a .txt or .pdf file.
+        query (str): What the user wants to know.
+        top_k (int): Maximum number of chunks.
+        token_budget (int): Approximate token budget for the returned text.
+        sections (Optional[list]): The file's extract_sections(), used if the index has to be built.
+
+    Returns :
+        dict: file_content (the selected chunks, best first), summary and the chunk list.
+    """
+    index = get_text_index(file_path, sections)
+    selected = []
+    used = 0
+    for score, chunk in index.search(query, top_k):
+        cost = estimate_tokens(chunk["text"])
+        if selected and used + cost > token_budget:
+            break
+        selected.append({"page": chunk["page"], "score": round(score, 3), "text": chunk["text"]})
+        used += cost
+
+    if not selected:
+        return {
+            "file_content": "",
+            "summary": f"No passages in {os.path.basename(file_path)} match the query",
+            "chunks": [],
+        }
+
+    content = "\n\n".join(
+        (f"[page {chunk['page']}] " if chunk["page"] else "") + chunk["text"] for chunk in selected
+    )
+    return {
+        "file_content": content,
+        "summary": f"{len(selected)} of {len(index.chunks)} passages of {os.path.basename(file_path)} matching the query",
+        "chunks": selected,
+    }